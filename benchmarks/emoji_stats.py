@@ -0,0 +1,40 @@
+import sys
+import os
+import timeit
+
+import numpy as np
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emojistats import EmojiStats
+
+EMOJIS = (50, 500, 5000)
+MEMBERS = 10_000
+REPEAT = 200
+
+
+def _naive_gini(uses: list) -> float:
+    # * Mean absolute difference of all the pairs, divided by twice the mean
+    n, total = len(uses), sum(uses)
+    return sum(abs(a - b) for a in uses for b in uses) / (2 * n * total)
+
+
+if __name__ == "__main__":
+
+    rng = np.random.default_rng(1)
+    for n in EMOJIS:
+        # * Zipf-like usage: a few popular emojis, a long tail and some dead ones
+        uses = (rng.zipf(1.6, n) - 1) * rng.integers(1, 50, n)
+        users = np.minimum(uses, rng.integers(1, MEMBERS, n))
+        rows = list(zip(range(10**17, 10**17 + n), uses.tolist(), users.tolist()))
+
+        stats = EmojiStats.from_rows(rows, MEMBERS)
+        if n <= 500:
+            assert abs(stats.gini - _naive_gini(uses.tolist())) < 1e-9
+        assert np.isclose(stats.share.sum(), 1) or not stats.total
+
+        arrays = np.array(rows, dtype=np.int64).T
+        compute = min(timeit.repeat(lambda: EmojiStats.compute(*arrays, MEMBERS), number=1, repeat=REPEAT))
+        from_rows = min(timeit.repeat(lambda: EmojiStats.from_rows(rows, MEMBERS), number=1, repeat=REPEAT))
+        print(f"{n:>5} emojis: compute {compute * 1000:.3f}ms, rows -> stats {from_rows * 1000:.3f}ms, "
+              f"gini {stats.gini:.2f}, {len(stats.dead)} dead, 80% of the uses with {stats.concentration} emojis")
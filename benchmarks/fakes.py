@@ -0,0 +1,238 @@
+import random
+import asyncio
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+
+import discord
+
+import main_emote
+
+# * Lightweight stand-ins of the discord.py objects used by the cogs, without gateway or HTTP.
+# * Only the attributes and coroutines read by the bot are implemented.
+
+SIZES = {
+    # * name: (members, emojis, text channels, messages)
+    "small": (50, 20, 3, 2_000),
+    "medium": (300, 60, 8, 20_000),
+    "large": (2_000, 150, 20, 100_000),
+}
+EMOJI_MESSAGE_SHARE = 0.3  # * Share of the messages with at least one custom emoji
+WORDS = ("salut", "ok", "mdr", "oui", "non", "trop", "bien", "ce", "soir", "qui", "vient", "jouer", "gg", "wp")
+
+
+class FakeEmoji:
+    def __init__(self, emoji_id: int, name: str, guild):
+        self.id = emoji_id
+        self.name = name
+        self.guild = guild
+        self.guild_id = guild.id
+        self.animated = False
+
+    def __str__(self):
+        return f"<:{self.name}:{self.id}>"
+
+    def __eq__(self, other):
+        return isinstance(other, FakeEmoji) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class FakeMember:
+    def __init__(self, member_id: int, name: str, guild, bot: bool = False):
+        self.id = member_id
+        self.name = name
+        self.display_name = name
+        self.guild = guild
+        self.bot = bot
+        self.mention = f"<@{member_id}>"
+
+    def __str__(self):
+        return f"{self.name}#0001"
+
+
+class FakeMessage:
+    def __init__(self, message_id: int, content: str, author, channel, created_at: datetime = None):
+        self.id = message_id
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild if channel else None
+        self.created_at = created_at or datetime.utcnow()
+        self.type = discord.MessageType.default
+        self.embeds = []
+        self._state = None  # * Read by commands.Context
+
+    async def add_reaction(self, emoji):
+        pass
+
+    async def clear_reaction(self, emoji):
+        pass
+
+    async def clear_reactions(self):
+        pass
+
+    async def edit(self, **kwargs):
+        self.embeds = [kwargs["embed"]] if kwargs.get("embed") else self.embeds
+
+    async def delete(self, **kwargs):
+        pass
+
+
+class FakeTextChannel:
+    def __init__(self, channel_id: int, name: str, guild):
+        self.id = channel_id
+        self.name = name
+        self.guild = guild
+        self.type = discord.ChannelType.text
+        self.mention = f"<#{channel_id}>"
+        self.messages = []  # * Oldest first
+        self.sent = 0
+
+    async def history(self, limit=None):
+        # * Newest first, as the API
+        for message in reversed(self.messages[-limit:] if limit else self.messages):
+            yield message
+
+    async def send(self, content=None, **kwargs):
+        self.sent += 1
+        message = FakeMessage(random.getrandbits(62), content or "", None, self)
+        message.embeds = [kwargs["embed"]] if kwargs.get("embed") else []
+        return message
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int, name: str):
+        self.id = guild_id
+        self.name = name
+        self.members = []
+        self.emojis = []
+        self.text_channels = []
+        self._emojis = {}
+
+    @property
+    def member_count(self) -> int:
+        return len(self.members)
+
+    def get_member(self, member_id: int):
+        return next((member for member in self.members if member.id == member_id), None)
+
+    async def fetch_emoji(self, emoji_id: int):
+        try:
+            return self._emojis[emoji_id]
+        except KeyError:
+            raise discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown Emoji")
+
+    def add_emoji(self, emoji) -> None:
+        self.emojis.append(emoji)
+        self._emojis[emoji.id] = emoji
+
+    def remove_emoji(self, emoji) -> None:
+        self.emojis.remove(emoji)
+        del self._emojis[emoji.id]
+
+
+class FakeContext:
+    def __init__(self, client, guild, author, channel):
+        self.bot = client
+        self.guild = guild
+        self.author = author
+        self.channel = channel
+        self.message = FakeMessage(random.getrandbits(62), "", author, channel)
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+
+class FakeClientMixin:
+    # * Cache lookups of discord.Client on the fake guilds, the users never react to the paginators
+
+    def use_guilds(self, guilds: list) -> None:
+        self._fake_guilds = guilds
+        self._fake_emojis = {emoji.id: emoji for guild in guilds for emoji in guild.emojis}
+        self._fake_users = {member.id: member for guild in guilds for member in guild.members}
+
+    @property
+    def guilds(self):
+        return self._fake_guilds
+
+    @property
+    def user(self):
+        return SimpleNamespace(id=1, name="bot")
+
+    @property
+    def latency(self):
+        return 0.0
+
+    def get_emoji(self, emoji_id: int):
+        return self._fake_emojis.get(emoji_id)
+
+    def get_user(self, user_id: int):
+        return self._fake_users.get(user_id)
+
+    def wait_for(self, event, *, check=None, timeout=None):
+        # * An already expired wait (a future, accepted by asyncio.wait on every Python version)
+        future = asyncio.get_event_loop().create_future()
+        future.set_exception(asyncio.TimeoutError())
+        return future
+
+
+class FakeBot(FakeClientMixin, main_emote.Bot):
+    pass
+
+
+def _zipf_weights(n: int, exponent: float = 1.1) -> list:
+    # * A few emojis and members make most of the uses, as on real guilds
+    return [1 / (rank ** exponent) for rank in range(1, n + 1)]
+
+
+def generate_guild(guild_id: int, size: str = "medium", seed: int = 0) -> FakeGuild:
+    """
+    generate_guild(guild_id, size, seed)
+
+    Build a guild with its members, emojis, text channels and message history.
+
+    Parameters
+    ----------
+    guild_id : int
+        The id of the guild, the ids of its objects are derived from it.
+    size : str
+        A key of SIZES.
+    seed : int
+        The seed of the generator, the same seed gives the same guild.
+
+    Notes
+    ----------
+    The popularity of the emojis and the activity of the members follow a Zipf law,
+    EMOJI_MESSAGE_SHARE of the messages contain 1 to 3 custom emojis of the guild.
+    """
+    rng = random.Random(seed)
+    n_members, n_emojis, n_channels, n_messages = SIZES[size]
+    guild = FakeGuild(guild_id, f"guild{guild_id}")
+    base = guild_id << 32
+    guild.members = [FakeMember(base + 1_000_000 + index, f"member{index}", guild) for index in range(n_members)]
+    guild.members.append(FakeMember(base + 999_999, "autre bot", guild, bot=True))
+    for index in range(n_emojis):
+        guild.add_emoji(FakeEmoji(base + 2_000_000 + index, f"emoji{index}", guild))
+    guild.text_channels = [FakeTextChannel(base + 3_000_000 + index, f"salon{index}", guild) for index in range(n_channels)]
+
+    humans = [member for member in guild.members if not member.bot]
+    member_weights, emoji_weights = _zipf_weights(len(humans)), _zipf_weights(n_emojis)
+    channel_weights = _zipf_weights(n_channels, 0.8)
+    start = datetime.utcnow() - timedelta(days=30)
+    step = timedelta(days=30) / n_messages
+    authors = rng.choices(humans, member_weights, k=n_messages)
+    channels = rng.choices(guild.text_channels, channel_weights, k=n_messages)
+    for index in range(n_messages):
+        words = rng.choices(WORDS, k=rng.randint(1, 12))
+        if rng.random() < EMOJI_MESSAGE_SHARE:
+            for emoji in rng.choices(guild.emojis, emoji_weights, k=rng.randint(1, 3)):
+                words.insert(rng.randrange(len(words) + 1), str(emoji))
+        channel = channels[index]
+        channel.messages.append(FakeMessage(base + 10_000_000 + index, " ".join(words), authors[index], channel, start + step * index))
+    return guild
+
+
+def corpus(guild: FakeGuild) -> list:
+    # * Every message of the guild, oldest first
+    return sorted((message for channel in guild.text_channels for message in channel.messages), key=lambda message: message.id)
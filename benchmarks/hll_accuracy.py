@@ -0,0 +1,43 @@
+import sys
+import os
+import random
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hyperloglog import HyperLogLog
+
+CARDINALITIES = (10, 100, 1000, 10_000, 100_000)
+PRECISIONS = (10, 12)
+TRIALS = 5
+
+
+def _member_ids(count: int, rng: random.Random) -> list:
+    # * Discord snowflakes: timestamp in the high bits, sequential ids are close to each other
+    start = rng.randrange(1 << 40, 1 << 41) << 22
+    return [start + (i << 22) + rng.randrange(1 << 12) for i in range(count)]
+
+
+if __name__ == "__main__":
+
+    rng = random.Random(1)
+    for precision in PRECISIONS:
+        standard_error = 1.04 / (1 << precision) ** 0.5
+        print(f"precision {precision}: standard error {standard_error:.2%}")
+        for cardinality in CARDINALITIES:
+            worst, size = 0.0, 0
+            for _ in range(TRIALS):
+                # * Half of the members in each of two daily sketches, merged as in DistinctUsers.count
+                ids = _member_ids(cardinality, rng)
+                first, second = HyperLogLog(precision), HyperLogLog(precision)
+                for i, member_id in enumerate(ids):
+                    (first if i % 2 else second).add(member_id)
+                    first.add(ids[i // 2])  # * Repeated uses must not change the estimate
+                first = HyperLogLog.from_bytes(first.to_bytes())
+                first.merge(second)
+
+                error = abs(first.count() - cardinality) / cardinality
+                worst = max(worst, error)
+                size = max(size, len(first.to_bytes()))
+            # * A collision of two members in the same register is one member off, whatever the cardinality
+            assert worst <= max(3 * standard_error, 1 / cardinality), f"{cardinality} members: error {worst:.2%}"
+            print(f"  {cardinality:>7} members: worst error {worst:6.2%}, {size:>5} bytes stored")
@@ -0,0 +1,122 @@
+import gc
+import sys
+import os
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MEMBERS = 100_000
+ONLINE = 1_000  # * Members sent in the GUILD_CREATE payload of a large guild
+CHUNK = 1_000  # * Members of a GUILD_MEMBERS_CHUNK payload
+EMOJIS = 50
+
+# * RSS of the bot after the READY of a synthetic guild of MEMBERS members, with and without LOW_MEMORY.
+# * Each mode runs in its own process (python benchmarks/member_memory.py), through the fake gateway of startup_time.py:
+# * with the member cache, the members are received by chunks as after a chunk request of discord.py,
+# * with LOW_MEMORY, chunking is disabled and only the GUILD_CREATE payload is received.
+
+
+def _rss() -> int:
+    # * Resident set size in bytes
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)  # * Peak
+
+
+def _member(member_id: int) -> dict:
+    return {"user": {"id": str(member_id), "username": f"user{member_id}", "discriminator": "0001", "avatar": None, "bot": False},
+            "roles": [], "joined_at": None, "deaf": False, "mute": False}
+
+
+def _guild(guild_id: int) -> dict:
+    emojis = [{"id": str(guild_id * 1000 + index), "name": f"emoji{index}", "roles": [], "require_colons": True,
+               "managed": False, "animated": False, "available": True}
+              for index in range(EMOJIS)]
+    everyone = {"id": str(guild_id), "name": "@everyone", "permissions": "0", "position": 0, "color": 0,
+                "hoist": False, "managed": False, "mentionable": False}
+    return {"id": str(guild_id), "name": f"guild{guild_id}", "unavailable": False, "member_count": MEMBERS,
+            "owner_id": str(guild_id * 1_000_000), "members": [_member(guild_id * 1_000_000 + index) for index in range(ONLINE)],
+            "emojis": emojis, "roles": [everyone], "channels": [], "large": True, "__shard_id__": 0}
+
+
+async def _gateway(client, startup, low_memory: bool) -> None:
+    from discord.state import ChunkRequest
+
+    state = client._connection
+    state.is_bot = True  # * Set by the login
+    state.shard_count = client.shard_count = 1
+    state.shard_ids = (0,)
+    state.shards_launched.set()
+    state._chunk_guilds = False  # * The chunks are sent below, before the READY of the bot
+    state.guild_ready_timeout = 0.05
+    guild_id = 1
+    state.parse_ready({"v": 8, "user": {"id": "1", "username": "bot", "discriminator": "0001", "avatar": None, "bot": True},
+                       "guilds": [{"id": str(guild_id), "unavailable": True}], "session_id": "0",
+                       "application": {"id": "1", "flags": 0}, "__shard_id__": 0})
+    state.parse_guild_create(_guild(guild_id))
+    if not low_memory:
+        request = ChunkRequest(guild_id, client.loop, state._get_guild, cache=state.member_cache_flags.joined)
+        state._chunk_requests[request.nonce] = request
+        count = MEMBERS // CHUNK
+        for index in range(count):
+            state.parse_guild_members_chunk({"guild_id": str(guild_id), "nonce": request.nonce, "chunk_index": index, "chunk_count": count,
+                                             "members": [_member(guild_id * 1_000_000 + index * CHUNK + offset) for offset in range(CHUNK)]})
+    while "time to ready" not in startup.PHASES:
+        await asyncio.sleep(0.01)
+
+
+def run(low_memory: bool) -> dict:
+    import constants
+    constants.LOW_MEMORY = low_memory  # * Before the import of the modules which read it
+
+    import startup
+    import main_emote
+    import database
+    from constants import PREFIX
+
+    with tempfile.TemporaryDirectory() as directory:
+        database.DATABASE_PATH = os.path.join(directory, "database.db")  # * Never touch the database of the bot
+        client = main_emote.Bot("token", PREFIX)
+        client.prepare()
+        gc.collect()
+        before = _rss()
+        start = time.perf_counter()
+        client.loop.run_until_complete(asyncio.wait_for(_gateway(client, startup, low_memory), 600))
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        after = _rss()
+        guild = client.guilds[0]
+        report = {"low memory": low_memory, "cached members": len(guild.members), "member count": guild.member_count,
+                  "rss before gateway MiB": round(before / 2 ** 20, 1), "rss after ready MiB": round(after / 2 ** 20, 1),
+                  "rss growth MiB": round((after - before) / 2 ** 20, 1), "gateway to ready s": round(elapsed, 3)}
+        database.DBManager().connexion.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the RSS of the bot with and without LOW_MEMORY.")
+    parser.add_argument("--mode", choices=("cache", "low"), help="Run a single mode in this process.")
+    args = parser.parse_args()
+    if args.mode:
+        print(json.dumps(run(args.mode == "low")))
+        return
+
+    reports = {}
+    for mode in ("cache", "low"):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--mode", mode],
+                                capture_output=True, text=True, check=True).stdout
+        reports[mode] = json.loads(output.strip().splitlines()[-1])
+    reports["saved MiB"] = round(reports["cache"]["rss after ready MiB"] - reports["low"]["rss after ready MiB"], 1)
+    print(json.dumps({"members": MEMBERS, **reports}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import sys
+import os
+import random
+import timeit
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+database.DATABASE_PATH = ":memory:"  # * Never touch the database of the bot
+from database import DBManager
+
+GUILD_ID = 1
+DISTINCT = (25, 200, 800)
+USES = 20
+REPEAT = 50
+
+
+def _full_list(member_id: int) -> list:
+    # * Previous first page: the whole member blob, sorted, formatted (plus one fetch_emoji request per emoji)
+    emotes = DBManager().get_emoji_member(member_id, GUILD_ID)
+    emotes.sort(key=lambda e: int(e[1]), reverse=True)
+    return [f"<:e:{emoji_id}>**e  ➙  {count}**" for emoji_id, count in emotes]
+
+
+def _summary(member_id: int) -> list:
+    _, _, top, _ = DBManager().get_member_summary(member_id, GUILD_ID)
+    return [f"<:e:{emoji_id}>**e  ➙  {count}**" for emoji_id, count in top]
+
+
+if __name__ == "__main__":
+
+    rng = random.Random(1)
+    db = DBManager()
+    db.add_new_guild(GUILD_ID)
+    for member_id, distinct in enumerate(DISTINCT, 1):
+        db.add_new_member(GUILD_ID, member_id)
+        emojis = [10**17 + i for i in range(distinct)]
+        for emoji_id in emojis:
+            db.add_new_emoji(GUILD_ID, emoji_id)
+        for _ in range(USES):
+            db.add_message_emojis(GUILD_ID, 0, member_id, rng.sample(emojis, min(distinct, 50)))
+
+        assert _summary(member_id)[:10] == _full_list(member_id)[:10]
+        before = min(timeit.repeat(lambda: _full_list(member_id), number=1, repeat=REPEAT))
+        after = min(timeit.repeat(lambda: _summary(member_id), number=1, repeat=REPEAT))
+        print(f"{distinct:>4} distinct emojis: full list {before * 1000:.3f}ms + {distinct} fetch_emoji requests, "
+              f"summary {after * 1000:.3f}ms + 0 request")
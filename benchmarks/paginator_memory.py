@@ -0,0 +1,58 @@
+import gc
+import sys
+import os
+import tracemalloc
+
+import discord
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from paginator import PaginatorBuilder
+
+SESSIONS = 500
+ITEMS = 200
+
+
+def _build(index: int) -> PaginatorBuilder:
+    builder = PaginatorBuilder()
+    builder.base_embed_create("Benchmark", "Idle paginator", discord.Colour.gold())
+    builder.prefix = "⭒"
+    builder.content = [f"<:emoji_{i}:{10**17 + i}>**emoji_{i}  ➙  {index * i}**" for i in range(ITEMS)]
+    builder.max_content = 25
+    builder.content_builder(decorator="  ", separator="\n")
+    return builder
+
+
+def _legacy_session(index: int) -> dict:
+    # * Reproduce the previous representation: the builder's __dict__ with the rendered strings only
+    builder = _build(index)
+    state = builder.__dict__
+    state["_content"] = tuple(tuple(page.text.splitlines(keepends=True)) for page in builder._content)
+    builder.manager._add(state)
+    return state
+
+
+def _slotted_session(index: int) -> object:
+    builder = _build(index)
+    builder.paginator_store()
+    return builder.manager.current_paginator
+
+
+def _measure(factory) -> int:
+    gc.collect()
+    tracemalloc.start()
+    sessions = [factory(i) for i in range(SESSIONS)]
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del sessions
+    return size
+
+
+if __name__ == "__main__":
+
+    legacy = _measure(_legacy_session)
+    slotted = _measure(_slotted_session)
+    print(f"{SESSIONS} idle sessions of {ITEMS} items")
+    print(f"dict sessions:    {legacy / 1024:.1f} KiB ({legacy / SESSIONS:.0f} B/session)")
+    print(f"slotted sessions: {slotted / 1024:.1f} KiB ({slotted / SESSIONS:.0f} B/session)")
@@ -0,0 +1,190 @@
+import sys
+import os
+import gzip
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import metrics
+from constants import PREFIX
+from loopmonitor import LoopMonitor
+from events.guildJoin import populate_guild_database
+from fakes import FakeBot, FakeGuild, FakeMember, FakeEmoji, FakeMessage, FakeTextChannel
+
+# * Replays a recording of GatewayRecorder (GATEWAY_RECORD in constants.py) through every loaded event cog,
+# * on fake objects and against a temporary database:
+# *     python benchmarks/replay.py logs/gateway-xxx.jsonl.gz --speed 10
+# * The replay falls behind when an event is dispatched more than --lateness seconds after its time,
+# * or when more than --backlog handlers are waiting: the sustained rate is the rate reached until then.
+
+FOREIGN_EMOJI = "<:ailleurs:1>"  # * Emoji of another guild, parsed then ignored by on_message
+
+
+class ReplayBot(FakeBot):
+    # * Keeps the handlers dispatched and not finished yet
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pending = set()
+
+    def _schedule_event(self, coro, event_name, *args, **kwargs):
+        task = super()._schedule_event(coro, event_name, *args, **kwargs)
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+        return task
+
+
+def load(path: str) -> list:
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+class World:
+    # * Fake guilds, members, channels and emojis built from the ids of the recording
+
+    def __init__(self, records: list):
+        self.guilds, self.members, self.channels, self.emojis = {}, {}, {}, {}
+        added = set()
+        for record in records:
+            guild = self.guild(record["g"])
+            if record["e"] == "guild":
+                for index in range(record["m"]):
+                    self.member(guild, (1 << 48) + index)  # * Above the anonymized ids
+                for emoji_id in record["x"]:
+                    self.emoji(guild, emoji_id, present=True)
+            elif record["e"] == "message":
+                self.channel(guild, record["c"])
+                self.member(guild, record["a"])
+                for emoji_id in record["x"]:
+                    self.emoji(guild, emoji_id, present=emoji_id not in added)
+            elif record["e"] == "emojis_update":
+                for emoji_id in set(record["f"]) - set(record["b"]):
+                    added.add(emoji_id)
+                    self.emoji(guild, emoji_id, present=False)
+                for emoji_id in record["b"]:
+                    self.emoji(guild, emoji_id, present=emoji_id not in added)
+
+    def guild(self, guild_id: int):
+        if guild_id not in self.guilds:
+            self.guilds[guild_id] = FakeGuild(guild_id, f"guild{guild_id}")
+        return self.guilds[guild_id]
+
+    def member(self, guild, member_id: int):
+        if (guild.id, member_id) not in self.members:
+            member = self.members[(guild.id, member_id)] = FakeMember(member_id, f"member{member_id}", guild)
+            guild.members.append(member)
+        return self.members[(guild.id, member_id)]
+
+    def channel(self, guild, channel_id: int):
+        if channel_id not in self.channels:
+            channel = self.channels[channel_id] = FakeTextChannel(channel_id, f"salon{channel_id}", guild)
+            guild.text_channels.append(channel)
+        return self.channels[channel_id]
+
+    def emoji(self, guild, emoji_id: int, present: bool):
+        # * present: the emoji belongs to the guild before the replay (not added by an emojis_update)
+        if emoji_id not in self.emojis:
+            self.emojis[emoji_id] = FakeEmoji(emoji_id, f"emoji{emoji_id}", guild)
+            if present:
+                guild.add_emoji(self.emojis[emoji_id])
+        return self.emojis[emoji_id]
+
+    def event(self, record: dict) -> tuple:
+        # * (event name, arguments) of client.dispatch
+        guild = self.guilds[record["g"]]
+        if record["e"] == "message":
+            content = " ".join([str(self.emojis[emoji_id]) for emoji_id in record["x"]] + [FOREIGN_EMOJI] * record["o"]) or "message"
+            message = FakeMessage(time.perf_counter_ns(), content, self.member(guild, record["a"]), self.channels[record["c"]])
+            return "message", (message,)
+        if record["e"] in ("member_join", "member_remove"):
+            return record["e"], (self.member(guild, record["a"]),)
+        before = [self.emojis[emoji_id] for emoji_id in record["b"]]
+        for emoji in list(guild.emojis):
+            guild.remove_emoji(emoji)
+        for emoji_id in record["f"]:
+            guild.add_emoji(self.emojis[emoji_id])
+        return "guild_emojis_update", (guild, before, list(guild.emojis))
+
+
+def _percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)] if values else 0.0
+
+
+async def replay(client, world: World, events: list, speed: float, lateness: float, backlog: int) -> dict:
+    loop = asyncio.get_running_loop()  # * The loop lag is measured by the loopMonitor event
+    delays, max_backlog, behind = [], 0, None
+    start = loop.time()
+    for index, record in enumerate(events):
+        if speed:
+            delay = start + record["t"] / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            delays.append(max(-delay, 0.0))
+        elif index % 64 == 0:
+            await asyncio.sleep(0)  # * Max speed: let the handlers run
+        name, args = world.event(record)
+        client.dispatch(name, *args)
+        max_backlog = max(max_backlog, len(client.pending))
+        if behind is None and ((speed and delays[-1] > lateness) or len(client.pending) > backlog):
+            behind = {"event": index, "t": record["t"], "elapsed": round(loop.time() - start, 3)}
+    while client.pending:
+        await asyncio.sleep(0.01)
+    elapsed = loop.time() - start
+
+    duration = events[-1]["t"] - events[0]["t"] if events else 0.0
+    sustained_events = behind["event"] if behind else len(events)
+    sustained_time = behind["elapsed"] if behind else elapsed
+    return {"events": len(events), "recording seconds": round(duration, 3), "speed": speed or "max",
+            "target events per second": round(len(events) * speed / duration, 1) if speed and duration else None,
+            "replay seconds": round(elapsed, 3),
+            "events per second": round(len(events) / elapsed, 1) if elapsed else None,
+            "fell behind": behind,
+            "sustained events per second": round(sustained_events / sustained_time, 1) if sustained_time else None,
+            "dispatch lateness p99 ms": round(_percentile(delays, 0.99) * 1000, 3),
+            "dispatch lateness max ms": round(max(delays, default=0.0) * 1000, 3),
+            "max backlog": max_backlog,
+            "loop lag p99 ms": round(LoopMonitor().lag.percentile(0.99) * 1000, 3),
+            "db write p99 ms": round(metrics.DB_WRITES.percentile(0.99) * 1000, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recording of the gateway events through the event cogs.")
+    parser.add_argument("recording", help="A gateway-*.jsonl.gz file written by GatewayRecorder.")
+    parser.add_argument("--speed", default="max", help="1, 10, ... or max.")
+    parser.add_argument("--lateness", type=float, default=1.0, help="Seconds of delay before the replay falls behind.")
+    parser.add_argument("--backlog", type=int, default=1000, help="Waiting handlers before the replay falls behind.")
+    args = parser.parse_args()
+    speed = 0.0 if args.speed == "max" else float(args.speed)
+
+    logging.getLogger().setLevel(logging.INFO)
+    logging.getLogger().addHandler(logging.NullHandler())  # * The records are created but not written
+    records = load(args.recording)
+    world = World(records)
+    events = [record for record in records if record["e"] != "guild"]
+    counts = {}
+    for record in events:
+        counts[record["e"]] = counts.get(record["e"], 0) + 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        database.DATABASE_PATH = os.path.join(directory, "database.db")  # * Never touch the database of the bot
+        client = ReplayBot("token", PREFIX)
+        client.use_guilds(list(world.guilds.values()))
+        client._fake_emojis.update(world.emojis)  # * Also the emojis added during the replay
+        for guild in world.guilds.values():
+            populate_guild_database(guild)
+        client.load_events()
+        report = client.loop.run_until_complete(replay(client, world, events, speed, args.lateness, args.backlog))
+        database.DBManager().connexion.close()
+    report["event types"] = counts
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
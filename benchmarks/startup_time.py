@@ -0,0 +1,75 @@
+import sys
+import os
+import time
+import json
+import asyncio
+import tempfile
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import startup  # * Same first import as main_emote.py
+import main_emote
+import database
+from constants import PREFIX
+
+GUILDS = 5
+MEMBERS = 2000  # * Per guild
+EMOJIS = 50  # * Per guild
+READY_TIMEOUT = 0.05  # * Wait for the last GUILD_CREATE (2 seconds with discord.py defaults)
+
+# * Fake gateway: the READY and GUILD_CREATE payloads are given to the connection state of the bot,
+# * as the websocket would do, without network
+
+
+def _user(user_id: int, bot: bool = False) -> dict:
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0001", "avatar": None, "bot": bot}
+
+
+def _guild(guild_id: int) -> dict:
+    members = [{"user": _user(guild_id * 100_000 + index), "roles": [], "joined_at": None, "deaf": False, "mute": False}
+               for index in range(MEMBERS)]
+    emojis = [{"id": str(guild_id * 1000 + index), "name": f"emoji{index}", "roles": [], "require_colons": True,
+               "managed": False, "animated": False, "available": True}
+              for index in range(EMOJIS)]
+    everyone = {"id": str(guild_id), "name": "@everyone", "permissions": "0", "position": 0, "color": 0,
+                "hoist": False, "managed": False, "mentionable": False}
+    return {"id": str(guild_id), "name": f"guild{guild_id}", "unavailable": False, "member_count": MEMBERS,
+            "owner_id": members[0]["user"]["id"], "members": members, "emojis": emojis, "roles": [everyone],
+            "channels": [], "large": MEMBERS > 250, "__shard_id__": 0}
+
+
+async def _gateway(client) -> None:
+    state = client._connection
+    state.is_bot = True  # * Set by the login
+    state.shard_count = client.shard_count = 1  # * A single shard, the payloads carry its id as the sharded gateway
+    state.shard_ids = (0,)
+    state.shards_launched.set()  # * Set by the launch of the shards
+    state._chunk_guilds = False  # * The member lists of the payloads are complete, no chunk requested
+    state.guild_ready_timeout = READY_TIMEOUT
+    guild_ids = range(1, GUILDS + 1)
+    state.parse_ready({"v": 8, "user": _user(1, bot=True), "guilds": [{"id": str(guild_id), "unavailable": True} for guild_id in guild_ids],
+                       "session_id": "0", "application": {"id": "1", "flags": 0}, "__shard_id__": 0})
+    for guild_id in guild_ids:
+        state.parse_guild_create(_guild(guild_id))
+    while "time to ready" not in startup.PHASES:
+        await asyncio.sleep(0.01)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        database.DATABASE_PATH = os.path.join(directory, "database.db")  # * Never touch the database of the bot
+        client = main_emote.Bot("token", PREFIX)
+        client.prepare()
+        start = time.perf_counter()
+        client.loop.run_until_complete(asyncio.wait_for(_gateway(client), 60))
+        startup.record("fake gateway to ready", time.perf_counter() - start)
+        numpy = sys.modules.get("numpy")
+        report = {"guilds": GUILDS, "members": MEMBERS, "emojis": EMOJIS,
+                  "numpy imported": numpy is not None and type(numpy).__name__ == "module",
+                  "phases ms": {name: round(seconds * 1000, 1) for name, seconds in startup.PHASES.items()}}
+        database.DBManager().connexion.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
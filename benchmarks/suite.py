@@ -0,0 +1,142 @@
+import sys
+import os
+import io
+import json
+import time
+import random
+import asyncio
+import logging
+import sqlite3
+import argparse
+import platform
+import tempfile
+from contextlib import redirect_stdout
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from constants import PREFIX
+from events.newMessage import EventMemberMessage
+from events.emoteUpdate import EventGuildEmoteUpdate
+from events.guildJoin import populate_guild_database
+from events.memberJoin import EventGuildMemberJoin
+from events.memberLeave import EventGuildMemberLeave
+from membership import MembershipQueue
+from cogs.utility import Utility
+from fakes import SIZES, FakeBot, FakeContext, FakeEmoji, FakeMember, generate_guild, corpus
+
+# * Runs the handlers of the bot on fake guilds (fakes.py) against a temporary database and prints
+# * the throughput and the latency percentiles of each scenario as JSON, to compare the runs across changes:
+# *     python benchmarks/suite.py --size medium --output before.json
+
+COMMAND_RUNS = 50  # * Runs of the commands and of the emoji updates
+RAID_MEMBERS = 5000  # * Members joining during the member burst, half of them leave right after
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    return sorted_values[min(int(q * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def _report(latencies: list, elapsed: float, unit: str = "calls") -> dict:
+    latencies = sorted(latencies)
+    return {unit: len(latencies), "seconds": round(elapsed, 4),
+            f"{unit} per second": round(len(latencies) / elapsed, 1) if elapsed else None,
+            "p50 ms": round(_percentile(latencies, 0.5) * 1000, 3),
+            "p95 ms": round(_percentile(latencies, 0.95) * 1000, 3),
+            "p99 ms": round(_percentile(latencies, 0.99) * 1000, 3),
+            "max ms": round(latencies[-1] * 1000, 3)}
+
+
+async def _measure(calls, unit: str = "calls") -> dict:
+    # * calls: iterable of functions returning a coroutine
+    latencies = []
+    start = time.perf_counter()
+    for call in calls:
+        begin = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - begin)
+    return _report(latencies, time.perf_counter() - start, unit)
+
+
+async def _emoji_updates(cog, guild) -> dict:
+    def update(added: bool, emoji):
+        before = list(guild.emojis)
+        guild.add_emoji(emoji) if added else guild.remove_emoji(emoji)
+        return lambda: cog.on_guild_emojis_update(guild, before, list(guild.emojis))
+
+    latencies, start = [], time.perf_counter()
+    for index in range(COMMAND_RUNS):
+        emoji = FakeEmoji((guild.id << 32) + 5_000_000 + index, f"nouveau{index}", guild)
+        for added in (True, False):
+            call = update(added, emoji)
+            begin = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - begin)
+    return _report(latencies, time.perf_counter() - start)
+
+
+async def _member_burst(client, guild) -> dict:
+    join, leave = EventGuildMemberJoin(client), EventGuildMemberLeave(client)
+    raiders = [FakeMember((guild.id << 32) + 6_000_000 + index, f"raid{index}", guild) for index in range(RAID_MEMBERS)]
+    calls = [(lambda member=member: join.on_member_join(member)) for member in raiders]
+    calls += [(lambda member=member: leave.on_member_remove(member)) for member in raiders[::2]]
+    report = await _measure(calls, "events")
+    start = time.perf_counter()
+    MembershipQueue().flush()  # * The remaining changes, written by the memberQueue event in the bot
+    report["last flush ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return report
+
+
+async def run(size: str, seed: int) -> dict:
+    rng = random.Random(seed)
+    guild = generate_guild(1, size, seed)
+    messages = corpus(guild)
+    client = FakeBot("token", PREFIX)
+    client.use_guilds([guild])
+    populate_guild_database(guild)
+
+    humans = [member for member in guild.members if not member.bot]
+    ctx = FakeContext(client, guild, humans[0], guild.text_channels[0])
+    on_message, utility, emote_update = EventMemberMessage(client), Utility(client), EventGuildEmoteUpdate(client)
+
+    scenarios = {}
+    scenarios["on_message"] = await _measure(((lambda message=message: on_message.on_message(message)) for message in messages), "messages")
+    scenarios["scanall"] = await _measure([lambda: utility.scanall.callback(utility, ctx)])
+    scenarios["scanall"]["messages per second"] = round(len(messages) / scenarios["scanall"]["seconds"], 1)
+    scenarios["guild_emoji"] = await _measure([lambda: utility.guild_emoji(ctx)] * COMMAND_RUNS)
+    members = rng.choices(humans[:max(len(humans) // 10, 1)], k=COMMAND_RUNS)  # * The most active members
+    scenarios["user_emoji"] = await _measure((lambda member=member: utility.user_emoji(ctx, member)) for member in members)
+    scenarios["emoji_update"] = await _emoji_updates(emote_update, guild)
+    scenarios["member_burst"] = await _member_burst(client, guild)
+    with redirect_stdout(io.StringIO()):  # * The invitation link printed by on_ready
+        scenarios["on_ready"] = await _measure([client.on_ready] * 5)
+    return scenarios
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic benchmark of the bot handlers.")
+    parser.add_argument("--size", choices=SIZES, default="medium")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON report in this file.")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO)
+    logging.getLogger().addHandler(logging.NullHandler())  # * The records are created but not written
+    with tempfile.TemporaryDirectory() as directory:
+        database.DATABASE_PATH = os.path.join(directory, "database.db")  # * Never touch the database of the bot
+        scenarios = asyncio.get_event_loop().run_until_complete(run(args.size, args.seed))
+        database.DBManager().connexion.close()
+
+    members, emojis, channels, messages = SIZES[args.size]
+    report = {"size": args.size, "seed": args.seed, "members": members, "emojis": emojis, "channels": channels,
+              "messages": messages, "python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+              "scenarios": scenarios}
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,18 @@
 import logging
 
+import discord
+
 from discord.ext import commands
 
 from check.bot_owner import check_if_bot_owner
-from constants import PREFIX
+from database import DBManager
+from counters import CounterEngine
+from loopmonitor import LoopMonitor
+from tracing import Tracer
+from dbprofile import DBProfiler
+from profiling import busy, profile_cpu, profile_memory
+from startup import PHASES
+from constants import PREFIX, HOT_STORE, DB_PROFILE_LIMIT, PROFILE_SECONDS, PROFILE_MAX_SECONDS
 
 class Development(commands.Cog):
     def __init__(self, client):
@@ -46,5 +55,128 @@ class Development(commands.Cog):
         else:
             await ctx.send(f"**{module}** rechargé.", delete_after=5)
 
+    @commands.command()
+    @commands.check_any(check_if_bot_owner())
+    async def startup(self, ctx):
+        logging.info(f"The user {ctx.author.name}:{ctx.author.id} has entered the command {PREFIX}startup .")
+        lines = [f"{name:<16}{seconds * 1000:>10.1f}ms" for name, seconds in PHASES.items()]
+        await ctx.send("🚀 **Démarrage du bot**```\n" + "\n".join(lines or ["Aucune mesure."]) + "```")
+
+    @commands.command(aliases=['globaltop'])
+    @commands.check_any(check_if_bot_owner())
+    async def globalemoji(self, ctx, limit : int = 10):
+        logging.info(f"The user {ctx.author.name}:{ctx.author.id} has entered the command {PREFIX}globalemoji {limit} .")
+        if HOT_STORE:
+            CounterEngine().snapshot()
+        top = DBManager().get_global_top_emoji(max(1, min(limit, 25)))  # * A message is limited to 2000 characters
+        if not top:
+            await ctx.send("Aucun emoji n'a encore été utilisé...", delete_after=60)
+            return
+
+        lines = []
+        for rank, (emote_id, guild_id, global_use) in enumerate(top, 1):
+            emoji, guild = self.client.get_emoji(emote_id), self.client.get_guild(guild_id)
+            lines.append(f"**{rank}.** {emoji or emote_id} ➙ **{global_use}** ({guild.name if guild else guild_id})")
+        await ctx.send("🌍 **Emojis les plus utilisés sur tous les serveurs**\n" + "\n".join(lines))
+
+    @commands.command(aliases=['lag'])
+    @commands.check_any(check_if_bot_owner())
+    async def looplag(self, ctx, action : str = ""):
+        logging.info(f"The user {ctx.author.name}:{ctx.author.id} has entered the command {PREFIX}looplag {action} .")
+        monitor = LoopMonitor()
+        if action == "reset":
+            monitor.reset()
+            await ctx.send("Statistiques de la boucle réinitialisées.", delete_after=5)
+            return
+
+        lag = monitor.lag
+        message = (f"⏱️ **Latence de la boucle** ({lag.total} mesures)\n"
+                   f"p50: {lag.percentile(0.5) * 1000:.1f}ms · p95: {lag.percentile(0.95) * 1000:.1f}ms · "
+                   f"p99: {lag.percentile(0.99) * 1000:.1f}ms · max: {lag.max * 1000:.1f}ms\n"
+                   f"Blocages détectés: {monitor.blocks}")
+        for stack, samples in monitor.stacks.most_common(3):
+            block = f"\n**{samples} échantillon(s):**```py\n{stack[-500:]}```"
+            if len(message) + len(block) > 2000:  # * A message is limited to 2000 characters
+                break
+            message += block
+        await ctx.send(message)
+
+    @commands.command(aliases=['trace'])
+    @commands.check_any(check_if_bot_owner())
+    async def tracing(self, ctx, action : str = ""):
+        logging.info(f"The user {ctx.author.name}:{ctx.author.id} has entered the command {PREFIX}tracing {action} .")
+        tracer = Tracer()
+        if action in ("on", "off"):
+            tracer.enabled = action == "on"
+            await ctx.send(f"Mesure des handlers {'activée' if tracer.enabled else 'désactivée'}.", delete_after=5)
+            return
+        elif action == "reset":
+            tracer.reset()
+            await ctx.send("Mesures des handlers réinitialisées.", delete_after=5)
+            return
+
+        lines = [f"{'handler':<32}{'appels':>8}{'erreurs':>8}{'p50':>9}{'p95':>9}{'p99':>9}"]
+        for name, calls, errors, p50, p95, p99 in tracer.snapshot():
+            line = f"{name[:31]:<32}{calls:>8}{errors:>8}{p50 * 1000:>7.1f}ms{p95 * 1000:>7.1f}ms{p99 * 1000:>7.1f}ms"
+            if sum(len(l) + 1 for l in lines) + len(line) > 1900:  # * A message is limited to 2000 characters
+                break
+            lines.append(line)
+        status = "activée" if tracer.enabled else "désactivée"
+        await ctx.send(f"⏱️ **Latence des handlers** (mesure {status})```\n" + "\n".join(lines) + "```")
+
+    @commands.command()
+    @commands.check_any(check_if_bot_owner())
+    async def dbprofile(self, ctx, action : str = ""):
+        logging.info(f"The user {ctx.author.name}:{ctx.author.id} has entered the command {PREFIX}dbprofile {action} .")
+        profiler = DBProfiler()
+        if action in ("on", "off"):
+            profiler.enable() if action == "on" else profiler.disable()
+            await ctx.send(f"Profilage SQL {'activé' if profiler.enabled else 'désactivé'}.", delete_after=5)
+            return
+        elif action == "reset":
+            profiler.reset()
+            await ctx.send("Mesures SQL réinitialisées.", delete_after=5)
+            return
+
+        status = "activé" if profiler.enabled else "désactivé"
+        message = f"🗄️ **Requêtes SQL les plus lentes** (profilage {status})"
+        for sql, stats in profiler.worst(DB_PROFILE_LIMIT):
+            # * A SCAN of a table in the plan is a lookup without index
+            plan = "\n".join(f"{'⚠️' if 'SCAN' in step and 'CONSTANT ROW' not in step else '  '} {step}" for step in profiler.query_plan(sql))
+            block = (f"```sql\n{sql[:300]}```{stats.executions} exécutions, {stats.calls} appels, "
+                     f"{stats.seconds * 1000:.1f}ms, ~{stats.steps} instructions\n```\n{plan or '-'}```")
+            if len(message) + len(block) > 1950:  # * A message is limited to 2000 characters
+                break
+            message += "\n" + block
+        await ctx.send(message)
+
+    async def _send_profile(self, ctx, kind: str, capture, seconds: int):
+        if busy():
+            await ctx.send("Un profilage est déjà en cours...", delete_after=10)
+            return
+        seconds = max(1, min(seconds, PROFILE_MAX_SECONDS))
+        await ctx.send(f"Profilage {kind} pendant {seconds}s...", delete_after=seconds)
+        try:
+            report, report_path, raw_path = await capture(seconds)
+        except (RuntimeError, ValueError) as error:  # * Another profiler is already running in the process
+            logging.warning(f"[PROFILE] The {kind} profile could not be started: {error}")
+            await ctx.send(f"Le profilage {kind} n'a pas pu démarrer: {error}", delete_after=30)
+            return
+        logging.info(f"[PROFILE] Report written to {report_path} and raw profile to {raw_path} .")
+        summary = report if len(report) <= 1900 else report[:1900].rsplit("\n", 1)[0] + "\n…"  # * 2000 characters
+        await ctx.send(f"```\n{summary}```", files=[discord.File(report_path), discord.File(raw_path)])
+
+    @commands.command(aliases=['cprofile'])
+    @commands.check_any(check_if_bot_owner())
+    async def cpuprofile(self, ctx, seconds : int = PROFILE_SECONDS):
+        logging.info(f"The user {ctx.author.name}:{ctx.author.id} has entered the command {PREFIX}cpuprofile {seconds} .")
+        await self._send_profile(ctx, "CPU", profile_cpu, seconds)
+
+    @commands.command(aliases=['tracemalloc'])
+    @commands.check_any(check_if_bot_owner())
+    async def memprofile(self, ctx, seconds : int = PROFILE_SECONDS):
+        logging.info(f"The user {ctx.author.name}:{ctx.author.id} has entered the command {PREFIX}memprofile {seconds} .")
+        await self._send_profile(ctx, "mémoire", profile_memory, seconds)
+
 def setup(client):
     client.add_cog(Development(client))
@@ -1,5 +1,7 @@
 import logging
 import re
+import typing
+from datetime import timezone
 from sqlite3 import OperationalError, IntegrityError
 import discord
 
@@ -9,13 +11,31 @@ from discord import NotFound, Colour
 from events.guildJoin import populate_guild_database
 from paginator import PaginatorBuilder, PaginatorController
 from database import DBManager
-from constants import PREFIX, DEV
+from counters import CounterEngine
+from history import UsageHistory, window_start
+from trending import TrendingCounters
+from cooccurrence import CooccurrenceCounters
+from hyperloglog import DistinctUsers
+from membership import MembershipQueue
+from emojistats import EmojiStats
+from export import EXPORTS, export_csv
+from metrics import SCANNED_MESSAGES
+from logpipeline import ROW_LOGGER
+from constants import PREFIX, DEV, HOT_STORE, HISTORY_PER_MEMBER, EMOJI_TOP_MEMBERS, COOCCURRENCE_LIMIT, DISTINCT_WINDOW, EXPORT_MAX_SIZE, LOW_MEMORY
 
 class ConvertMember(commands.MemberConverter):
     async def convert(self, ctx, arg):
         user = await super().convert(ctx, arg)
         return user
 
+class ConvertWindow(commands.Converter):
+    async def convert(self, ctx, arg):
+        # * Return the window and the timestamp of its beginning
+        try:
+            return arg, window_start(arg)
+        except ValueError:
+            raise commands.BadArgument(f"{arg} is not a valid window.")
+
 class Utility(commands.Cog):
     def __init__(self, client):
         self.client = client
@@ -40,89 +60,279 @@ class Utility(commands.Cog):
         else:
             return guild_emoji
 
-    async def user_emoji(self, ctx, member):
-
-        logging.info(f"Grabbing the emojis used by the member {member.display_name}{member.id} in the guild {ctx.guild.name}:{ctx.guild.id} .")
-        user_emotes = DBManager().get_emoji_member(member.id, ctx.guild.id)
-        emojis = await self._check_emoji_exists(ctx, user_emotes)
-        emojis = [emoji async for emoji in emojis]
-        if not emojis:
-            await ctx.send(f"{member.display_name} n'a pas encore envoyé(e) d'emoji provenant de ce serveur...", delete_after=60)
-            return
-
-        emojis.sort(key=lambda e: e[1], reverse=True)
-
-        content = [f"{emoji}**{emoji.name}  ➙  {count}**" for emoji, count in emojis]
-        
-        logging.info(f"Creating a paginator for the command {PREFIX}emoji {''.join(str(member.id))} entered by the user {ctx.author.name}:{ctx.author.id} .")
+    async def _send_paginator(self, ctx, command, title, description, fields, content, colour=None, loader=None):
+        # * Post the content in a paginator of 25 lines per page, deleted when the user closes it
+        logging.info(f"Creating a paginator for the command {PREFIX}{command} entered by the user {ctx.author.name}:{ctx.author.id} .")
         paginator = PaginatorController(self.client, ctx.author, ctx.channel)
-        logging.debug(f"Controller created")
         paginator.builder = PaginatorBuilder()
-        logging.debug(f"Builder created")
-        paginator.builder.base_embed_create(f"🌟 Liste des emojis utilisés par {member.display_name}",
-                                  f"❓ Le nombre après la flèche représente le nombre de fois où l'emoji a été utilisé.",
-                                  Colour.gold(),
-                                  field=[["📉 Trie:", " Par utilisation décroissante.", True], ["👉 Emote:", "Uniquement un membre.", True], ["\u200b", "\u200b", True]])
+        paginator.builder.base_embed_create(title, description, colour or Colour.gold(), field=fields)
         paginator.builder.prefix = "⭒"
         paginator.builder.content = content
+        paginator.builder.loader = loader
         paginator.builder.max_content = 25
         paginator.builder.content_builder(decorator="  ", separator="\n")
         paginator.builder.paginator_store()
         logging.debug(f"Paginator stored and will be posted")
-        
-        await paginator.paginator_static()
-        logging.info(f"Paginator created by the user {ctx.author.name}:{ctx.author.id} has been destroyed.")
-
-    async def guild_emoji(self, ctx):
 
-        logging.info(f"Grabbing the emojis used by the guild {ctx.guild.name}:{ctx.guild.id} .")
-        guild_emotes = DBManager().get_guild_emoji(ctx.guild.id)
+        result = await paginator.paginator_static()
+        if isinstance(result, bool):
+            await paginator.message.delete()
+        logging.info(f"Paginator created by the user {ctx.author.name}:{ctx.author.id} has been destroyed.")
 
-        emojis = await self._check_emoji_exists(ctx, guild_emotes)
+    async def _send_emoji_counts(self, ctx, emotes, command, title, scope, window, empty):
+        # * Paginator of the (emoji_id, count) of the guild or of a channel, sorted by decreasing use
+        emojis = await self._check_emoji_exists(ctx, emotes)
         emojis = [emoji async for emoji in emojis]
 
         if not emojis:
-            await ctx.send("Oups! Le serveur ne possède aucun emoji personnalisé...", delete_after=60)
+            await ctx.send(empty, delete_after=60)
             return
 
         emojis.sort(key=lambda e: e[1], reverse=True)
 
         content = [f"{emoji}**{emoji.name}  ➙  {count}**" for emoji, count in emojis]
 
-        logging.info(f"Creating a paginator for the command {PREFIX}emoji entered by the user {ctx.author.name}:{ctx.author.id} .")
-        paginator = PaginatorController(self.client, ctx.author, ctx.channel)
-        logging.debug(f"Controller created")
-        paginator.builder = PaginatorBuilder()
-        logging.debug(f"Builder created")
-        paginator.builder.base_embed_create(f"🌟 Liste des emojis utilisés sur le serveur",
-                                  f"❓ Le nombre après la flèche représente le nombre de fois où l'emoji a été utilisé.",
-                                  Colour.gold(),
-                                  field=[["📉 Trie:", " Par utilisation décroissante.", True], ["👉 Emote:", "Tout membre confondu.", True], ["\u200b", "\u200b", True]])
-        paginator.builder.prefix = "⭒"
-        paginator.builder.content = content
-        paginator.builder.max_content = 25
-        paginator.builder.content_builder(decorator="  ", separator="\n")
-        paginator.builder.paginator_store()
-        logging.debug(f"Paginator stored and will be posted")
+        await self._send_paginator(ctx, command, title,
+                                   f"❓ Le nombre après la flèche représente le nombre de fois où l'emoji a été utilisé.",
+                                   [["📉 Trie:", " Par utilisation décroissante.", True], ["👉 Emote:", scope, True], self._window_field(window)],
+                                   content)
+
+    @staticmethod
+    def _window_field(window):
+        return ["🕒 Période:", f"Depuis **{window[0]}**.", True] if window else ["\u200b", "\u200b", True]
+
+    async def _user_emoji_content(self, ctx, member, window=None):
+        # * Full list of the emojis used by the member, sorted by decreasing use
+        if window:
+            UsageHistory().flush()
+            user_emotes = DBManager().get_emoji_usage_since(ctx.guild.id, window[1], member.id)
+        elif HOT_STORE:
+            user_emotes = CounterEngine().get_emoji_member(member.id, ctx.guild.id)
+        else:
+            user_emotes = DBManager().get_emoji_member(member.id, ctx.guild.id)
+        emojis = await self._check_emoji_exists(ctx, user_emotes)
+        emojis = [emoji async for emoji in emojis]
+
+        emojis.sort(key=lambda e: int(e[1]), reverse=True)  # * The counters of the member blob are strings
+
+        return [f"{emoji}**{emoji.name}  ➙  {count}**" for emoji, count in emojis]
+
+    async def user_emoji(self, ctx, member, window=None):
+
+        logging.info(f"Grabbing the emojis used by the member {member.display_name}{member.id} in the guild {ctx.guild.name}:{ctx.guild.id} .")
+        if window and not HISTORY_PER_MEMBER:
+            await ctx.send("L'historique des emojis par membre n'est pas activé...", delete_after=60)
+            return
+
+        summary = DBManager().get_member_summary(member.id, ctx.guild.id) if not window and not HOT_STORE else None
+        if summary:
+            # * First page from the summary of the member, the full list is only loaded for the next pages
+            total, distinct, top, _ = summary
+            content = [f"{emoji}**{emoji.name}  ➙  {count}**" for emoji, count in
+                       ((self.client.get_emoji(emoji_id), count) for emoji_id, count in top) if emoji]
+            loader = (lambda: self._user_emoji_content(ctx, member)) if distinct > len(top) else None
+            description = f"\n📈 **{total}** utilisations de **{distinct}** emojis différents."
+        else:
+            content = await self._user_emoji_content(ctx, member, window)
+            loader, description = None, ""
+
+        if not content:
+            await ctx.send(f"{member.display_name} n'a pas encore envoyé(e) d'emoji provenant de ce serveur...", delete_after=60)
+            return
         
-        result = await paginator.paginator_static()
-        if isinstance(result, bool):
-            await paginator.message.delete()
-        logging.info(f"Paginator created by the user {ctx.author.name}:{ctx.author.id} has been destroyed.")
+        await self._send_paginator(ctx, f"emoji {member.id}", f"🌟 Liste des emojis utilisés par {member.display_name}",
+                                   f"❓ Le nombre après la flèche représente le nombre de fois où l'emoji a été utilisé.{description}",
+                                   [["📉 Trie:", " Par utilisation décroissante.", True], ["👉 Emote:", "Uniquement un membre.", True], self._window_field(window)],
+                                   content, loader=loader)
+
+    async def guild_emoji(self, ctx, window=None):
+
+        logging.info(f"Grabbing the emojis used by the guild {ctx.guild.name}:{ctx.guild.id} .")
+        if window:
+            UsageHistory().flush()
+            guild_emotes = DBManager().get_emoji_usage_since(ctx.guild.id, window[1])
+        elif HOT_STORE:
+            guild_emotes = CounterEngine().get_guild_emoji(ctx.guild.id)
+        else:
+            guild_emotes = DBManager().get_guild_emoji(ctx.guild.id)
+
+        await self._send_emoji_counts(ctx, guild_emotes, "emoji", f"🌟 Liste des emojis utilisés sur le serveur", "Tout membre confondu.",
+                                      window, "Oups! Le serveur ne possède aucun emoji personnalisé...")
+
+    async def channel_emoji(self, ctx, channel, window=None):
+
+        logging.info(f"Grabbing the emojis used in the channel {channel.name}:{channel.id} of the guild {ctx.guild.name}:{ctx.guild.id} .")
+        if window:
+            await ctx.send("L'historique des emojis n'est pas disponible par salon...", delete_after=60)
+            return
+
+        channel_emotes = dict(DBManager().get_channel_emoji(ctx.guild.id, channel.id))
+        if HOT_STORE:
+            # * Also the emojis first used in the channel since the last snapshot
+            for emoji_id, count in CounterEngine().get_channel_pending(ctx.guild.id, channel.id).items():
+                channel_emotes[emoji_id] = channel_emotes.get(emoji_id, 0) + count
+
+        await self._send_emoji_counts(ctx, channel_emotes.items(), f"emoji {channel.id}", f"🌟 Liste des emojis utilisés dans #{channel.name}",
+                                      f"Uniquement {channel.mention}.", window, f"Aucun emoji de ce serveur n'a encore été envoyé dans {channel.mention}...")
+
+    async def emoji_members(self, ctx, emoji, window=None):
+
+        logging.info(f"Grabbing the members who used the emoji {emoji.name}:{emoji.id} in the guild {ctx.guild.name}:{ctx.guild.id} .")
+        if emoji.guild_id != ctx.guild.id:
+            await ctx.send(f"L'emoji {emoji} ne provient pas de ce serveur...", delete_after=60)
+            return
+        if window and not HISTORY_PER_MEMBER:
+            await ctx.send("L'historique des emojis par membre n'est pas activé...", delete_after=60)
+            return
+        elif window:
+            UsageHistory().flush()
+            members = DBManager().get_emoji_top_members_since(ctx.guild.id, emoji.id, window[1], EMOJI_TOP_MEMBERS)
+        elif HOT_STORE:
+            members = CounterEngine().get_emoji_top_members(ctx.guild.id, emoji.id, EMOJI_TOP_MEMBERS)
+        else:
+            members = DBManager().get_emoji_top_members(ctx.guild.id, emoji.id, EMOJI_TOP_MEMBERS)
+
+        if not members:
+            await ctx.send(f"Personne n'a encore utilisé l'emoji {emoji} sur ce serveur...", delete_after=60)
+            return
+
+        distinct = DistinctUsers().count(ctx.guild.id, emoji.id, window[1] if window else window_start(DISTINCT_WINDOW))
+
+        content = []
+        for member_id, count in members:
+            member = ctx.guild.get_member(member_id)
+            content.append(f"**{member.display_name if member else f'<@{member_id}>'}  ➙  {count}**")
+
+        await self._send_paginator(ctx, f"emoji {emoji.id}", f"🌟 Membres ayant le plus utilisé {emoji.name}",
+                                   f"❓ Le nombre après la flèche représente le nombre de fois où {emoji} a été utilisé.\n"
+                                   f"👥 Environ **{distinct}** membres différents l'ont utilisé depuis {window[0] if window else DISTINCT_WINDOW}.",
+                                   [["📉 Trie:", " Par utilisation décroissante.", True], ["👉 Emote:", f"Uniquement {emoji}.", True], self._window_field(window)],
+                                   content)
 
     @commands.command(aliases=['emojis', 'emote', 'emotes'])
-    async def emoji(self, ctx, *member: ConvertMember, **kwargs):
+    async def emoji(self, ctx, target: typing.Optional[typing.Union[ConvertMember, commands.EmojiConverter, commands.TextChannelConverter]] = None, window: typing.Optional[ConvertWindow] = None):
         await ctx.send("Veillez patienter...", delete_after=3)
         try:
             await ctx.message.delete()
         except discord.errors.Forbidden:
             pass
 
-        logging.info(f"The user {ctx.author.name}:{ctx.author.id} has entered the command {PREFIX}emoji {''.join(str(member[0].id)) if member else ''} .")
-        if member:
-            await self.user_emoji(ctx, member[0])
+        logging.info(f"The user {ctx.author.name}:{ctx.author.id} has entered the command {PREFIX}emoji {target.id if target else ''} {window[0] if window else ''} .")
+        if isinstance(target, discord.Emoji):
+            await self.emoji_members(ctx, target, window)
+        elif isinstance(target, discord.TextChannel):
+            await self.channel_emoji(ctx, target, window)
+        elif target:
+            await self.user_emoji(ctx, target, window)
         else:
-            await self.guild_emoji(ctx)
+            await self.guild_emoji(ctx, window)
+
+    @commands.command(aliases=['emojistat', 'emotestats', 'stats'])
+    async def emojistats(self, ctx):
+        try:
+            await ctx.message.delete()
+        except discord.errors.Forbidden:
+            pass
+
+        logging.info(f"The user {ctx.author.name}:{ctx.author.id} has entered the command {PREFIX}emojistats .")
+        if HOT_STORE:
+            stats = EmojiStats.compute(*CounterEngine().get_guild_emoji_arrays(ctx.guild.id), ctx.guild.member_count)
+        else:
+            stats = EmojiStats.from_rows(DBManager().get_guild_emoji_stats(ctx.guild.id), ctx.guild.member_count)
+        logging.info(f"Emoji statistics of the guild {ctx.guild.name}:{ctx.guild.id} computed in {stats.elapsed * 1000:.3f}ms.")
+
+        content = []
+        for emoji_id, uses, share, users, per_member in zip(stats.emoji_ids.tolist(), stats.uses.tolist(), stats.share.tolist(),
+                                                            stats.users.tolist(), stats.per_member.tolist()):
+            emoji = self.client.get_emoji(emoji_id)
+            if emoji:
+                content.append(f"{emoji}**{emoji.name}  ➙  {uses}** · {share:.1%} · {users} membres · {per_member:.2f}/membre")
+
+        if not content:
+            await ctx.send("Oups! Le serveur ne possède aucun emoji personnalisé...", delete_after=60)
+            return
+
+        percentiles = " · ".join(f"p{rank}: {value:g}" for rank, value in stats.percentiles.items())
+        await self._send_paginator(ctx, "emojistats", f"📊 Statistiques des emojis du serveur",
+                                   f"❓ Utilisations, part du total, membres l'ayant utilisé et utilisations par membre du serveur.\n"
+                                   f"📈 **{stats.total}** utilisations · Gini **{stats.gini:.2f}** (0: usage égal, 1: un seul emoji) · "
+                                   f"{stats.concentration} emoji(s) font 80% des utilisations.\n"
+                                   f"📏 Utilisations par emoji: {percentiles}",
+                                   [["📉 Trie:", " Par utilisation décroissante.", True],
+                                    ["💀 Emojis morts:", f"{len(stats.dead)} jamais utilisé(s).", True],
+                                    ["⏱️ Calcul:", f"{stats.elapsed * 1000:.3f}ms", True]],
+                                   content)
+
+    @commands.command(aliases=['export'])
+    @commands.has_guild_permissions(manage_guild=True)
+    async def emojiexport(self, ctx, kind: str = "totals"):
+        logging.info(f"The user {ctx.author.name}:{ctx.author.id} has entered the command {PREFIX}emojiexport {kind} .")
+        if kind not in EXPORTS:
+            await ctx.send(f"Export inconnu, choisissez parmi: {', '.join(EXPORTS)}.", delete_after=60)
+            return
+
+        # * Write the counters still in memory before reading the database
+        if HOT_STORE:
+            CounterEngine().snapshot()
+        UsageHistory().flush()
+
+        file = await export_csv(self.client, ctx.guild.id, kind)
+        with file:
+            size = file.seek(0, 2)
+            file.seek(0)
+            logging.info(f"Export {kind} of the guild {ctx.guild.name}:{ctx.guild.id} written ({size} bytes).")
+            if size > EXPORT_MAX_SIZE:
+                await ctx.send(f"L'export **{kind}** est trop volumineux pour être envoyé sur Discord...", delete_after=60)
+                return
+            await ctx.send(f"📄 Export **{kind}** des emojis du serveur.", file=discord.File(file, filename=f"{ctx.guild.id}-{kind}.csv.gz"))
+
+    @commands.command(aliases=['trend', 'tendance'])
+    async def trending(self, ctx):
+        try:
+            await ctx.message.delete()
+        except discord.errors.Forbidden:
+            pass
+
+        logging.info(f"The user {ctx.author.name}:{ctx.author.id} has entered the command {PREFIX}trending .")
+        emojis = [(self.client.get_emoji(emoji_id), hour, day) for emoji_id, hour, day, _ in TrendingCounters().ranking(ctx.guild.id)]
+        emojis = [(emoji, hour, day) for emoji, hour, day in emojis if emoji and emoji.guild_id == ctx.guild.id]
+
+        if not emojis:
+            await ctx.send("Aucun emoji n'a été utilisé sur le serveur durant la dernière heure...", delete_after=60)
+            return
+
+        content = [f"{emoji}**{emoji.name}  ➙  {hour}** (1h) / {day} (24h)" for emoji, hour, day in emojis]
+
+        await self._send_paginator(ctx, "trending", f"🔥 Emojis tendance sur le serveur",
+                                   f"❓ Utilisations durant la dernière heure comparées aux dernières 24 heures.",
+                                   [["📈 Trie:", "Par tendance décroissante.", True], ["👉 Emote:", "Tout membre confondu.", True], ["\u200b", "\u200b", True]],
+                                   content, Colour.orange())
+
+    @commands.command(aliases=['cooccurrences', 'pairs'])
+    @commands.is_owner()
+    async def cooccurrence(self, ctx):
+        try:
+            await ctx.message.delete()
+        except discord.errors.Forbidden:
+            pass
+
+        logging.info(f"The user {ctx.author.name}:{ctx.author.id} has entered the command {PREFIX}cooccurrence .")
+        pairs = CooccurrenceCounters().correlated_pairs(ctx.guild.id, COOCCURRENCE_LIMIT)
+        content = []
+        for emote_a, emote_b, together, jaccard, npmi in pairs:
+            emoji_a, emoji_b = self.client.get_emoji(emote_a), self.client.get_emoji(emote_b)
+            if not emoji_a or not emoji_b:
+                continue
+            content.append(f"{emoji_a}{emoji_b}**  ➙  {jaccard:.0%}** (Jaccard) · {npmi:+.2f} (NPMI) · {together} messages")
+
+        if not content:
+            await ctx.send("Aucune paire d'emojis n'a encore été utilisée assez souvent sur ce serveur...", delete_after=60)
+            return
+
+        await self._send_paginator(ctx, "cooccurrence", f"🔗 Emojis utilisés ensemble sur le serveur",
+                                   f"❓ Part des messages contenant l'un des deux emojis qui contiennent les deux (Jaccard). Une paire proche de 100% peut être redondante.",
+                                   [["📉 Trie:", "Par Jaccard décroissant.", True], ["👉 Emote:", "Tout membre confondu.", True], ["\u200b", "\u200b", True]],
+                                   content, Colour.blurple())
 
     def _scan_emoji(self, message):
         found_emoji_id = map(lambda x: int(x), re.findall(r"(?:<?:\w+:)([^:][\d]*(?:::[^:][\d]*)*)>", message.content))
@@ -141,6 +351,11 @@ class Utility(commands.Cog):
 
     def _reset_guild_emotes(self, ctx):
         logging.info(f"Deleting the informations of the guild {ctx.guild.name}:{ctx.guild.id} .")
+        CounterEngine().invalidate(ctx.guild.id)
+        UsageHistory().discard(ctx.guild.id)
+        CooccurrenceCounters().discard(ctx.guild.id)
+        DistinctUsers().discard(ctx.guild.id)
+        MembershipQueue().discard(ctx.guild.id)
         try:
             DBManager().remove_existing_guild(ctx.guild.id)
         except (OperationalError, IntegrityError):
@@ -152,31 +367,51 @@ class Utility(commands.Cog):
 
         populate_guild_database(ctx.guild)
 
-    async def _checking_channels_history(self, ctx, user_emote):
+    async def _checking_channels_history(self, ctx, user_emote, channel_emote):
         for channel in ctx.guild.text_channels:
             logging.info(f"Checking the history of the text channel {channel.name}:{channel.id} from the guild {ctx.guild.name}:{ctx.guild.id} .")
 
             try:
                 async for message in channel.history(limit=None):
-                    for emoji in self._scan_emoji(message):
-                        logging.debug(f"New emoji found: {emoji}")
+                    SCANNED_MESSAGES.inc()
+                    if message.author.bot:  # * Not counted, as in on_message
+                        continue
+                    message_emojis = self._scan_emoji(message)
+                    if message_emojis and LOW_MEMORY:
+                        # * No member cache: the counters of an author are created on its first message with emojis
+                        user_emote.setdefault(message.author.id, [[emoji.id, 0] for emoji in ctx.guild.emojis])
+                    CooccurrenceCounters().add(ctx.guild.id, message_emojis)
+                    for emoji in message_emojis:
+                        ROW_LOGGER.debug("New emoji found: %s", emoji)
+                        UsageHistory().add(ctx.guild.id, emoji, message.author.id, message.created_at)
+                        channel_emote[(channel.id, emoji)] = channel_emote.get((channel.id, emoji), 0) + 1
+                        DistinctUsers().add(ctx.guild.id, emoji, message.author.id, message.created_at.replace(tzinfo=timezone.utc).timestamp())
                         user_emote[message.author.id] =  [[e[0], e[1] + 1] if e[0] == emoji else e for e in user_emote[message.author.id]]
             except discord.errors.Forbidden:
                 continue
 
+    def _increase_channel_counter(self, ctx, channel_emote):
+        logging.info(f"Increasing the counters of {len(channel_emote)} channel emojis for the guild {ctx.guild.name}:{ctx.guild.id}")
+        try:
+            DBManager().apply_emoji_deltas(ctx.guild.id, [], [(channel_id, emoji_id, use) for (channel_id, emoji_id), use in channel_emote.items()])
+        except OperationalError:
+            DBManager().connexion.rollback()
+            logging.exception(f"Task failed, the channel emoji counters of the guild {ctx.guild.name}:{ctx.guild.id} have not been increased.")
+
     async def _increase_member_counter(self, ctx, user_emote, global_emoji):
         for user_id, emojis in user_emote.items():
             user = self.client.get_user(user_id)
-            logging.info(f"Increasing the counter of emojis for the user {user.name}:{user_id}")
+            name = user.name if user else user_id  # * Not in the cache (LOW_MEMORY)
+            logging.info(f"Increasing the counter of emojis for the user {name}:{user_id}")
             for emoji_id, use in emojis:
-                logging.debug(f"Adding {emoji_id} to {user_id}")
+                ROW_LOGGER.debug("Adding %s to %s", emoji_id, user_id)
                 emoji = await ctx.guild.fetch_emoji(emoji_id)
                 try:
                     DBManager().add_emoji_member(user_id, ctx.guild.id, emoji_id, number=use)
                 except OperationalError:
-                    logging.exception(f"Task failed, the emoji counter {emoji.name}:{emoji_id} of the user {user.name}:{user_id} has not been increased.")
+                    logging.exception(f"Task failed, the emoji counter {emoji.name}:{emoji_id} of the user {name}:{user_id} has not been increased.")
                 else:
-                    logging.info(f"The emoji counter {emoji.name}:{emoji_id} of the user {user.name}:{user_id} has been increased.")
+                    ROW_LOGGER.info("The emoji counter %s:%s of the user %s:%s has been increased.", emoji.name, emoji_id, name, user_id)
                     global_emoji[emoji_id] += use
 
     async def _increase_global_counter(self, ctx, global_emoji):
@@ -202,13 +437,17 @@ class Utility(commands.Cog):
 
         logging.info(f"The user {ctx.author.name}:{ctx.author.id} has entered the command {PREFIX}scanall .")
 
+        # * LOW_MEMORY: the member cache is empty, the authors are added during the scan
         user_emote = {user.id: [[emoji.id, 0] for emoji in ctx.guild.emojis] for user in ctx.guild.members if not user.bot}
         global_emoji = {emoji.id: 0 for emoji in ctx.guild.emojis}
+        channel_emote = {}
 
         self._reset_guild_emotes(ctx)
-        await self._checking_channels_history(ctx, user_emote)
+        await self._checking_channels_history(ctx, user_emote, channel_emote)
         await  self._increase_member_counter(ctx, user_emote, global_emoji)
         await self._increase_global_counter(ctx, global_emoji)
+        self._increase_channel_counter(ctx, channel_emote)
+        CounterEngine().invalidate(ctx.guild.id)
 
         await ctx.send("Base de donnée alimentée!", delete_after=3)
 
@@ -10,6 +10,63 @@ KEY_DIRECTORY = f"{DIRECTORY}{OS_SLASH}keys{OS_SLASH}"
 EVENTS_DIRECTORY = f"{DIRECTORY}{OS_SLASH}events{OS_SLASH}"
 COGS_DIRECTORY = f"{DIRECTORY}{OS_SLASH}cogs{OS_SLASH}"
 LOGS_DIRECTORY = f"{DIRECTORY}{OS_SLASH}logs{OS_SLASH}"
+DATABASE_PATH = f"{DIRECTORY}{OS_SLASH}database.db"
 TIMEZONE = pytz.timezone('Europe/Paris')
 DEV = 232920242110726144
-MAX_SIZE = 800
\ No newline at end of file
+MAX_SIZE = 800
+HOT_STORE = False  # * Count the emojis in memory (counters.py) and write them in the database periodically
+SNAPSHOT_INTERVAL = 60  # * Seconds between two snapshots of the in-memory counters
+JOURNAL_FILE = f"{DIRECTORY}{OS_SLASH}database.journal"  # * Journal of the in-memory increments, replayed after a crash
+JOURNAL_GROUP_SIZE = 256  # * Maximum records written with a single fsync
+JOURNAL_SYNC_INTERVAL = 0.05  # * Seconds before a partial group of records is written
+HISTORY_PER_MEMBER = True  # * Also keep the usage history of each member
+HISTORY_BUFFER_SIZE = 5000  # * Buffered buckets before a write in the database
+HISTORY_FLUSH_INTERVAL = 30  # * Seconds between two writes of the usage history
+HISTORY_COMPACT_INTERVAL = 3600  # * Seconds between two compactions of the usage history
+HISTORY_HOURLY_RETENTION = 7 * 86400  # * Age (seconds) after which the hourly buckets are rolled up by day
+HISTORY_DAILY_RETENTION = 180 * 86400  # * Age (seconds) after which the daily buckets are rolled up by month
+HISTORY_MONTHLY_RETENTION = 730 * 86400  # * Age (seconds) after which the monthly buckets are deleted
+TRENDING_SLOTS = 1440  # * Per-minute slots kept for each emoji (24 hours)
+TRENDING_LIMIT = 50  # * Maximum emojis displayed by the trending command
+EMOJI_TOP_MEMBERS = 100  # * Maximum members displayed for a single emoji
+COOCCURRENCE_BUFFER_SIZE = 5000  # * Buffered pairs before a write in the database
+COOCCURRENCE_FLUSH_INTERVAL = 30  # * Seconds between two writes of the co-occurrence matrix
+COOCCURRENCE_MIN_SUPPORT = 3  # * Minimum messages with both emojis to report a pair
+COOCCURRENCE_LIMIT = 50  # * Maximum pairs displayed by the cooccurrence command
+HLL_PRECISION = 10  # * 2 ** HLL_PRECISION registers per sketch, error of 1.04 / sqrt(2 ** HLL_PRECISION) (do not change with stored sketches)
+HLL_RETENTION = 90 * 86400  # * Age (seconds) after which the daily distinct member sketches are deleted
+HLL_BUFFER_SIZE = 1000  # * Sketches kept in memory before a write in the database
+DISTINCT_WINDOW = "30d"  # * Default window of the distinct members of an emoji
+EXPORT_SPOOL_SIZE = 1024 * 1024  # * Bytes of a compressed export kept in memory before it is moved on the disk
+EXPORT_CHUNK = 1000  # * Rows written between two releases of the event loop during an export
+EXPORT_MAX_SIZE = 8 * 1024 * 1024  # * Maximum size of an attachment sent by the bot
+MEMBER_SUMMARY_TOP = 25  # * Emojis kept in the summary of a member (first page of ,emoji @member)
+LOOP_MONITOR_INTERVAL = 0.05  # * Seconds between two samples of the event loop lag
+LOOP_BLOCK_SAMPLING = False  # * Debug: record the stack of the callbacks blocking the event loop (watchdog thread)
+LOOP_BLOCK_THRESHOLD = 0.2  # * Seconds without a wake up of the lag monitor before the loop is considered blocked
+LOOP_BLOCK_STACK_DEPTH = 8  # * Innermost frames kept in a stack sample
+TRACING = True  # * Record the latency of the cog listeners and commands (can be toggled with the tracing command)
+TRACING_LOG_INTERVAL = 900  # * Seconds between two log lines of the handler latencies
+METRICS_PORT = 0  # * Port of the metrics endpoint (text exposition format) on localhost, 0 to disable it
+DB_PROFILE_PROGRESS_STEPS = 1000  # * Virtual machine instructions between two calls of the SQL profiler progress handler
+DB_PROFILE_LIMIT = 5  # * Statements displayed by the dbprofile command
+PROFILE_SECONDS = 30  # * Default duration of the cpuprofile and memprofile commands
+PROFILE_MAX_SECONDS = 600
+PROFILE_TOP = 20  # * Functions or allocation sites in the reports of the profiles
+TRACEMALLOC_FRAMES = 5  # * Frames stored by tracemalloc for each allocation (in the raw snapshot)
+LOG_MAX_BYTES = 10 * 1024 * 1024  # * Size of a log file before its rotation (the old files are compressed)
+LOG_BACKUP_COUNT = 10
+LOG_MESSAGE_LEVEL = "INFO"  # * Level of the records written for each message with emojis
+LOG_ROW_LEVEL = "INFO"  # * Level of the records written for each row (population of the database, scanall), DEBUG to see them
+LOG_RATE_LIMIT = 50  # * Records of a hot path logger kept every LOG_RATE_PERIOD seconds, the others are dropped
+LOG_RATE_PERIOD = 1.0
+GATEWAY_RECORD = False  # * Record the anonymized gateway events in LOGS_DIRECTORY (replayed by benchmarks/replay.py)
+GATEWAY_RECORD_FLUSH_INTERVAL = 10  # * Seconds
+SHARD_PROCESSES = 1  # * Processes running the shards of the bot, above 1 the writes go through a writer process (see shards.py)
+SHARD_COUNT = None  # * Total number of shards, None to use the count recommended by Discord (required with SHARD_PROCESSES > 1)
+WRITER_SOCKET = f"{DIRECTORY}{OS_SLASH}writer.sock"  # * Unix socket of the writer process
+WRITER_FLUSH_INTERVAL = 0.5  # * Seconds between two batches sent by a shard process to the writer process
+WRITER_BATCH_SIZE = 500  # * Buffered writes before a batch is sent without waiting for the interval
+LOW_MEMORY = False  # * No member cache and no member chunking, the members are created in the database on their first counted emoji
+MEMBER_QUEUE_SIZE = 1000  # * Queued member joins and leaves before a write in the database
+MEMBER_FLUSH_INTERVAL = 2  # * Seconds between two writes of the queued member joins and leaves
\ No newline at end of file
@@ -0,0 +1,77 @@
+from itertools import combinations
+
+from lazyimport import lazy_import
+from database import DBManager, DBSingletonMeta
+from flushbuffer import FlushBuffer
+from constants import COOCCURRENCE_BUFFER_SIZE, COOCCURRENCE_MIN_SUPPORT
+
+np = lazy_import("numpy")
+
+MESSAGES = 0  # * (0, 0) counts the messages with at least one emoji of the guild
+
+
+class CooccurrenceCounters(FlushBuffer, metaclass=DBSingletonMeta):
+    # * Sparse co-occurrence matrix of the emojis used in the same message.
+    # * Only the upper triangle is stored: (a, b) with a < b counts the messages with both emojis,
+    # * (a, a) counts the messages with the emoji a. The increments are buffered, then upserted.
+
+    NAME = "COOCCURRENCE"
+    SIZE = COOCCURRENCE_BUFFER_SIZE  # * Buffer: (guild_id, emote_a, emote_b) -> count
+
+    def add(self, guild_id: int, emoji_ids) -> None:
+        emojis = sorted(set(emoji_ids))
+        if not emojis:
+            return
+
+        buffer = self._buffer
+        for key in ((guild_id, MESSAGES, MESSAGES), *((guild_id, e, e) for e in emojis),
+                    *((guild_id, a, b) for a, b in combinations(emojis, 2))):
+            buffer[key] = buffer.get(key, 0) + 1
+
+        self._flush_if_full()
+
+    def _write(self, rows: dict) -> None:
+        DBManager().upsert_emote_pairs((*key, count) for key, count in rows.items())
+
+    def correlated_pairs(self, guild_id: int, limit: int) -> list:
+        """
+        correlated_pairs(self, guild_id, limit)
+
+        Rank the pairs of emojis used together, by Jaccard index.
+
+        Pairs seen in less than COOCCURRENCE_MIN_SUPPORT messages are ignored.
+
+        Returns
+        ----------
+        list
+            (emote_a, emote_b, messages together, jaccard, npmi) tuples sorted by decreasing Jaccard index.
+            The normalized PMI is 1 if the emojis are always used together, 0 if they are independent.
+        """
+        self.flush()
+        pairs = np.array(DBManager().get_emote_pairs(guild_id), dtype=np.int64).reshape(-1, 3)
+        if not len(pairs):
+            return []
+
+        a, b, count = pairs[:, 0], pairs[:, 1], pairs[:, 2]
+        total = count[(a == MESSAGES) & (b == MESSAGES)].sum()
+        diagonal = (a == b) & (a != MESSAGES)
+
+        # * Use of each emoji, indexed through searchsorted on the sorted emoji ids
+        emojis, uses = a[diagonal], count[diagonal]
+        order = np.argsort(emojis)
+        emojis, uses = emojis[order], uses[order]
+
+        off_diagonal = (a != b) & (count >= COOCCURRENCE_MIN_SUPPORT)
+        a, b, count = a[off_diagonal], b[off_diagonal], count[off_diagonal]
+        if not len(count) or not len(emojis):
+            return []
+        n_a = uses[np.clip(np.searchsorted(emojis, a), 0, len(emojis) - 1)]
+        n_b = uses[np.clip(np.searchsorted(emojis, b), 0, len(emojis) - 1)]
+
+        jaccard = count / np.maximum(n_a + n_b - count, 1)
+        p_ab = count / total
+        pmi = np.log(p_ab / ((n_a / total) * (n_b / total)))
+        npmi = np.where(p_ab < 1, pmi / -np.log(np.minimum(p_ab, 1 - 1e-12)), 1.0)
+
+        order = np.lexsort((-count, -jaccard))[:limit]
+        return [(int(a[i]), int(b[i]), int(count[i]), float(jaccard[i]), float(npmi[i])) for i in order]
@@ -0,0 +1,204 @@
+import logging
+
+from lazyimport import lazy_import
+from database import DBManager, DBSingletonMeta
+from journal import DeltaJournal
+
+np = lazy_import("numpy")
+
+
+class GuildCounters:
+    # * Dense members x emojis counter matrix of a single guild
+    # * The matrix grows by doubling its capacity, the ids are mapped to rows and columns
+
+    __slots__ = ("guild_id", "members", "emojis", "member_ids", "emoji_ids",
+                 "counts", "pending", "offset", "channels")
+
+    def __init__(self, guild_id: int, n_members: int = 8, n_emojis: int = 8):
+        self.guild_id = guild_id
+        self.members = {}  # * member_id -> row
+        self.emojis = {}  # * emoji_id -> column
+        self.member_ids = []
+        self.emoji_ids = []
+        self.counts = np.zeros((max(n_members, 1), max(n_emojis, 1)), dtype=np.int64)
+        self.pending = {}  # * (row, column) -> increments not written in the database yet, sparse between two snapshots
+        self.offset = np.zeros(self.counts.shape[1], dtype=np.int64)  # * Uses of members who left the guild
+        self.channels = {}  # * (channel_id, emoji_id) -> increments not written in the database yet
+
+    @classmethod
+    def from_database(cls, guild_id: int) -> "GuildCounters":
+        members = DBManager().get_guild_members_emoji(guild_id)
+        emotes = DBManager().get_guild_emoji(guild_id)
+
+        counters = cls(guild_id, len(members), len(emotes))
+        for emote_id, _ in emotes:
+            counters._column(emote_id)
+
+        for member_id, user_emote in members:
+            row = counters._row(member_id)
+            for emote_id, use in DBManager.parse_member_emote(user_emote).items():
+                counters.counts[row, counters._column(emote_id)] = use
+
+        for emote_id, global_use in emotes:
+            column = counters.emojis[emote_id]
+            counters.offset[column] = global_use - counters.counts[:, column].sum()
+        return counters
+
+    def _grow(self, rows: int, columns: int) -> None:
+        shape = (max(rows, self.counts.shape[0]), max(columns, self.counts.shape[1]))
+        if shape == self.counts.shape:
+            return
+
+        counts = np.zeros(shape, dtype=np.int64)
+        offset = np.zeros(shape[1], dtype=np.int64)
+        counts[:self.counts.shape[0], :self.counts.shape[1]] = self.counts
+        offset[:self.offset.shape[0]] = self.offset
+        self.counts, self.offset = counts, offset
+
+    def _row(self, member_id: int) -> int:
+        row = self.members.get(member_id)
+        if row is None:
+            row = len(self.member_ids)
+            if row >= self.counts.shape[0]:
+                self._grow(row * 2, 0)
+            self.members[member_id] = row
+            self.member_ids.append(member_id)
+        return row
+
+    def _column(self, emoji_id: int) -> int:
+        column = self.emojis.get(emoji_id)
+        if column is None:
+            column = len(self.emoji_ids)
+            if column >= self.counts.shape[1]:
+                self._grow(0, column * 2)
+            self.emojis[emoji_id] = column
+            self.emoji_ids.append(emoji_id)
+        return column
+
+    @property
+    def _view(self) -> "np.ndarray":
+        return self.counts[:len(self.member_ids), :len(self.emoji_ids)]
+
+    def increment(self, member_id: int, emoji_id: int, number: int = 1, channel_id: int = 0) -> None:
+        row, column = self._row(member_id), self._column(emoji_id)
+        self.counts[row, column] += number
+        self.pending[(row, column)] = self.pending.get((row, column), 0) + number
+        if channel_id:
+            self.channels[(channel_id, emoji_id)] = self.channels.get((channel_id, emoji_id), 0) + number
+
+    def restore(self, deltas: list, channel_deltas: list) -> None:
+        # * Put back drained increments (the database write failed)
+        for member_id, emoji_id, number in deltas:
+            key = (self.members[member_id], self.emojis[emoji_id])
+            self.pending[key] = self.pending.get(key, 0) + number
+        for channel_id, emoji_id, number in channel_deltas:
+            self.channels[(channel_id, emoji_id)] = self.channels.get((channel_id, emoji_id), 0) + number
+
+    def channel_pending(self, channel_id: int) -> dict:
+        return {emoji_id: number for (channel, emoji_id), number in self.channels.items() if channel == channel_id}
+
+    def totals(self) -> list:
+        # * Guild total of each emoji, sorted by decreasing use
+        totals = self._view.sum(axis=0) + self.offset[:len(self.emoji_ids)]
+        order = np.argsort(-totals, kind="stable")
+        return [(self.emoji_ids[i], int(totals[i])) for i in order]
+
+    def emoji_arrays(self) -> tuple:
+        # * Emoji ids, guild totals and number of members who used each emoji
+        view = self._view
+        return (np.array(self.emoji_ids, dtype=np.int64), view.sum(axis=0) + self.offset[:len(self.emoji_ids)],
+                np.count_nonzero(view, axis=0))
+
+    def member_ranking(self, member_id: int) -> list:
+        # * Emojis used by a member, sorted by decreasing use
+        row = self.members.get(member_id)
+        if row is None:
+            return []
+
+        counts = self.counts[row, :len(self.emoji_ids)]
+        order = np.argsort(-counts, kind="stable")
+        return [(self.emoji_ids[i], int(counts[i])) for i in order if counts[i]]
+
+    def emoji_ranking(self, emoji_id: int) -> list:
+        # * Members who used an emoji, sorted by decreasing use
+        column = self.emojis.get(emoji_id)
+        if column is None:
+            return []
+
+        counts = self.counts[:len(self.member_ids), column]
+        order = np.argsort(-counts, kind="stable")
+        return [(self.member_ids[i], int(counts[i])) for i in order if counts[i]]
+
+    def drain(self) -> tuple:
+        # * Return the pending increments as (member_id, emoji_id, number) and (channel_id, emoji_id, number), then reset them
+        deltas = [(self.member_ids[row], self.emoji_ids[column], number) for (row, column), number in self.pending.items() if number]
+        self.pending = {}
+        channel_deltas = [(channel_id, emoji_id, number) for (channel_id, emoji_id), number in self.channels.items()]
+        self.channels = {}
+        return deltas, channel_deltas
+
+
+class CounterEngine(metaclass=DBSingletonMeta):
+    # * Optional in-memory hot store of the emoji counters (see HOT_STORE in constants.py).
+    # * The counters are loaded lazily per guild, DBManager stays the durable store
+    # * and receives the pending increments on each snapshot.
+    # * Each increment is written in the DeltaJournal first, so a crash does not lose it.
+
+    def __init__(self):
+        self._guilds = {}
+
+    def guild(self, guild_id: int) -> GuildCounters:
+        counters = self._guilds.get(guild_id)
+        if counters is None:
+            logging.info(f"[HOT] Loading the counters of the guild {guild_id} .")
+            counters = self._guilds[guild_id] = GuildCounters.from_database(guild_id)
+        return counters
+
+    def add_emoji_use(self, guild_id: int, member_id: int, emoji_id: int, number=1, channel_id: int = 0) -> None:
+        counters = self.guild(guild_id)
+        DeltaJournal().append(guild_id, channel_id, member_id, emoji_id, number)
+        counters.increment(member_id, emoji_id, number, channel_id)
+
+    def get_channel_pending(self, guild_id: int, channel_id: int) -> dict:
+        # * Channel increments not written in the database yet
+        counters = self._guilds.get(guild_id)
+        return counters.channel_pending(channel_id) if counters else {}
+
+    def get_guild_emoji(self, guild_id: int) -> list:
+        return self.guild(guild_id).totals()
+
+    def get_guild_emoji_arrays(self, guild_id: int) -> tuple:
+        return self.guild(guild_id).emoji_arrays()
+
+    def get_emoji_member(self, member_id: int, guild_id: int) -> list:
+        return self.guild(guild_id).member_ranking(member_id)
+
+    def get_emoji_top_members(self, guild_id: int, emoji_id: int, limit: int) -> list:
+        return self.guild(guild_id).emoji_ranking(emoji_id)[:limit]
+
+    def snapshot(self) -> None:
+        # * Checkpoint: write the pending increments of every guild in a single transaction, then truncate the journal
+        guild_deltas = {guild_id: deltas for guild_id, deltas in
+                        ((counters.guild_id, counters.drain()) for counters in self._guilds.values()) if any(deltas)}
+        if not guild_deltas:
+            return
+
+        journal = DeltaJournal()
+        try:
+            DBManager().checkpoint_emoji_deltas(guild_deltas, journal.generation)
+        except Exception:
+            # * Put back the increments, they will be written during the next snapshot
+            DBManager().connexion.rollback()
+            for guild_id, (deltas, channel_deltas) in guild_deltas.items():
+                self._guilds[guild_id].restore(deltas, channel_deltas)
+            raise
+        journal.truncate()
+        logging.debug(f"[HOT] {sum(len(deltas) for deltas, _ in guild_deltas.values())} counters written in the database.")
+
+    def invalidate(self, guild_id: int) -> None:
+        # * Forget the counters of a guild, they will be reloaded from the database on the next access
+        # * The journal covers every guild, a full checkpoint is needed before dropping the increments
+        if guild_id not in self._guilds:
+            return
+        self.snapshot()
+        del self._guilds[guild_id]
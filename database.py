@@ -1,11 +1,13 @@
 import sqlite3
-import os
+import heapq
+import time
 from functools import wraps
+from operator import itemgetter
+from urllib.request import pathname2url
 import logging
 
-import numpy as np
-
-from constants import DIRECTORY
+from metrics import DB_WRITES
+from constants import DATABASE_PATH, MEMBER_SUMMARY_TOP
 
 
 class _DBDecorators:
@@ -49,9 +51,25 @@ class _DBDecorators:
     def auto_commit(cls, func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            start = time.perf_counter()
             func(*args, **kwargs)
             DBInstance = args[0]
-            DBInstance.connexion.commit()
+            if not DBInstance.batching:  # * The writer process commits a whole batch at once (see writer.py)
+                DBInstance.connexion.commit()
+            DB_WRITES.observe(time.perf_counter() - start)
+        return wrapper
+
+    @classmethod
+    def shared_write(cls, func):
+        # * In a shard process, the call is sent to the writer process which owns the database (see shards.py)
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            DBInstance = args[0]
+            if DBInstance.writer is not None:
+                DBInstance.writer.submit(func.__name__, args[1:], kwargs)
+                return
+            return func(*args, **kwargs)
+        wrapper.shared_write = True
         return wrapper
     
 
@@ -68,11 +86,19 @@ class DBSingletonMeta(type):
 class DBManager(metaclass=DBSingletonMeta):
     # * Represents the whole class which control the cat database.
     # * The class is a Singleton, each instance return the same class instance.
+    # * The database is opened by the first call (Bot.start_bot), not at the import of the module.
+    # * In a shard process, the connection is read-only and the writes go to the writer process (see shards.py).
     
-    DB = sqlite3.connect(os.path.join(DIRECTORY, "database.db")) # ? Connection to the cat sqlite3 DB
-    
-    def __init__(self):
-        self._connexion = self.DB
+    def __init__(self, path: str = None, read_only: bool = False, writer=None):
+        self.writer = writer
+        self.batching = False
+        self.path = path or DATABASE_PATH
+        if read_only:
+            # * The schema is created by the writer process
+            self._connexion = self.open_read_only()
+            self._cursor = self.connexion.cursor()
+            return
+        self._connexion = sqlite3.connect(self.path) # ? Connection to the cat sqlite3 DB
         self._cursor = self.connexion.cursor()   
         self.on_db_launch(cursor=self._cursor)            
         
@@ -83,6 +109,10 @@ class DBManager(metaclass=DBSingletonMeta):
     @connexion.setter
     def connexion(self, *args, **kwargs):
         raise AttributeError # ! Avoid user manually create a connection
+
+    def open_read_only(self) -> sqlite3.Connection:
+        # * New read-only connection to the database, closed by the caller
+        return sqlite3.connect(f"file:{pathname2url(self.path)}?mode=ro", uri=True)
     
     @property
     def cursor(self):
@@ -98,7 +128,38 @@ class DBManager(metaclass=DBSingletonMeta):
     @_DBDecorators.auto_commit
     def on_db_launch(self, cursor):
         logging.info("[DB] Initialization...")
+        self.cursor.execute("PRAGMA journal_mode = WAL")  # * The read-only connections (shards, exports) are not blocked by the writes
         self.cursor.execute("PRAGMA foreign_keys = ON")
+        self._create_journal_table  # * Tables added after the first release, also created in existing databases
+        self._create_usage_table
+        self._create_emote_member_table
+        self._create_emote_pair_table
+        self._create_channel_emote_table
+        self._create_emote_sketch_table
+        self._create_emote_leaderboard_index
+        self._create_member_summary_table
+        self._create_lookup_indexes
+        self._replay_journal()
+
+    def _replay_journal(self) -> None:
+        # * Apply the increments of the delta journal which are not in the database yet (crash of the bot)
+        from journal import read_journal
+
+        generation, records = read_journal()
+        if not records or generation <= self.journal_generation():
+            return
+
+        logging.warning(f"[DB] Replaying {len(records)} records of the delta journal (generation {generation})...")
+        guild_deltas = {}
+        for guild_id, channel_id, member_id, emoji_id, delta in records:
+            deltas, channel_deltas = guild_deltas.setdefault(guild_id, ([], []))
+            deltas.append((member_id, emoji_id, delta))
+            if channel_id:
+                channel_deltas.append((channel_id, emoji_id, delta))
+        for guild_id, (deltas, channel_deltas) in guild_deltas.items():
+            self._apply_emoji_deltas(guild_id, deltas, channel_deltas)
+        self._set_journal_generation(generation)
+        logging.info("[DB] Delta journal replayed!")
     
     @property 
     @_DBDecorators.auto_commit
@@ -138,6 +199,187 @@ class DBManager(metaclass=DBSingletonMeta):
                     """)
         logging.info("[DB] Emote table successfully created!")
 
+    @property
+    @_DBDecorators.auto_commit
+    def _create_journal_table(self) -> None:
+        self.cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS journal(
+                        generation INTEGER NOT NULL
+                    );
+                    """)
+        self.cursor.execute("""
+                    INSERT INTO journal(generation)
+                    SELECT 0
+                    WHERE NOT EXISTS(SELECT 1 FROM journal);
+                    """)
+        logging.info("[DB] Journal table successfully created!")
+
+    @property
+    @_DBDecorators.auto_commit
+    def _create_usage_table(self) -> None:
+        # * granularity: 0 hour, 1 day, 2 month | bucket: timestamp of the beginning of the bucket
+        # * member_id is 0 for the guild-wide buckets
+        self.cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS emote_usage(
+                        guild_id INTEGER NOT NULL,
+                        emote_id INTEGER NOT NULL,
+                        member_id INTEGER NOT NULL DEFAULT 0,
+                        granularity INTEGER NOT NULL,
+                        bucket INTEGER NOT NULL,
+                        count INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (guild_id, emote_id, member_id, granularity, bucket),
+                        FOREIGN KEY (guild_id) REFERENCES guilds(guild_id) ON DELETE CASCADE
+                    ) WITHOUT ROWID;
+                    """)
+        self.cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS emote_usage_window
+                    ON emote_usage(guild_id, member_id, bucket);
+                    """)
+        logging.info("[DB] Emote usage table successfully created!")
+
+    @property
+    @_DBDecorators.auto_commit
+    def _create_emote_member_table(self) -> None:
+        # * Reverse index of the member counters (members.user_emote), by emoji
+        self.cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS emote_members(
+                        guild_id INTEGER NOT NULL,
+                        emote_id INTEGER NOT NULL,
+                        member_id INTEGER NOT NULL,
+                        count INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (guild_id, emote_id, member_id),
+                        FOREIGN KEY (guild_id) REFERENCES guilds(guild_id) ON DELETE CASCADE
+                    ) WITHOUT ROWID;
+                    """)
+        self.cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS emote_members_ranking
+                    ON emote_members(guild_id, emote_id, count DESC);
+                    """)
+        if not self.cursor.execute("SELECT 1 FROM emote_members LIMIT 1").fetchone():
+            self._rebuild_emote_members()
+        logging.info("[DB] Emote member table successfully created!")
+
+    @property
+    @_DBDecorators.auto_commit
+    def _create_emote_pair_table(self) -> None:
+        # * Sparse co-occurrence matrix (upper triangle), emote_a = emote_b counts the messages with the emoji
+        self.cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS emote_pairs(
+                        guild_id INTEGER NOT NULL,
+                        emote_a INTEGER NOT NULL,
+                        emote_b INTEGER NOT NULL,
+                        count INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (guild_id, emote_a, emote_b),
+                        FOREIGN KEY (guild_id) REFERENCES guilds(guild_id) ON DELETE CASCADE
+                    ) WITHOUT ROWID;
+                    """)
+        logging.info("[DB] Emote pair table successfully created!")
+
+    @property
+    @_DBDecorators.auto_commit
+    def _create_channel_emote_table(self) -> None:
+        self.cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS channel_emotes(
+                        guild_id INTEGER NOT NULL,
+                        channel_id INTEGER NOT NULL,
+                        emote_id INTEGER NOT NULL,
+                        count INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (guild_id, channel_id, emote_id),
+                        FOREIGN KEY (guild_id) REFERENCES guilds(guild_id) ON DELETE CASCADE
+                    ) WITHOUT ROWID;
+                    """)
+        logging.info("[DB] Channel emote table successfully created!")
+
+    @property
+    @_DBDecorators.auto_commit
+    def _create_emote_sketch_table(self) -> None:
+        # * HyperLogLog sketch (zlib compressed registers) of the members who used an emoji during a day
+        self.cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS emote_sketches(
+                        guild_id INTEGER NOT NULL,
+                        emote_id INTEGER NOT NULL,
+                        day INTEGER NOT NULL,
+                        registers BLOB NOT NULL,
+                        PRIMARY KEY (guild_id, emote_id, day),
+                        FOREIGN KEY (guild_id) REFERENCES guilds(guild_id) ON DELETE CASCADE
+                    ) WITHOUT ROWID;
+                    """)
+        logging.info("[DB] Emote sketch table successfully created!")
+
+    @property
+    @_DBDecorators.auto_commit
+    def _create_emote_leaderboard_index(self) -> None:
+        # * Bot-wide ranking of the emojis, kept up to date by SQLite in the transaction of each global_use update
+        # * emote_id is the rowid of the emotes table, the index alone answers the top-K query
+        self.cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS emotes_leaderboard
+                    ON emotes(global_use DESC, guild_id);
+                    """)
+        logging.info("[DB] Emote leaderboard index successfully created!")
+
+    @property
+    @_DBDecorators.auto_commit
+    def _create_lookup_indexes(self) -> None:
+        # * The members are looked up by (guild_id, member_id) and the emotes by guild_id, without these indexes
+        # * each lookup scans the whole table (see the dbprofile command)
+        self.cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS members_lookup
+                    ON members(guild_id, member_id);
+                    """)
+        self.cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS emotes_guild
+                    ON emotes(guild_id);
+                    """)
+        logging.info("[DB] Lookup indexes successfully created!")
+
+    @property
+    @_DBDecorators.auto_commit
+    def _create_member_summary_table(self) -> None:
+        # * Total, number of distinct emojis and top MEMBER_SUMMARY_TOP emojis ('emoji_id:use;' format, sorted) of a member
+        # * version is incremented on each update of the member counters
+        self.cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS member_summaries(
+                        guild_id INTEGER NOT NULL,
+                        member_id INTEGER NOT NULL,
+                        total INTEGER NOT NULL DEFAULT 0,
+                        distinct_emotes INTEGER NOT NULL DEFAULT 0,
+                        top_emotes TEXT NOT NULL DEFAULT ';',
+                        version INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (guild_id, member_id),
+                        FOREIGN KEY (guild_id) REFERENCES guilds(guild_id) ON DELETE CASCADE
+                    ) WITHOUT ROWID;
+                    """)
+        if not self.cursor.execute("SELECT 1 FROM member_summaries LIMIT 1").fetchone():
+            self.cursor.execute("SELECT guild_id, member_id, user_emote FROM members WHERE user_emote != ';'")
+            rows = self.cursor.fetchall()
+            self._set_member_summaries((guild_id, member_id, self.parse_member_emote(user_emote))
+                                       for guild_id, member_id, user_emote in rows)
+        logging.info("[DB] Member summary table successfully created!")
+
+    def _rebuild_emote_members(self) -> None:
+        # * Fill the reverse index from the member counters (database created before the index)
+        self.cursor.execute("SELECT guild_id, member_id, user_emote FROM members WHERE user_emote != ';'")
+        rows = [(guild_id, emote_id, member_id, count)
+                for guild_id, member_id, user_emote in self.cursor.fetchall()
+                for emote_id, count in self.parse_member_emote(user_emote).items()]
+        self.cursor.executemany("""
+        INSERT OR REPLACE INTO emote_members(guild_id, emote_id, member_id, count)
+        VALUES (?, ?, ?, ?)
+        """, rows)
+        if rows:
+            logging.info(f"[DB] {len(rows)} member counters added in the emote member index.")
+
+    def journal_generation(self) -> int:
+        # * Last generation of the delta journal written in the database
+        return self.cursor.execute("SELECT generation FROM journal").fetchone()[0]
+
+    def _set_journal_generation(self, generation: int) -> None:
+        self.cursor.execute("""
+        UPDATE journal
+        SET generation = ?
+        """, (generation,))
+
+    @_DBDecorators.shared_write
     @_DBDecorators.auto_commit
     def add_new_guild(self, guild_id: int) -> None:
         self.cursor.execute("""
@@ -147,6 +389,7 @@ class DBManager(metaclass=DBSingletonMeta):
         );    
         """, (guild_id,)*2)
 
+    @_DBDecorators.shared_write
     @_DBDecorators.auto_commit
     def remove_existing_guild(self, guild_id: int) -> None:
         self.cursor.execute("""
@@ -154,22 +397,78 @@ class DBManager(metaclass=DBSingletonMeta):
         WHERE guild_id = ?
         """, (guild_id,))
 
+    @_DBDecorators.shared_write
     @_DBDecorators.auto_commit
     def add_new_member(self, guild_id: int, member_id: int) -> None:
+        self._add_missing_member(guild_id, member_id)
+
+    def _add_missing_member(self, guild_id: int, member_id: int) -> bool:
+        # * Without commit, also used by the counters: a member is created on its first counted emoji
+        # * when LOW_MEMORY or when its join is still in the member queue (see membership.py)
+        # * Returns False when nothing was added (member already there or guild not in the database)
         self.cursor.execute("""
         INSERT INTO members(member_id, guild_id) 
         SELECT ?, ?
+        WHERE EXISTS(SELECT 1 FROM guilds WHERE guild_id = ?)
+        AND NOT EXISTS(SELECT 1 FROM members WHERE member_id = ? AND guild_id = ?
+        );    
+        """, (member_id, guild_id, guild_id, member_id, guild_id))
+        return self.cursor.rowcount > 0
+
+    @_DBDecorators.shared_write
+    @_DBDecorators.auto_commit
+    def add_new_members(self, guild_id: int, member_ids) -> None:
+        # * Many members in a single transaction (integrity check of the startup)
+        self.cursor.executemany("""
+        INSERT INTO members(member_id, guild_id) 
+        SELECT ?, ?
         WHERE NOT EXISTS(SELECT 1 FROM members WHERE member_id = ? AND guild_id = ?
         );    
-        """, (member_id, guild_id)*2)
+        """, ((member_id, guild_id)*2 for member_id in member_ids))
 
+    @_DBDecorators.shared_write
     @_DBDecorators.auto_commit
     def remove_existing_member(self, guild_id: int, member_id: int) -> None:
         self.cursor.execute("""
         DELETE FROM members
         WHERE guild_id = ? AND member_id = ?
         """, (guild_id, member_id))
+        self.cursor.execute("""
+        DELETE FROM emote_members
+        WHERE guild_id = ? AND member_id = ?
+        """, (guild_id, member_id))
+        self.cursor.execute("""
+        DELETE FROM member_summaries
+        WHERE guild_id = ? AND member_id = ?
+        """, (guild_id, member_id))
+
+    @_DBDecorators.shared_write
+    @_DBDecorators.auto_commit
+    def apply_member_changes(self, joins, leaves) -> None:
+        # * Batch of (guild_id, member_id) joins and leaves of the member queue (see membership.py) in a single transaction
+        # * The members of a guild which is not in the database anymore are ignored
+        self.cursor.executemany("""
+        INSERT INTO members(member_id, guild_id) 
+        SELECT ?, ?
+        WHERE EXISTS(SELECT 1 FROM guilds WHERE guild_id = ?)
+        AND NOT EXISTS(SELECT 1 FROM members WHERE member_id = ? AND guild_id = ?
+        );    
+        """, ((member_id, guild_id, guild_id, member_id, guild_id) for guild_id, member_id in joins))
+        leaves = list(leaves)
+        self.cursor.executemany("""
+        DELETE FROM members
+        WHERE guild_id = ? AND member_id = ?
+        """, leaves)
+        self.cursor.executemany("""
+        DELETE FROM emote_members
+        WHERE guild_id = ? AND member_id = ?
+        """, leaves)
+        self.cursor.executemany("""
+        DELETE FROM member_summaries
+        WHERE guild_id = ? AND member_id = ?
+        """, leaves)
 
+    @_DBDecorators.shared_write
     @_DBDecorators.auto_commit
     def add_new_emoji(self, guild_id: int, emote_id: int) -> None:
         self.cursor.execute("""
@@ -179,12 +478,39 @@ class DBManager(metaclass=DBSingletonMeta):
         );    
         """, (emote_id, guild_id)*2)
 
+    @_DBDecorators.shared_write
+    @_DBDecorators.auto_commit
+    def add_new_emojis(self, guild_id: int, emote_ids) -> None:
+        self.cursor.executemany("""
+        INSERT INTO emotes(emote_id, guild_id) 
+        SELECT ?, ?
+        WHERE NOT EXISTS(SELECT 1 FROM emotes WHERE emote_id = ? AND guild_id = ?
+        );    
+        """, ((emote_id, guild_id)*2 for emote_id in emote_ids))
+
+    @_DBDecorators.shared_write
     @_DBDecorators.auto_commit
     def remove_existing_emoji(self, guild_id: int, emote_id: int) -> None:
         self.cursor.execute("""
         DELETE FROM emotes
         WHERE guild_id = ? AND emote_id = ?
         """, (guild_id, emote_id))
+        self.cursor.execute("""
+        DELETE FROM emote_members
+        WHERE guild_id = ? AND emote_id = ?
+        """, (guild_id, emote_id))
+        self.cursor.execute("""
+        DELETE FROM emote_pairs
+        WHERE guild_id = ? AND (emote_a = ? OR emote_b = ?)
+        """, (guild_id, emote_id, emote_id))
+        self.cursor.execute("""
+        DELETE FROM channel_emotes
+        WHERE guild_id = ? AND emote_id = ?
+        """, (guild_id, emote_id))
+        self.cursor.execute("""
+        DELETE FROM emote_sketches
+        WHERE guild_id = ? AND emote_id = ?
+        """, (guild_id, emote_id))
        
     @staticmethod
     def __reformat_db_emote(emoji_id: int, emotes: str, number: int, add=True) -> str:
@@ -204,6 +530,15 @@ class DBManager(metaclass=DBSingletonMeta):
 
         return ";".join(":".join(i) for i in new_object) + ";"
 
+    @staticmethod
+    def parse_member_emote(emotes: str) -> dict:
+        # * Parse the 'emoji_id:use;' member format into an ordered {emoji_id: use} dictionary
+        return {int(emoji_id): int(use) for emoji_id, use in (object_.split(":") for object_ in emotes.split(';') if object_)}
+
+    @staticmethod
+    def format_member_emote(emotes: dict) -> str:
+        return "".join(f"{emoji_id}:{use};" for emoji_id, use in emotes.items()) or ";"
+
     def used_member_emoji(self, member_id: int, guild_id: int) -> str:
         self.cursor.execute("""
         SELECT user_emote
@@ -224,48 +559,379 @@ class DBManager(metaclass=DBSingletonMeta):
         WHERE member_id = ? AND guild_id = ?
         """, (new_emoji, member_id, guild_id))
 
+    def _set_member_summaries(self, members) -> None:
+        # * members: iterable of (guild_id, member_id, {emoji_id: use}) with the new counters of the members
+        self.cursor.executemany("""
+        INSERT INTO member_summaries(guild_id, member_id, total, distinct_emotes, top_emotes, version)
+        VALUES (?, ?, ?, ?, ?, 1)
+        ON CONFLICT(guild_id, member_id)
+        DO UPDATE SET total = excluded.total, distinct_emotes = excluded.distinct_emotes,
+        top_emotes = excluded.top_emotes, version = version + 1
+        """, ((guild_id, member_id, sum(emotes.values()), len(emotes),
+               self.format_member_emote(dict(heapq.nlargest(MEMBER_SUMMARY_TOP, emotes.items(), key=itemgetter(1)))))
+              for guild_id, member_id, emotes in members))
+
+    def get_member_summary(self, member_id: int, guild_id: int) -> tuple:
+        # * (total, distinct_emotes, [(emoji_id, use), ...] sorted by decreasing use, version) or None
+        row = self.cursor.execute("""
+        SELECT total, distinct_emotes, top_emotes, version
+        FROM member_summaries
+        WHERE guild_id = ? AND member_id = ?
+        """, (guild_id, member_id)).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], list(self.parse_member_emote(row[2]).items()), row[3]
+
+    def _add_emote_member(self, guild_id: int, emote_id: int, member_id: int, number: int) -> None:
+        self.cursor.execute("""
+        INSERT INTO emote_members(guild_id, emote_id, member_id, count)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(guild_id, emote_id, member_id)
+        DO UPDATE SET count = count + excluded.count
+        """, (guild_id, emote_id, member_id, number))
+
+    @_DBDecorators.shared_write
     def remove_emoji_member(self, member_id: int, guild_id: int, emoji_id: int, number = 1) -> None:
         user_emotes = self.used_member_emoji(member_id, guild_id)
         new_user_emotes = self.__reformat_db_emote(emoji_id, user_emotes, number, add=False)
         if user_emotes == new_user_emotes:
             return
+        self.cursor.execute("""
+        DELETE FROM emote_members
+        WHERE guild_id = ? AND emote_id = ? AND member_id = ?
+        """, (guild_id, emoji_id, member_id))
         self._update_member_emoji(new_user_emotes, member_id, guild_id)
+        self._set_member_summaries(((guild_id, member_id, self.parse_member_emote(new_user_emotes)),))
+
+    def get_emoji_member_ids(self, guild_id: int, emote_id: int) -> list:
+        # * Members with a counter of the emoji, without the member cache of discord.py
+        self.cursor.execute("""
+        SELECT member_id
+        FROM emote_members
+        WHERE guild_id = ? AND emote_id = ?
+        """, (guild_id, emote_id))
+
+        return [row[0] for row in self.cursor.fetchall()]
+
+    def get_emoji_top_members(self, guild_id: int, emote_id: int, limit: int) -> list:
+        self.cursor.execute("""
+        SELECT member_id, count
+        FROM emote_members
+        WHERE guild_id = ? AND emote_id = ? AND count > 0
+        ORDER BY count DESC
+        LIMIT ?
+        """, (guild_id, emote_id, limit))
+
+        return self.cursor.fetchall()
+
+    def get_emoji_top_members_since(self, guild_id: int, emote_id: int, since: int, limit: int) -> list:
+        self.cursor.execute("""
+        SELECT member_id, SUM(count)
+        FROM emote_usage
+        WHERE guild_id = ? AND emote_id = ? AND member_id != 0 AND bucket >= ?
+        GROUP BY member_id
+        ORDER BY 2 DESC
+        LIMIT ?
+        """, (guild_id, emote_id, since, limit))
+
+        return self.cursor.fetchall()
 
     def get_guild_emoji(self, guild_id):
         self.cursor.execute("""
         SELECT emote_id, global_use
         FROM emotes
-        INNER JOIN guilds
-        ON guilds.guild_id = emotes.guild_id
-        WHERE guilds.guild_id = ?
+        WHERE guild_id = ?
         """, (guild_id,))
 
         return self.cursor.fetchall()
 
+    def get_global_top_emoji(self, limit: int) -> list:
+        # * (emote_id, guild_id, global_use) of the most used emojis of every guild
+        self.cursor.execute("""
+        SELECT emote_id, guild_id, global_use
+        FROM emotes
+        WHERE global_use > 0
+        ORDER BY global_use DESC
+        LIMIT ?
+        """, (limit,))
+
+        return self.cursor.fetchall()
+
+    def get_guild_emoji_stats(self, guild_id: int) -> list:
+        # * (emote_id, global_use, members who used it) of every emoji of the guild, unused ones included
+        self.cursor.execute("""
+        SELECT emotes.emote_id, emotes.global_use, COUNT(emote_members.member_id)
+        FROM emotes
+        LEFT JOIN emote_members
+        ON emote_members.guild_id = emotes.guild_id AND emote_members.emote_id = emotes.emote_id AND emote_members.count > 0
+        WHERE emotes.guild_id = ?
+        GROUP BY emotes.emote_id
+        """, (guild_id,))
+
+        return self.cursor.fetchall()
+
+    def get_guild_members_emoji(self, guild_id: int) -> list:
+        self.cursor.execute("""
+        SELECT member_id, user_emote
+        FROM members
+        WHERE guild_id = ?
+        """, (guild_id,))
+
+        return self.cursor.fetchall()
+
+    @_DBDecorators.shared_write
+    @_DBDecorators.auto_commit
+    def add_message_emojis(self, guild_id: int, channel_id: int, member_id: int, emoji_ids: list) -> None:
+        # * Count every emoji of a message (member, guild, index and channel counters) in a single transaction
+        self._apply_emoji_deltas(guild_id,
+                                 [(member_id, emoji_id, 1) for emoji_id in emoji_ids],
+                                 [(channel_id, emoji_id, 1) for emoji_id in emoji_ids])
+
+    @_DBDecorators.shared_write
+    @_DBDecorators.auto_commit
+    def apply_emoji_deltas(self, guild_id: int, deltas: list, channel_deltas=()) -> None:
+        # * Write a batch of (member_id, emoji_id, number) and (channel_id, emoji_id, number) increments in a single transaction
+        self._apply_emoji_deltas(guild_id, deltas, channel_deltas)
+
+    @_DBDecorators.shared_write
+    @_DBDecorators.auto_commit
+    def checkpoint_emoji_deltas(self, guild_deltas: dict, generation: int) -> None:
+        # * Write the increments of every guild and the journal generation they come from in a single transaction
+        # * guild_deltas: {guild_id: (member deltas, channel deltas)}
+        for guild_id, (deltas, channel_deltas) in guild_deltas.items():
+            self._apply_emoji_deltas(guild_id, deltas, channel_deltas)
+        self._set_journal_generation(generation)
+
+    def get_channel_emoji(self, guild_id: int, channel_id: int) -> list:
+        self.cursor.execute("""
+        SELECT channel_emotes.emote_id, channel_emotes.count
+        FROM channel_emotes
+        INNER JOIN emotes
+        ON emotes.emote_id = channel_emotes.emote_id
+        WHERE channel_emotes.guild_id = ? AND channel_emotes.channel_id = ?
+        """, (guild_id, channel_id))
+
+        return self.cursor.fetchall()
+
+    def _apply_emoji_deltas(self, guild_id: int, deltas: list, channel_deltas=()) -> None:
+        member_deltas = {}
+        global_deltas = {}
+        for member_id, emoji_id, number in deltas:
+            member_emotes = member_deltas.setdefault(member_id, {})
+            member_emotes[emoji_id] = member_emotes.get(emoji_id, 0) + number
+            global_deltas[emoji_id] = global_deltas.get(emoji_id, 0) + number
+
+        index_deltas = []
+        summaries = []
+        for member_id, emotes in member_deltas.items():
+            row = self.cursor.execute("""
+            SELECT user_emote
+            FROM members
+            WHERE member_id = ? AND guild_id = ?
+            """, (member_id, guild_id)).fetchone()
+            if row is None:
+                if not self._add_missing_member(guild_id, member_id):  # * First counted emoji of the member
+                    continue  # * Guild not in the database
+                row = (";",)
+            index_deltas.extend((guild_id, emoji_id, member_id, number) for emoji_id, number in emotes.items())
+
+            user_emotes = self.parse_member_emote(row[0])
+            for emoji_id, number in emotes.items():
+                user_emotes[emoji_id] = user_emotes.get(emoji_id, 0) + number
+
+            self.cursor.execute("""
+            UPDATE members
+            SET user_emote = ?
+            WHERE member_id = ? AND guild_id = ?
+            """, (self.format_member_emote(user_emotes), member_id, guild_id))
+            summaries.append((guild_id, member_id, user_emotes))
+
+        self.cursor.executemany("""
+        INSERT INTO emote_members(guild_id, emote_id, member_id, count)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(guild_id, emote_id, member_id)
+        DO UPDATE SET count = count + excluded.count
+        """, index_deltas)
+        self._set_member_summaries(summaries)
+        self.cursor.executemany("""
+        UPDATE emotes
+        SET global_use = global_use + ?
+        WHERE guild_id = ? AND emote_id = ?
+        """, ((number, guild_id, emoji_id) for emoji_id, number in global_deltas.items()))
+        self.cursor.executemany("""
+        INSERT INTO channel_emotes(guild_id, channel_id, emote_id, count)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(guild_id, channel_id, emote_id)
+        DO UPDATE SET count = count + excluded.count
+        """, ((guild_id, channel_id, emoji_id, number) for channel_id, emoji_id, number in channel_deltas))
+
+    @_DBDecorators.shared_write
     def add_emoji_member(self, member_id: int, guild_id: int, emoji_id: int, number = 1) -> None:
+        self._add_missing_member(guild_id, member_id)  # * First counted emoji of the member
         user_emotes = self.used_member_emoji(member_id, guild_id)
         new_user_emotes = self.__reformat_db_emote(emoji_id, user_emotes, number, add=True)
 
+        self._add_emote_member(guild_id, emoji_id, member_id, number)
         self._update_member_emoji(new_user_emotes, member_id, guild_id)
+        self._set_member_summaries(((guild_id, member_id, self.parse_member_emote(new_user_emotes)),))
 
     def get_emoji_member(self, member_id: int, guild_id: int) -> None:
         user_emotes = self.used_member_emoji(member_id, guild_id)
         return [emote.split(":") for emote in user_emotes.split(';') if emote]
 
+    @_DBDecorators.shared_write
+    @_DBDecorators.auto_commit
+    def upsert_emote_usage(self, rows) -> None:
+        # * rows: iterable of (guild_id, emote_id, member_id, granularity, bucket, count)
+        # * The rows of a guild which is not in the database anymore are ignored
+        self.cursor.executemany("""
+        INSERT INTO emote_usage(guild_id, emote_id, member_id, granularity, bucket, count)
+        SELECT ?, ?, ?, ?, ?, ?
+        WHERE EXISTS(SELECT 1 FROM guilds WHERE guild_id = ?)
+        ON CONFLICT(guild_id, emote_id, member_id, granularity, bucket)
+        DO UPDATE SET count = count + excluded.count
+        """, ((*row, row[0]) for row in rows))
+
+    @_DBDecorators.shared_write
+    @_DBDecorators.auto_commit
+    def rollup_emote_usage(self, source: int, target: int, before: int, bucket) -> None:
+        # * Merge the buckets of the source granularity older than before into the target granularity
+        # * bucket is the function giving the target bucket of a timestamp
+        self.cursor.execute("""
+        SELECT guild_id, emote_id, member_id, bucket, count
+        FROM emote_usage
+        WHERE granularity = ? AND bucket < ?
+        """, (source, before))
+
+        rollup = {}
+        for guild_id, emote_id, member_id, timestamp, count in self.cursor.fetchall():
+            key = (guild_id, emote_id, member_id, target, bucket(timestamp))
+            rollup[key] = rollup.get(key, 0) + count
+
+        self.cursor.execute("""
+        DELETE FROM emote_usage
+        WHERE granularity = ? AND bucket < ?
+        """, (source, before))
+        self.cursor.executemany("""
+        INSERT INTO emote_usage(guild_id, emote_id, member_id, granularity, bucket, count)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(guild_id, emote_id, member_id, granularity, bucket)
+        DO UPDATE SET count = count + excluded.count
+        """, ((*key, count) for key, count in rollup.items()))
+
+    @_DBDecorators.shared_write
+    @_DBDecorators.auto_commit
+    def prune_emote_usage(self, granularity: int, before: int) -> None:
+        self.cursor.execute("""
+        DELETE FROM emote_usage
+        WHERE granularity = ? AND bucket < ?
+        """, (granularity, before))
+
+    def get_emoji_usage_since(self, guild_id: int, since: int, member_id: int = 0) -> list:
+        # * Uses of the guild emojis since the timestamp (member_id 0 is the whole guild)
+        self.cursor.execute("""
+        SELECT emote_usage.emote_id, SUM(emote_usage.count)
+        FROM emote_usage
+        INNER JOIN emotes
+        ON emotes.emote_id = emote_usage.emote_id
+        WHERE emote_usage.guild_id = ? AND emote_usage.member_id = ? AND emote_usage.bucket >= ?
+        GROUP BY emote_usage.emote_id
+        """, (guild_id, member_id, since))
+
+        return self.cursor.fetchall()
+
+    @staticmethod
+    def iter_guild_emoji(connexion, guild_id: int):
+        # * The export methods read on a connection of the export (see open_read_only): the rows are read lazily
+        # * and a rollback of self.connexion, which resets its cursors, does not stop them
+        # * Their order follows the primary keys and indexes, SQLite does not have to sort the rows in memory
+        return connexion.execute("""
+        SELECT emote_id, global_use
+        FROM emotes
+        WHERE guild_id = ?
+        ORDER BY emote_id
+        """, (guild_id,))
+
+    @staticmethod
+    def iter_guild_members_emoji(connexion, guild_id: int):
+        return connexion.execute("""
+        SELECT emote_id, member_id, count
+        FROM emote_members
+        WHERE guild_id = ? AND count > 0
+        ORDER BY emote_id, count DESC
+        """, (guild_id,))
+
+    @staticmethod
+    def iter_guild_emoji_usage(connexion, guild_id: int):
+        return connexion.execute("""
+        SELECT emote_id, member_id, granularity, bucket, count
+        FROM emote_usage
+        WHERE guild_id = ?
+        ORDER BY emote_id, member_id, granularity, bucket
+        """, (guild_id,))
+
+    @_DBDecorators.shared_write
+    @_DBDecorators.auto_commit
+    def upsert_emote_pairs(self, rows) -> None:
+        # * rows: iterable of (guild_id, emote_a, emote_b, count)
+        # * The rows of a guild which is not in the database anymore are ignored
+        self.cursor.executemany("""
+        INSERT INTO emote_pairs(guild_id, emote_a, emote_b, count)
+        SELECT ?, ?, ?, ?
+        WHERE EXISTS(SELECT 1 FROM guilds WHERE guild_id = ?)
+        ON CONFLICT(guild_id, emote_a, emote_b)
+        DO UPDATE SET count = count + excluded.count
+        """, ((*row, row[0]) for row in rows))
+
+    def get_emote_sketches_since(self, guild_id: int, emote_id: int, since: int) -> list:
+        self.cursor.execute("""
+        SELECT registers
+        FROM emote_sketches
+        WHERE guild_id = ? AND emote_id = ? AND day >= ?
+        """, (guild_id, emote_id, since))
+
+        return [row[0] for row in self.cursor.fetchall()]
+
+    @_DBDecorators.shared_write
+    @_DBDecorators.auto_commit
+    def merge_emote_sketches(self, rows, merge) -> None:
+        # * rows: iterable of (guild_id, emote_id, day, registers), merged with the stored sketch of the same key
+        # * merge is the function giving the registers of the union of two sketches, run by SQLite in the writing process
+        # * The rows of a guild which is not in the database anymore are ignored
+        self.connexion.create_function("merge_sketches", 2, merge, deterministic=True)
+        self.cursor.executemany("""
+        INSERT INTO emote_sketches(guild_id, emote_id, day, registers)
+        SELECT ?, ?, ?, ?
+        WHERE EXISTS(SELECT 1 FROM guilds WHERE guild_id = ?)
+        ON CONFLICT(guild_id, emote_id, day)
+        DO UPDATE SET registers = merge_sketches(registers, excluded.registers)
+        """, ((*row, row[0]) for row in rows))
+
+    @_DBDecorators.shared_write
+    @_DBDecorators.auto_commit
+    def prune_emote_sketches(self, before: int) -> None:
+        self.cursor.execute("""
+        DELETE FROM emote_sketches
+        WHERE day < ?
+        """, (before,))
+
+    def get_emote_pairs(self, guild_id: int) -> list:
+        self.cursor.execute("""
+        SELECT emote_a, emote_b, count
+        FROM emote_pairs
+        WHERE guild_id = ?
+        """, (guild_id,))
+
+        return self.cursor.fetchall()
+
+    @_DBDecorators.shared_write
     @_DBDecorators.auto_commit
     def add_global_emoji_use(self, guild_id: int, emoji_id: int, number=1):
         self.cursor.execute("""
         UPDATE emotes
-        SET global_use = ? + (
-        SELECT global_use
-        FROM emotes
-        INNER JOIN guilds
-        ON guilds.guild_id = emotes.guild_id
-        WHERE guilds.guild_id = ? and emotes.emote_id = ?
-        )
-        WHERE guild_id = ? and emote_id = ?
-        ;
-        """, (number, guild_id, emoji_id, guild_id, emoji_id))
+        SET global_use = global_use + ?
+        WHERE guild_id = ? AND emote_id = ?
+        """, (number, guild_id, emoji_id))
 
 if __name__ == "__main__":
     
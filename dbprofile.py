@@ -0,0 +1,133 @@
+import re
+import time
+import sqlite3
+import logging
+
+from database import DBManager, DBSingletonMeta
+from constants import DB_PROFILE_PROGRESS_STEPS
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+SPACES = re.compile(r"\s+")
+
+
+def normalize(sql: str) -> str:
+    # * Same text for the template of a statement and its expanded form (values written by the trace callback)
+    return SPACES.sub(" ", LITERALS.sub("?", sql)).strip()
+
+
+class StatementStats:
+    __slots__ = ("executions", "calls", "seconds", "steps")
+
+    def __init__(self):
+        self.executions = 0  # * Runs of the statement seen by the trace callback (one per row of an executemany)
+        self.calls = 0  # * execute, executemany and fetch calls of the cursor
+        self.seconds = 0.0
+        self.steps = 0  # * Virtual machine instructions, by groups of DB_PROFILE_PROGRESS_STEPS
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    # * Cursor of DBManager while the profiler is enabled, the time of each call is given to its statement
+
+    def _record(self, sql: str, start: float) -> None:
+        if not sql:
+            return
+        stats = DBProfiler().statement(sql)
+        stats.calls += 1
+        stats.seconds += time.perf_counter() - start
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._sql = sql
+            self._record(sql, start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._sql = sql
+            self._record(sql, start)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._record(getattr(self, "_sql", ""), start)
+
+    def fetchall(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._record(getattr(self, "_sql", ""), start)
+
+
+class DBProfiler(metaclass=DBSingletonMeta):
+    # * Opt-in profiler of the SQL statements of DBManager.
+    # * The trace callback counts the runs of each statement, the progress handler counts the virtual machine
+    # * instructions of the running statement and the profiling cursor measures the time of each call.
+
+    def __init__(self):
+        self.enabled = False
+        self.statements = {}  # * normalized statement -> StatementStats
+        self._current = None
+        self._cursor = None
+
+    def statement(self, sql: str) -> StatementStats:
+        key = normalize(sql)
+        stats = self.statements.get(key)
+        if stats is None:
+            stats = self.statements[key] = StatementStats()
+        return stats
+
+    def _on_statement(self, sql: str) -> None:
+        self._current = self.statement(sql)
+        self._current.executions += 1
+
+    def _on_progress(self) -> int:
+        if self._current:
+            self._current.steps += DB_PROFILE_PROGRESS_STEPS
+        return 0  # * Never interrupt the statement
+
+    def enable(self) -> None:
+        if self.enabled:
+            return
+        manager = DBManager()
+        manager.connexion.set_trace_callback(self._on_statement)
+        manager.connexion.set_progress_handler(self._on_progress, DB_PROFILE_PROGRESS_STEPS)
+        self._cursor, manager._cursor = manager._cursor, manager.connexion.cursor(factory=ProfilingCursor)
+        self.enabled = True
+        logging.info("[DB] SQL profiler enabled.")
+
+    def disable(self) -> None:
+        if not self.enabled:
+            return
+        manager = DBManager()
+        manager.connexion.set_trace_callback(None)
+        manager.connexion.set_progress_handler(None, 0)
+        manager._cursor, self._cursor = self._cursor, None
+        self._current = None
+        self.enabled = False
+        logging.info("[DB] SQL profiler disabled.")
+
+    def reset(self) -> None:
+        self.statements = {}
+        self._current = None
+
+    def worst(self, limit: int) -> list:
+        # * (statement, StatementStats) sorted by decreasing cumulative time, the EXPLAIN of the report excluded
+        statements = [item for item in self.statements.items() if not item[0].startswith("EXPLAIN")]
+        return sorted(statements, key=lambda item: item[1].seconds, reverse=True)[:limit]
+
+    @staticmethod
+    def query_plan(sql: str) -> list:
+        # * EXPLAIN QUERY PLAN of a normalized statement, the parameters are bound to NULL
+        try:
+            rows = DBManager().connexion.execute(f"EXPLAIN QUERY PLAN {sql}", (None,) * sql.count("?")).fetchall()
+        except sqlite3.Error:
+            return []
+        return [row[-1] for row in rows]
@@ -0,0 +1,71 @@
+import time
+
+from lazyimport import lazy_import
+
+np = lazy_import("numpy")
+
+PERCENTILES = (25, 50, 75, 90, 99)
+CONCENTRATION = 0.8  # * Share of the uses for the concentration (80% of the uses are made with N emojis)
+
+
+class EmojiStats:
+    # * Usage statistics of the emojis of a guild, computed with vectorized operations
+    # * The emojis are sorted by decreasing use, the dead emojis (never used) are at the end
+
+    __slots__ = ("emoji_ids", "uses", "share", "users", "per_member", "total",
+                 "gini", "percentiles", "dead", "concentration", "elapsed")
+
+    @classmethod
+    def compute(cls, emoji_ids, uses, users, member_count: int) -> "EmojiStats":
+        """
+        compute(emoji_ids, uses, users, member_count)
+
+        Compute the statistics from the counters of a guild.
+
+        Parameters
+        ----------
+        emoji_ids : array_like
+            The ids of the emojis of the guild.
+        uses : array_like
+            The number of uses of each emoji.
+        users : array_like
+            The number of members who used each emoji.
+        member_count : int
+            The number of members of the guild.
+
+        Notes
+        ----------
+        The Gini coefficient is 0 when every emoji is used as much as the others,
+        and tends to 1 when a single emoji makes all the uses.
+        """
+        start = time.perf_counter()
+        stats = cls()
+        uses = np.asarray(uses, dtype=np.int64)
+        order = np.argsort(-uses, kind="stable")
+        stats.emoji_ids = np.asarray(emoji_ids, dtype=np.int64)[order]
+        stats.uses = uses = uses[order]
+        stats.users = np.asarray(users, dtype=np.int64)[order]
+        stats.total = total = int(uses.sum())
+
+        stats.share = uses / total if total else np.zeros(len(uses))
+        stats.per_member = uses / max(member_count, 1)
+        stats.dead = stats.emoji_ids[uses == 0]
+
+        n = len(uses)
+        if n and total:
+            ascending = uses[::-1]
+            stats.gini = float(2 * np.dot(np.arange(1, n + 1), ascending) / (n * total) - (n + 1) / n)
+            stats.percentiles = dict(zip(PERCENTILES, np.percentile(uses, PERCENTILES)))
+            stats.concentration = int(np.searchsorted(np.cumsum(stats.share), CONCENTRATION) + 1)
+        else:
+            stats.gini = 0.0
+            stats.percentiles = dict.fromkeys(PERCENTILES, 0.0)
+            stats.concentration = 0
+        stats.elapsed = time.perf_counter() - start
+        return stats
+
+    @classmethod
+    def from_rows(cls, rows: list, member_count: int) -> "EmojiStats":
+        # * Rows of DBManager.get_guild_emoji_stats: (emote_id, global_use, users)
+        emoji_ids, uses, users = np.array(rows, dtype=np.int64).reshape(-1, 3).T
+        return cls.compute(emoji_ids, uses, users, member_count)
@@ -0,0 +1,28 @@
+import logging
+import sqlite3
+
+from discord.ext import commands, tasks
+
+from cooccurrence import CooccurrenceCounters
+from constants import COOCCURRENCE_FLUSH_INTERVAL
+
+
+class EventEmoteCooccurrence(commands.Cog):
+    def __init__(self, client):
+        self.client = client
+        self.flush_cooccurrence.start()
+
+    def cog_unload(self):
+        self.flush_cooccurrence.cancel()
+        CooccurrenceCounters().flush()
+
+    @tasks.loop(seconds=COOCCURRENCE_FLUSH_INTERVAL)
+    async def flush_cooccurrence(self):
+        try:
+            CooccurrenceCounters().flush()
+        except sqlite3.Error:  # * Any error, the loop must keep flushing
+            logging.exception("Task failed, the emoji co-occurrence matrix has not been written in the database.")
+
+
+def setup(client):
+    client.add_cog(EventEmoteCooccurrence(client))
@@ -4,6 +4,8 @@ from sqlite3 import OperationalError, IntegrityError
 from discord.ext import commands
 
 from database import DBManager
+from counters import CounterEngine
+from logpipeline import ROW_LOGGER
 
 
 class EventGuildEmoteUpdate(commands.Cog):
@@ -28,21 +30,29 @@ class EventGuildEmoteUpdate(commands.Cog):
         emoji = next(iter(emoji))
         logging.info(f"The guild {guild.name}:{guild.id} has removed an emoji: {emoji.name}:{emoji.id} .")
         logging.info(f"Cleaning up the database informations of the emoji {emoji.name}:{emoji.id} ...")
+
+        # * The members who used the emoji come from the database, not from the member cache (see LOW_MEMORY)
+        try:
+            member_ids = DBManager().get_emoji_member_ids(guild.id, emoji.id)
+        except OperationalError:
+            logging.exception(f"Task failed, the members who used the emoji {emoji.name}:{emoji.id} have not been found.")
+            member_ids = []
         
         try:
+            CounterEngine().invalidate(guild.id)
             DBManager().remove_existing_emoji(guild.id, emoji.id)
         except (OperationalError, IntegrityError):
             logging.exception(f"Task failed, the database information of the emoji {emoji.name}:{emoji.id} has not been deleted.")
         else:
             logging.info(f"The database information of the emoji {emoji.name}:{emoji.id} has been deleted.")
         
-        for member in guild.members:
+        for member_id in member_ids:
             try:
-                DBManager().remove_emoji_member(member.id, guild.id, emoji.id)
+                DBManager().remove_emoji_member(member_id, guild.id, emoji.id)
             except OperationalError:
-                logging.exception(f"Task failed, the database information of the emoji {emoji.name}:{emoji.id} has not been deleted from the member {member.display_name}:{member.id}.")
+                logging.exception(f"Task failed, the database information of the emoji {emoji.name}:{emoji.id} has not been deleted from the member {member_id}.")
             else:
-                logging.debug(f"The database information of the emoji {emoji.name}:{emoji.id} has been deleted from the member {member.display_name}:{member.id}.")
+                ROW_LOGGER.debug("The database information of the emoji %s:%s has been deleted from the member %s.", emoji.name, emoji.id, member_id)
 
     @commands.Cog.listener()
     async def on_guild_emojis_update(self, guild, before, after):
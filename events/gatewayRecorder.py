@@ -0,0 +1,60 @@
+import logging
+
+from discord.ext import commands, tasks
+
+from recorder import GatewayRecorder
+from constants import GATEWAY_RECORD, GATEWAY_RECORD_FLUSH_INTERVAL
+
+
+class EventGatewayRecorder(commands.Cog):
+    # * The listeners are only registered when GATEWAY_RECORD is enabled (see setup)
+
+    def __init__(self, client):
+        self.client = client
+        self.flush_records.start()
+        if client.is_ready():  # * Extension reloaded by the dev commands
+            GatewayRecorder().start(client.guilds)
+
+    def cog_unload(self):
+        self.flush_records.cancel()
+        GatewayRecorder().flush()
+
+    @tasks.loop(seconds=GATEWAY_RECORD_FLUSH_INTERVAL)
+    async def flush_records(self):
+        try:
+            GatewayRecorder().flush()
+        except OSError:
+            logging.exception("Task failed, the recorded gateway events have not been written on the disk.")
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        GatewayRecorder().start(self.client.guilds)
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if message.guild and not message.author.bot:
+            GatewayRecorder().message(message)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        if not member.bot:
+            GatewayRecorder().member("member_join", member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        if not member.bot:
+            GatewayRecorder().member("member_remove", member)
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, guild, user):
+        if not user.bot:
+            GatewayRecorder().member("member_remove", user, guild)
+
+    @commands.Cog.listener()
+    async def on_guild_emojis_update(self, guild, before, after):
+        GatewayRecorder().emojis_update(guild, before, after)
+
+
+def setup(client):
+    if GATEWAY_RECORD:
+        client.add_cog(EventGatewayRecorder(client))
@@ -4,6 +4,8 @@ from sqlite3 import OperationalError, IntegrityError
 from discord.ext import commands
 
 from database import DBManager
+from logpipeline import ROW_LOGGER
+from constants import LOW_MEMORY
 
 
 
@@ -35,16 +37,16 @@ def _populate_emoji(guild, emoji):
 
 def populate_guild_database(guild):
     _populate_guild(guild)
-    for member in guild.members:
+    for member in guild.members if not LOW_MEMORY else ():  # * LOW_MEMORY: created on their first counted emoji
 
         if member.bot:
             continue
 
-        logging.debug(f"New member added in the database - {member.display_name}:{member.id}")
+        ROW_LOGGER.debug("New member added in the database - %s:%s", member.display_name, member.id)
         _populate_member(guild, member)
 
     for emoji in guild.emojis:
-        logging.debug(f"New emoji added in  the database- {emoji.name}:{emoji.id}")
+        ROW_LOGGER.debug("New emoji added in the database - %s:%s", emoji.name, emoji.id)
         _populate_emoji(guild, emoji)
 
 class EventGuildBotJoin(commands.Cog):
@@ -4,6 +4,12 @@ from sqlite3 import OperationalError, IntegrityError
 from discord.ext import commands
 
 from database import DBManager
+from counters import CounterEngine
+from history import UsageHistory
+from trending import TrendingCounters
+from cooccurrence import CooccurrenceCounters
+from hyperloglog import DistinctUsers
+from membership import MembershipQueue
 
 
 class EventGuildLeave(commands.Cog):
@@ -15,6 +21,12 @@ class EventGuildLeave(commands.Cog):
 
         logging.info(f"The bot was removed from the guild {guild.name}:{guild.id} .")
         logging.info(f"Cleaning up the database informations of the guild {guild.name}:{guild.id} ...")
+        CounterEngine().invalidate(guild.id)
+        UsageHistory().discard(guild.id)
+        TrendingCounters().discard(guild.id)
+        CooccurrenceCounters().discard(guild.id)
+        DistinctUsers().discard(guild.id)
+        MembershipQueue().discard(guild.id)
         try:
             DBManager().remove_existing_guild(guild.id)
         except (OperationalError, IntegrityError):
@@ -0,0 +1,22 @@
+from discord.ext import commands, tasks
+
+from tracing import Tracer
+from constants import TRACING_LOG_INTERVAL
+
+
+class EventHandlerTracing(commands.Cog):
+    def __init__(self, client):
+        self.client = client
+        self.log_tracing.start()
+
+    def cog_unload(self):
+        self.log_tracing.cancel()
+
+    @tasks.loop(seconds=TRACING_LOG_INTERVAL)
+    async def log_tracing(self):
+        if Tracer().enabled:
+            Tracer().log_snapshot()
+
+
+def setup(client):
+    client.add_cog(EventHandlerTracing(client))
@@ -0,0 +1,18 @@
+from discord.ext import commands
+
+from loopmonitor import LoopMonitor
+
+
+class EventLoopMonitor(commands.Cog):
+    def __init__(self, client):
+        self.client = client
+        self.monitor = client.loop.create_task(LoopMonitor().run())
+        LoopMonitor().start_watchdog()
+
+    def cog_unload(self):
+        self.monitor.cancel()
+        LoopMonitor().stop_watchdog()
+
+
+def setup(client):
+    client.add_cog(EventLoopMonitor(client))
@@ -1,9 +1,8 @@
-import logging
-from sqlite3 import OperationalError, IntegrityError
-
 from discord.ext import commands
 
-from database import DBManager
+from membership import MembershipQueue
+from logpipeline import ROW_LOGGER
+from constants import LOW_MEMORY
 
 
 class EventGuildMemberJoin(commands.Cog):
@@ -13,17 +12,12 @@ class EventGuildMemberJoin(commands.Cog):
     @commands.Cog.listener()
     async def on_member_join(self, member):
     
-        if member.bot:
+        if member.bot or LOW_MEMORY:  # * LOW_MEMORY: the member is created on its first counted emoji
             return
         
-        logging.info(f"A member joined the guild {member.guild.name}:{member.id} : {member.display_name}:{member.id} .")
-        logging.info(f"Populating the database with the information of the member {member.display_name}:{member.id} ...")
-        try:
-            DBManager().add_new_member(member.guild.id, member.id)
-        except (OperationalError, IntegrityError):
-            logging.exception(f"Task failed, the database information of the member {member.display_name}:{member.id} has not been created.")
-        else:
-            logging.info(f"The database information of the member {member.display_name}:{member.id} has been created.")
+        # * Written with the other joins and leaves by the memberQueue event
+        ROW_LOGGER.debug("A member joined the guild %s:%s : %s:%s .", member.guild.name, member.guild.id, member.display_name, member.id)
+        MembershipQueue().join(member.guild.id, member.id)
 
 def setup(client):
     client.add_cog(EventGuildMemberJoin(client))
@@ -1,25 +1,26 @@
-import logging
-from sqlite3 import OperationalError, IntegrityError
-
 from discord.ext import commands
 
-from database import DBManager
+from membership import MembershipQueue
+from logpipeline import ROW_LOGGER
 
 
 class EventGuildMemberLeave(commands.Cog):
     def __init__(self, client):
         self.client = client
 
+    def remove_member(self, guild, member):
+        # * Written with the other joins and leaves by the memberQueue event
+        ROW_LOGGER.debug("A member leaved the guild %s:%s : %s:%s .", guild.name, guild.id, member.display_name, member.id)
+        MembershipQueue().leave(guild.id, member.id)
+
     @commands.Cog.listener()
     async def on_member_remove(self, member):
-        logging.info(f"A member leaved the guild {member.guild.name}:{member.id} : {member.display_name}:{member.id} .")
-        logging.info(f"Cleaning up the database informations of the member {member.display_name}:{member.id} ...")
-        try:
-            DBManager().remove_existing_member(member.guild.id, member.id)
-        except (OperationalError, IntegrityError):
-            logging.exception(f"Task failed, the database information of the member {member.display_name}:{member.id} has not been deleted.")
-        else:
-            logging.info(f"The database information of the member {member.display_name}:{member.id} has been deleted.")
+        self.remove_member(member.guild, member)
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, guild, user):
+        # * Member not in the cache (LOW_MEMORY), dispatched by Bot instead of member_remove
+        self.remove_member(guild, user)
 
 def setup(client):
     client.add_cog(EventGuildMemberLeave(client))
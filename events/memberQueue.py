@@ -0,0 +1,28 @@
+import logging
+import sqlite3
+
+from discord.ext import commands, tasks
+
+from membership import MembershipQueue
+from constants import MEMBER_FLUSH_INTERVAL
+
+
+class EventMemberQueue(commands.Cog):
+    def __init__(self, client):
+        self.client = client
+        self.flush_members.start()
+
+    def cog_unload(self):
+        self.flush_members.cancel()
+        MembershipQueue().flush()
+
+    @tasks.loop(seconds=MEMBER_FLUSH_INTERVAL)
+    async def flush_members(self):
+        try:
+            MembershipQueue().flush()
+        except sqlite3.Error:  # * Any error, the loop must keep flushing
+            logging.exception("Task failed, the member joins and leaves have not been written in the database.")
+
+
+def setup(client):
+    client.add_cog(EventMemberQueue(client))
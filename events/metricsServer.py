@@ -0,0 +1,68 @@
+import asyncio
+import logging
+
+from discord.ext import commands
+
+import metrics
+from history import UsageHistory
+from cooccurrence import CooccurrenceCounters
+from hyperloglog import DistinctUsers
+from membership import MembershipQueue
+from loopmonitor import LoopMonitor
+from tracing import Tracer
+from constants import METRICS_PORT, HOT_STORE
+
+RESPONSE = ("HTTP/1.1 200 OK\r\n"
+            "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            "Content-Length: {}\r\n"
+            "Connection: close\r\n\r\n")
+
+
+class EventMetricsServer(commands.Cog):
+    # * Optional HTTP endpoint on localhost serving the metrics, on the loop of the bot
+    # * The gauges are computed when the metrics are read, the hot path only updates the counters
+
+    def __init__(self, client):
+        self.client = client
+        self.server = None
+        if not METRICS_PORT:
+            return
+
+        metrics.register("emotebot_gateway_latency_seconds", "gauge", "Latency of the gateway heartbeat.", lambda: client.latency)
+        metrics.register("emotebot_pending_history_buckets", "gauge", "Usage history buckets waiting for a flush.", lambda: len(UsageHistory()))
+        metrics.register("emotebot_pending_pairs", "gauge", "Co-occurrence pairs waiting for a flush.", lambda: len(CooccurrenceCounters()))
+        metrics.register("emotebot_pending_sketches", "gauge", "Distinct member sketches waiting for a flush.", lambda: len(DistinctUsers()))
+        metrics.register("emotebot_pending_member_changes", "gauge", "Member joins and leaves waiting for a flush.", lambda: len(MembershipQueue()))
+        if HOT_STORE:
+            from journal import DeltaJournal
+            metrics.register("emotebot_pending_journal_records", "gauge", "Delta journal records waiting for a write.", lambda: len(DeltaJournal()))
+        metrics.register("emotebot_loop_lag_seconds", "histogram", "Wake up delay of the event loop lag monitor.", LoopMonitor().lag)
+        metrics.register("emotebot_handler_seconds|handler", "histogram", "Duration of the cog listeners and commands.", Tracer().latencies)
+        metrics.register("emotebot_handler_errors_total|handler", "counter", "Exceptions raised by the cog listeners and commands.", Tracer().errors)
+        self.starting = client.loop.create_task(self.start_server())
+
+    async def start_server(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", METRICS_PORT)
+        logging.info(f"[METRICS] Metrics served on http://127.0.0.1:{METRICS_PORT}/metrics .")
+
+    def cog_unload(self):
+        if self.server:
+            self.server.close()
+        elif METRICS_PORT:
+            self.starting.cancel()
+
+    async def handle(self, reader, writer):
+        try:
+            # * Any path answers with the metrics, the request headers are ignored
+            await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=5)
+            body = metrics.render().encode()
+            writer.write(RESPONSE.format(len(body)).encode() + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def setup(client):
+    client.add_cog(EventMetricsServer(client))
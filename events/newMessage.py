@@ -3,9 +3,18 @@ import re
 from sqlite3 import OperationalError
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 
+import metrics
 from database import DBManager
+from counters import CounterEngine
+from journal import DeltaJournal
+from history import UsageHistory
+from trending import TrendingCounters
+from cooccurrence import CooccurrenceCounters
+from hyperloglog import DistinctUsers
+from logpipeline import MESSAGE_LOGGER
+from constants import HOT_STORE, SNAPSHOT_INTERVAL, JOURNAL_SYNC_INTERVAL
 
 
 def close_connexion(connexion):
@@ -16,7 +25,30 @@ def close_connexion(connexion):
 class EventMemberMessage(commands.Cog):
     def __init__(self, client):
         self.client = client
+        if HOT_STORE:
+            self.snapshot_counters.start()
+            self.sync_journal.start()
 
+    def cog_unload(self):
+        if HOT_STORE:
+            self.snapshot_counters.cancel()
+            self.sync_journal.cancel()
+            CounterEngine().snapshot()
+
+    @tasks.loop(seconds=JOURNAL_SYNC_INTERVAL)
+    async def sync_journal(self):
+        # * Group commit of the journal records received since the last iteration
+        try:
+            await DeltaJournal().sync()
+        except OSError:
+            logging.exception("Task failed, the delta journal has not been written on the disk.")
+
+    @tasks.loop(seconds=SNAPSHOT_INTERVAL)
+    async def snapshot_counters(self):
+        try:
+            CounterEngine().snapshot()
+        except OperationalError:
+            logging.exception("Task failed, the in-memory emoji counters have not been written in the database.")
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -28,6 +60,8 @@ class EventMemberMessage(commands.Cog):
 
             return
 
+        metrics.MESSAGES.inc()
+        message_emojis = []
         found_emoji_id = map(lambda x: int(x), re.findall(r"(?:<?:\w+:)([^:][\d]*(?:::[^:][\d]*)*)>", message.content))
         for emoji in map(lambda i: self.client.get_emoji(i), found_emoji_id):
 
@@ -36,22 +70,33 @@ class EventMemberMessage(commands.Cog):
             if emoji.guild_id != message.guild.id:
                 continue
 
-            logging.info(f"Found an emoji on the message {message.content}{message.id} sent by {message.author.display_name}:{message.author.id} on {message.guild.name}:{message.guild.id} :  {emoji.name}:{emoji.id} .")
-            logging.info(f"Increasing the counter of the emoji {emoji.name}:{emoji.id} for the member {message.author.display_name}:{message.author.id}")
-            try:
-                DBManager().add_emoji_member(message.author.id, message.guild.id, emoji.id)
-            except OperationalError:
-                logging.exception(f"Task failed, the emoji counter {emoji.name}:{emoji.id} of the member {message.author.display_name}:{message.author.id} has not been increased.")
-            else:
-                logging.info(f"The emoji counter {emoji.name}:{emoji.id} of the member {message.author.display_name}:{message.author.id} has been increased.")
-
-            logging.info(f"Increasing the counter of the emoji {emoji.name}:{emoji.id} for the guild {message.guild.name}:{message.guild.id}")
-            try:
-                DBManager().add_global_emoji_use(message.guild.id, emoji.id)
-            except OperationalError:
-                logging.exception(f"Task failed, the emoji counter {emoji.name}:{emoji.id} of the guild {message.guild.name}:{message.guild.id} has not been increased.")
-            else:
-                logging.info(f"The emoji counter {emoji.name}:{emoji.id} of the guild {message.guild.name}:{message.guild.id} has been increased.")
+            message_emojis.append(emoji.id)
+
+            MESSAGE_LOGGER.info("Found an emoji on the message %s sent by %s:%s on %s:%s : %s:%s .", message.id, message.author.display_name,
+                                message.author.id, message.guild.name, message.guild.id, emoji.name, emoji.id)
+            UsageHistory().add(message.guild.id, emoji.id, message.author.id, message.created_at)
+            TrendingCounters().add(message.guild.id, emoji.id)
+            DistinctUsers().add(message.guild.id, emoji.id, message.author.id)
+            if HOT_STORE:
+                CounterEngine().add_emoji_use(message.guild.id, message.author.id, emoji.id, channel_id=message.channel.id)
+
+        if not message_emojis:
+            return
+        metrics.EMOJIS.inc(len(message_emojis))
+        CooccurrenceCounters().add(message.guild.id, message_emojis)
+        if HOT_STORE:
+            return
+
+        # * Member, guild and channel counters of every emoji of the message are written in a single transaction
+        MESSAGE_LOGGER.info("Increasing the counters of %s emojis for the member %s:%s in the channel %s:%s", len(message_emojis),
+                            message.author.display_name, message.author.id, message.channel.name, message.channel.id)
+        try:
+            DBManager().add_message_emojis(message.guild.id, message.channel.id, message.author.id, message_emojis)
+        except OperationalError:
+            DBManager().connexion.rollback()
+            logging.exception(f"Task failed, the emoji counters of the message {message.id} sent by {message.author.display_name}:{message.author.id} have not been increased.")
+        else:
+            MESSAGE_LOGGER.info("The emoji counters of the message %s sent by %s:%s have been increased.", message.id, message.author.display_name, message.author.id)
 
     
 def setup(client):
@@ -0,0 +1,41 @@
+import logging
+import sqlite3
+
+from discord.ext import commands, tasks
+
+from history import UsageHistory
+from hyperloglog import DistinctUsers
+from constants import HISTORY_FLUSH_INTERVAL, HISTORY_COMPACT_INTERVAL
+
+
+class EventUsageHistory(commands.Cog):
+    def __init__(self, client):
+        self.client = client
+        self.flush_history.start()
+        self.compact_history.start()
+
+    def cog_unload(self):
+        self.flush_history.cancel()
+        self.compact_history.cancel()
+        UsageHistory().flush()
+        DistinctUsers().flush()
+
+    @tasks.loop(seconds=HISTORY_FLUSH_INTERVAL)
+    async def flush_history(self):
+        try:
+            UsageHistory().flush()
+            DistinctUsers().flush()
+        except sqlite3.Error:  # * Any error, the loop must keep flushing
+            logging.exception("Task failed, the emoji usage history has not been written in the database.")
+
+    @tasks.loop(seconds=HISTORY_COMPACT_INTERVAL)
+    async def compact_history(self):
+        try:
+            UsageHistory().compact()
+            DistinctUsers().prune()
+        except sqlite3.Error:
+            logging.exception("Task failed, the emoji usage history has not been compacted.")
+
+
+def setup(client):
+    client.add_cog(EventUsageHistory(client))
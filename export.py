@@ -0,0 +1,81 @@
+import io
+import csv
+import gzip
+import asyncio
+import tempfile
+from datetime import datetime
+
+from database import DBManager
+from history import HOUR, DAY, MONTH
+from constants import TIMEZONE, EXPORT_SPOOL_SIZE, EXPORT_CHUNK
+
+GRANULARITIES = {HOUR: "hour", DAY: "day", MONTH: "month"}
+
+
+def _emoji_name(client, emoji_id: int) -> str:
+    emoji = client.get_emoji(emoji_id)
+    return emoji.name if emoji else ""
+
+
+def _totals(client, connexion, guild_id: int):
+    yield ("emoji_id", "emoji_name", "uses")
+    for emoji_id, uses in DBManager.iter_guild_emoji(connexion, guild_id):
+        yield emoji_id, _emoji_name(client, emoji_id), uses
+
+
+def _members(client, connexion, guild_id: int):
+    yield ("emoji_id", "emoji_name", "member_id", "uses")
+    names = {}
+    for emoji_id, member_id, uses in DBManager.iter_guild_members_emoji(connexion, guild_id):
+        if emoji_id not in names:
+            names[emoji_id] = _emoji_name(client, emoji_id)
+        yield emoji_id, names[emoji_id], member_id, uses
+
+
+def _history(client, connexion, guild_id: int):
+    # * member_id 0 is the whole guild
+    yield ("emoji_id", "emoji_name", "member_id", "granularity", "bucket", "uses")
+    names, dates = {}, {}  # * The retention of the history bounds the number of distinct buckets
+    for emoji_id, member_id, granularity, bucket, uses in DBManager.iter_guild_emoji_usage(connexion, guild_id):
+        if emoji_id not in names:
+            names[emoji_id] = _emoji_name(client, emoji_id)
+        if bucket not in dates:
+            dates[bucket] = datetime.fromtimestamp(bucket, TIMEZONE).isoformat()
+        yield emoji_id, names[emoji_id], member_id, GRANULARITIES[granularity], dates[bucket], uses
+
+
+EXPORTS = {"totals": _totals, "members": _members, "history": _history}
+
+
+async def export_csv(client, guild_id: int, kind: str) -> tempfile.SpooledTemporaryFile:
+    """
+    export_csv(client, guild_id, kind)
+
+    Write the rows of an export in a gzip compressed CSV file.
+
+    The rows are read lazily from a dedicated read-only connection and compressed as they are written,
+    the file stays in memory up to EXPORT_SPOOL_SIZE bytes, then it is moved on the disk.
+    The event loop is released every EXPORT_CHUNK rows.
+
+    Returns
+    ----------
+    tempfile.SpooledTemporaryFile
+        The compressed file, positioned at its beginning. The caller has to close it.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
+    connexion = DBManager().open_read_only()
+    try:
+        with gzip.GzipFile(fileobj=spool, mode="wb") as compressed, \
+                io.TextIOWrapper(compressed, encoding="utf-8", newline="") as text:
+            writer = csv.writer(text)
+            for index, row in enumerate(EXPORTS[kind](client, connexion, guild_id), 1):
+                writer.writerow(row)
+                if not index % EXPORT_CHUNK:
+                    await asyncio.sleep(0)
+    except BaseException:
+        spool.close()
+        raise
+    finally:
+        connexion.close()
+    spool.seek(0)
+    return spool
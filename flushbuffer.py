@@ -0,0 +1,61 @@
+import logging
+import sqlite3
+
+from database import DBManager
+
+
+class FlushBuffer:
+    # * Rows kept in memory, keyed by tuples starting with the guild id, and written in the database by batches.
+    # * A subclass sets NAME (prefix of the logs) and SIZE (rows before a flush from the event handlers),
+    # * writes a batch in _write and merges a batch back in _restore when the values are not counters.
+    # * A batch rejected by the database (IntegrityError) is dropped: put back, it would make every next flush fail.
+    # * Any other error puts the batch back for the next flush.
+
+    NAME = ""
+    SIZE = None
+
+    def __init__(self):
+        self._buffer = {}
+
+    def __len__(self) -> int:
+        # * Rows waiting for the next flush
+        return len(self._buffer)
+
+    def discard(self, guild_id: int) -> None:
+        # * Forget the buffered rows of a guild (the guild is deleted or scanned again)
+        self._buffer = {key: value for key, value in self._buffer.items() if key[0] != guild_id}
+
+    def _write(self, rows: dict) -> None:
+        raise NotImplementedError
+
+    def _restore(self, rows: dict) -> None:
+        for key, count in rows.items():
+            self._buffer[key] = self._buffer.get(key, 0) + count
+
+    def _written(self, rows: dict) -> None:
+        logging.debug(f"[{self.NAME}] {len(rows)} rows written in the database.")
+
+    def _flush_if_full(self) -> None:
+        # * Called from the event handlers: a failed flush is logged, it must not stop the handler
+        if len(self._buffer) < self.SIZE:
+            return
+        try:
+            self.flush()
+        except sqlite3.Error:
+            logging.exception(f"Task failed, the {len(self._buffer)} buffered rows of {self.NAME} have not been written in the database.")
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, {}
+        try:
+            self._write(rows)
+        except sqlite3.IntegrityError:
+            DBManager().connexion.rollback()
+            logging.exception(f"[{self.NAME}] {len(rows)} rows rejected by the database have been dropped.")
+            return
+        except Exception:
+            DBManager().connexion.rollback()
+            self._restore(rows)
+            raise
+        self._written(rows)
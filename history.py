@@ -0,0 +1,95 @@
+import re
+import time
+import logging
+from datetime import datetime, timezone
+
+from database import DBManager, DBSingletonMeta
+from flushbuffer import FlushBuffer
+from constants import (TIMEZONE, HISTORY_PER_MEMBER, HISTORY_BUFFER_SIZE,
+                       HISTORY_HOURLY_RETENTION, HISTORY_DAILY_RETENTION, HISTORY_MONTHLY_RETENTION)
+
+HOUR, DAY, MONTH = 0, 1, 2  # * Granularity of a bucket
+GUILD_MEMBER = 0  # * member_id of the guild-wide buckets
+WINDOW = re.compile(r"^(\d{1,4})([hdwm])$")
+
+
+def hour_bucket(timestamp: float) -> int:
+    return int(timestamp) // 3600 * 3600
+
+
+def day_bucket(timestamp: float) -> int:
+    # * Local midnight (TIMEZONE) of the day of the timestamp
+    local = datetime.fromtimestamp(timestamp, TIMEZONE)
+    return int(TIMEZONE.localize(datetime(local.year, local.month, local.day)).timestamp())
+
+
+def month_bucket(timestamp: float) -> int:
+    # * Local midnight (TIMEZONE) of the first day of the month of the timestamp
+    local = datetime.fromtimestamp(timestamp, TIMEZONE)
+    return int(TIMEZONE.localize(datetime(local.year, local.month, 1)).timestamp())
+
+
+def window_start(window: str, now: float = None) -> int:
+    """
+    window_start(window, now)
+
+    Convert a window such as '24h', '7d', '2w' or '3m' into the timestamp of its beginning.
+
+    Days, weeks and months start at local midnight (TIMEZONE), '7d' is today and the 6 previous days.
+
+    Raises
+    ----------
+    ValueError
+        The window does not have a valid format.
+    """
+    match = WINDOW.match(window)
+    if not match or not int(match[1]):
+        raise ValueError(f"{window} is not a valid window.")
+
+    now = now or time.time()
+    number, unit = int(match[1]), match[2]
+    if unit == "h":
+        return hour_bucket(now) - (number - 1) * 3600
+    days = {"d": 1, "w": 7, "m": 30}[unit] * number
+    return day_bucket(now - (days - 1) * 86400)
+
+
+class UsageHistory(FlushBuffer, metaclass=DBSingletonMeta):
+    # * Buffer of the time bucketed emoji uses, written with batched upserts.
+    # * Recent uses are stored by hour, then rolled up by day and by month by the compactor
+    # * and finally deleted, so the size of the table stays bounded.
+
+    NAME = "HISTORY"
+    SIZE = HISTORY_BUFFER_SIZE  # * Buffer: (guild_id, emote_id, member_id, granularity, bucket) -> count
+
+    def add(self, guild_id: int, emote_id: int, member_id: int, created_at: datetime = None, number=1) -> None:
+        timestamp = created_at.replace(tzinfo=timezone.utc).timestamp() if created_at else time.time()
+        age = time.time() - timestamp
+
+        # * Old uses (scanall) are directly stored with the granularity they would have after the compaction
+        if age < HISTORY_HOURLY_RETENTION:
+            key = (HOUR, hour_bucket(timestamp))
+        elif age < HISTORY_DAILY_RETENTION:
+            key = (DAY, day_bucket(timestamp))
+        elif age < HISTORY_MONTHLY_RETENTION:
+            key = (MONTH, month_bucket(timestamp))
+        else:
+            return
+
+        self._buffer[(guild_id, emote_id, GUILD_MEMBER) + key] = self._buffer.get((guild_id, emote_id, GUILD_MEMBER) + key, 0) + number
+        if HISTORY_PER_MEMBER:
+            self._buffer[(guild_id, emote_id, member_id) + key] = self._buffer.get((guild_id, emote_id, member_id) + key, 0) + number
+
+        self._flush_if_full()
+
+    def _write(self, rows: dict) -> None:
+        DBManager().upsert_emote_usage((*key, count) for key, count in rows.items())
+
+    def compact(self, now: float = None) -> None:
+        # * Roll up the expired hourly and daily buckets, delete the expired monthly buckets
+        now = now or time.time()
+        self.flush()
+        DBManager().rollup_emote_usage(HOUR, DAY, hour_bucket(now - HISTORY_HOURLY_RETENTION), day_bucket)
+        DBManager().rollup_emote_usage(DAY, MONTH, day_bucket(now - HISTORY_DAILY_RETENTION), month_bucket)
+        DBManager().prune_emote_usage(MONTH, month_bucket(now - HISTORY_MONTHLY_RETENTION))
+        logging.info("[HISTORY] Emoji usage history compacted.")
@@ -0,0 +1,125 @@
+import time
+import zlib
+
+from lazyimport import lazy_import
+from database import DBManager, DBSingletonMeta
+from flushbuffer import FlushBuffer
+from history import day_bucket
+from constants import HLL_PRECISION, HLL_RETENTION, HLL_BUFFER_SIZE
+
+np = lazy_import("numpy")
+
+MASK = (1 << 64) - 1
+
+
+def _hash(value: int) -> int:
+    # * splitmix64 finalizer, spreads the bits of the (sequential) discord ids
+    z = (value + 0x9E3779B97F4A7C15) & MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK
+    return z ^ (z >> 31)
+
+
+class HyperLogLog:
+    """
+    HyperLogLog(precision)
+
+    Approximate distinct counter with a fixed size of 2 ** precision registers (one byte each).
+
+    Notes
+    ----------
+    The relative standard error of the estimate is 1.04 / sqrt(2 ** precision):
+    3.25% with the default precision of 10 (1 KiB per sketch), 1.63% with a precision of 12.
+    About 99% of the estimates are within three standard errors. Small cardinalities use the
+    linear counting correction and are nearly exact.
+
+    Two sketches with the same precision are merged with the maximum of their registers,
+    the result is the sketch of the union of both sets.
+    """
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = HLL_PRECISION, registers: "np.ndarray" = None):
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, value: int) -> None:
+        h = _hash(value)
+        bits = 64 - self.precision
+        index = h >> bits
+        rank = bits - (h & ((1 << bits) - 1)).bit_length() + 1  # * Position of the first 1 bit after the index
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.ldexp(1.0, -self.registers.astype(np.int32)).sum()
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # * Linear counting for small cardinalities
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        # * Most registers of a small sketch are empty, zlib keeps them compact
+        return zlib.compress(self.registers.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        registers = np.frombuffer(zlib.decompress(data), dtype=np.uint8).copy()
+        return cls(int(len(registers)).bit_length() - 1, registers)
+
+
+def merge_sketches(stored: bytes, data: bytes) -> bytes:
+    # * Merge function of DBManager.merge_emote_sketches, called by SQLite in the process which writes the database
+    sketch = HyperLogLog.from_bytes(stored)
+    sketch.merge(HyperLogLog.from_bytes(data))
+    return sketch.to_bytes()
+
+
+class DistinctUsers(FlushBuffer, metaclass=DBSingletonMeta):
+    # * Per (guild, emoji, day) HyperLogLog sketches of the members who used an emoji.
+    # * The sketches of the day are kept in memory, then merged with the stored ones by the writer of the database,
+    # * so the flushes of several shard processes do not overwrite each other.
+
+    NAME = "HLL"
+    SIZE = HLL_BUFFER_SIZE  # * Buffer: (guild_id, emote_id, day) -> HyperLogLog
+
+    def add(self, guild_id: int, emote_id: int, member_id: int, timestamp: float = None) -> None:
+        now = time.time()
+        timestamp = timestamp or now
+        if now - timestamp >= HLL_RETENTION:
+            return
+
+        key = (guild_id, emote_id, day_bucket(timestamp))
+        sketch = self._buffer.get(key)
+        if sketch is None:
+            self._flush_if_full()
+            sketch = self._buffer[key] = HyperLogLog()
+        sketch.add(member_id)
+
+    def _write(self, rows: dict) -> None:
+        DBManager().merge_emote_sketches(((*key, sketch.to_bytes()) for key, sketch in rows.items()), merge_sketches)
+
+    def _restore(self, rows: dict) -> None:
+        for key, sketch in rows.items():
+            self._buffer.setdefault(key, HyperLogLog()).merge(sketch)
+
+    def prune(self, now: float = None) -> None:
+        DBManager().prune_emote_sketches(day_bucket((now or time.time()) - HLL_RETENTION))
+
+    def count(self, guild_id: int, emote_id: int, since: int) -> int:
+        # * Approximate number of members who used the emoji since the timestamp (rounded down to the day)
+        # * The sketches waiting for the flush are merged from memory, the database is not flushed before the read:
+        # * with a writer process, the sketches of a flush are readable after the next batch of the writer only
+        since = day_bucket(since)
+        sketch = HyperLogLog()
+        for data in DBManager().get_emote_sketches_since(guild_id, emote_id, since):
+            sketch.merge(HyperLogLog.from_bytes(data))
+        for (sketch_guild_id, sketch_emote_id, day), pending in self._buffer.items():
+            if sketch_guild_id == guild_id and sketch_emote_id == emote_id and day >= since:
+                sketch.merge(pending)
+        return sketch.count()
@@ -0,0 +1,116 @@
+import os
+import asyncio
+import logging
+import struct
+import zlib
+
+from database import DBManager, DBSingletonMeta
+from constants import JOURNAL_FILE, JOURNAL_GROUP_SIZE
+
+HEADER = struct.Struct("<4sQ")  # * magic, generation
+RECORDS = {b"EMJ1": struct.Struct("<QQQq"),  # * guild_id, member_id, emoji_id, delta
+           b"EMJ2": struct.Struct("<QQQQq")}  # * guild_id, channel_id, member_id, emoji_id, delta
+CHECKSUM = struct.Struct("<I")  # * crc32 of the record
+MAGIC = b"EMJ2"
+RECORD = RECORDS[MAGIC]
+
+
+def read_journal(path: str = JOURNAL_FILE) -> tuple:
+    """
+    read_journal(path)
+
+    Read the records of the delta journal.
+
+    A torn or corrupted record (crash during a write) ends the replay, the records after it are ignored.
+
+    Returns
+    ----------
+    tuple
+        The generation of the journal and the list of (guild_id, channel_id, member_id, emoji_id, delta) records.
+        The channel_id of the records written before the channel dimension is 0.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return 0, []
+
+    if len(data) < HEADER.size:
+        return 0, []
+    magic, generation = HEADER.unpack_from(data)
+    record_struct = RECORDS.get(magic)
+    if record_struct is None:
+        logging.error(f"[JOURNAL] {path} is not a delta journal, it will not be replayed.")
+        return 0, []
+
+    records = []
+    size = record_struct.size + CHECKSUM.size
+    for offset in range(HEADER.size, len(data) - size + 1, size):
+        record = data[offset:offset + record_struct.size]
+        if CHECKSUM.unpack_from(data, offset + record_struct.size)[0] != zlib.crc32(record):
+            logging.warning(f"[JOURNAL] Corrupted record at the offset {offset}, the end of the journal is ignored.")
+            break
+        record = record_struct.unpack(record)
+        records.append(record if record_struct is RECORD else (record[0], 0, *record[1:]))
+    return generation, records
+
+
+class DeltaJournal(metaclass=DBSingletonMeta):
+    # * Append-only journal of the counter increments kept in memory.
+    # * The records are written by groups with a single fsync, the journal is replayed by
+    # * DBManager.on_db_launch and truncated after each checkpoint of the in-memory counters.
+
+    def __init__(self, path: str = JOURNAL_FILE):
+        self.path = path
+        self._buffer = bytearray()
+        self._pending = 0
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self.generation = DBManager().journal_generation() + 1  # * Generations up to the stored one are already in the database
+        self._reset()
+
+    def _reset(self) -> None:
+        os.ftruncate(self._fd, 0)
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.write(self._fd, HEADER.pack(MAGIC, self.generation))
+        os.fsync(self._fd)
+
+    def __len__(self) -> int:
+        # * Records waiting for the next group write
+        return self._pending
+
+    def append(self, guild_id: int, channel_id: int, member_id: int, emoji_id: int, delta: int) -> None:
+        record = RECORD.pack(guild_id, channel_id, member_id, emoji_id, delta)
+        self._buffer += record
+        self._buffer += CHECKSUM.pack(zlib.crc32(record))
+        self._pending += 1
+        if self._pending >= JOURNAL_GROUP_SIZE:
+            self.flush()
+
+    def _write(self) -> bool:
+        if not self._buffer:
+            return False
+        os.write(self._fd, self._buffer)
+        self._buffer.clear()
+        self._pending = 0
+        return True
+
+    def flush(self) -> None:
+        # * Write the current group and wait until it is on the disk
+        if self._write():
+            os.fsync(self._fd)
+
+    async def sync(self) -> None:
+        # * Same as flush, the fsync is done outside of the event loop
+        if self._write():
+            await asyncio.get_running_loop().run_in_executor(None, os.fsync, self._fd)
+
+    def truncate(self) -> None:
+        # * The records are in the database (checkpoint of the generation), start a new generation
+        self._buffer.clear()
+        self._pending = 0
+        self.generation += 1
+        self._reset()
+
+    def close(self) -> None:
+        self.flush()
+        os.close(self._fd)
@@ -0,0 +1,16 @@
+import sys
+import importlib.util
+
+
+def lazy_import(name: str):
+    # * The module is executed on the first access to one of its attributes, not at the import of the caller.
+    # * Used for the heavy modules (numpy) which are not needed to start the bot.
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,103 @@
+import os
+import gzip
+import time
+import queue
+import shutil
+import logging
+import logging.handlers
+
+from constants import (LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_RATE_LIMIT, LOG_RATE_PERIOD,
+                       LOG_MESSAGE_LEVEL, LOG_ROW_LEVEL)
+
+FORMAT = "%(levelname)s - %(asctime)s : %(message)s"
+DATE_FORMAT = r'%Y/%m/%d %H:%M:%S'
+
+# * Loggers of the hot paths, with their own level and a rate limit:
+# * one record per message with emojis (on_message) and one record per row (population of the database, scanall)
+MESSAGE_LOGGER = logging.getLogger("emotebot.message")
+ROW_LOGGER = logging.getLogger("emotebot.row")
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    # * The record is formatted by the writer thread, not by the thread which logs it.
+    # * The arguments of the records must not be modified after the call (the bot only logs ids, names and numbers).
+
+    def prepare(self, record):
+        return record
+
+
+class RateLimitFilter(logging.Filter):
+    # * At most LOG_RATE_LIMIT records every LOG_RATE_PERIOD seconds for the logger,
+    # * the number of dropped records is kept in the dropped field of the first record of the next period
+    # * (written by DroppedFormatter, the message and the arguments of the record are not modified)
+
+    def __init__(self, limit: int = LOG_RATE_LIMIT, period: float = LOG_RATE_PERIOD):
+        super().__init__()
+        self.limit = limit
+        self.period = period
+        self.window = 0.0
+        self.count = 0
+        self.dropped = 0
+
+    def filter(self, record) -> bool:
+        now = time.monotonic()
+        if now - self.window >= self.period:
+            record.dropped = self.dropped
+            self.window, self.count, self.dropped = now, 0, 0
+        self.count += 1
+        if self.count > self.limit:
+            self.dropped += 1
+            return False
+        return True
+
+
+class DroppedFormatter(logging.Formatter):
+    # * Adds the number of records dropped by RateLimitFilter before the record
+
+    def format(self, record) -> str:
+        text = super().format(record)
+        dropped = getattr(record, "dropped", 0)
+        return f"{text} ({dropped} similar records dropped)" if dropped else text
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as file, gzip.open(dest, "wb") as compressed:
+        shutil.copyfileobj(file, compressed)
+    os.remove(source)
+
+
+def setup_logging(path: str) -> logging.handlers.QueueListener:
+    """
+    setup_logging(path)
+
+    Route the records of the root logger to a background thread which writes them in a rotating file.
+
+    Parameters
+    ----------
+    path : str
+        The path of the log file. When it reaches LOG_MAX_BYTES, it is compressed as path.1.gz
+        and the LOG_BACKUP_COUNT last files are kept.
+
+    Returns
+    ----------
+    logging.handlers.QueueListener
+        The writer, stop it to write the remaining records before the process exits.
+    """
+    handler = logging.handlers.RotatingFileHandler(path, 'w', LOG_MAX_BYTES, LOG_BACKUP_COUNT, 'utf-8')
+    handler.setFormatter(DroppedFormatter(FORMAT, datefmt=DATE_FORMAT))
+    handler.namer = lambda name: f"{name}.gz"
+    handler.rotator = _gzip_rotator
+
+    records = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(DeferredQueueHandler(records))
+
+    MESSAGE_LOGGER.setLevel(LOG_MESSAGE_LEVEL)
+    MESSAGE_LOGGER.addFilter(RateLimitFilter())
+    ROW_LOGGER.setLevel(LOG_ROW_LEVEL)
+    ROW_LOGGER.addFilter(RateLimitFilter())
+
+    listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+    listener.start()
+    return listener
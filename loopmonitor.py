@@ -0,0 +1,70 @@
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import Counter
+
+from database import DBSingletonMeta
+from metrics import Histogram
+from constants import LOOP_MONITOR_INTERVAL, LOOP_BLOCK_SAMPLING, LOOP_BLOCK_THRESHOLD, LOOP_BLOCK_STACK_DEPTH
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # * Seconds
+
+
+class LoopMonitor(metaclass=DBSingletonMeta):
+    # * Scheduling delay of the event loop: how late a task sleeping LOOP_MONITOR_INTERVAL is woken up.
+    # * With LOOP_BLOCK_SAMPLING, a watchdog thread records the stack of the loop thread
+    # * each time a callback holds the loop longer than LOOP_BLOCK_THRESHOLD.
+
+    def __init__(self):
+        self.lag = Histogram(LAG_BUCKETS)
+        self.stacks = Counter()  # * Stack of the loop thread (innermost frames) -> samples
+        self.blocks = 0
+        self._beat = time.monotonic()
+        self._loop_thread = None
+        self._watchdog = None
+        self._stopped = threading.Event()
+
+    async def run(self, interval: float = LOOP_MONITOR_INTERVAL) -> None:
+        # * A callback holding the loop delays the wake up of the sleep, the delay is the lag
+        self._loop_thread = threading.get_ident()
+        loop = asyncio.get_running_loop()
+        while True:
+            self._beat = time.monotonic()
+            start = loop.time()
+            await asyncio.sleep(interval)
+            self.lag.observe(max(loop.time() - start - interval, 0.0))
+
+    def start_watchdog(self) -> None:
+        if not LOOP_BLOCK_SAMPLING or self._watchdog:
+            return
+        self._stopped = threading.Event()  # * A watchdog being stopped keeps its own event
+        self._watchdog = threading.Thread(target=self._watch, args=(self._stopped,), name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop_watchdog(self) -> None:
+        self._stopped.set()
+        self._watchdog = None
+
+    def _watch(self, stopped: threading.Event) -> None:
+        blocked = False
+        while not stopped.wait(LOOP_BLOCK_THRESHOLD / 2):
+            if time.monotonic() - self._beat < LOOP_BLOCK_THRESHOLD:
+                blocked = False
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            if not blocked:  # * A new blocking callback
+                self.blocks += 1
+                blocked = True
+            stack = "".join(traceback.format_stack(frame, limit=LOOP_BLOCK_STACK_DEPTH))
+            self.stacks[stack] += 1
+            logging.debug(f"[LOOP] Loop blocked for {time.monotonic() - self._beat:.3f}s in:\n{stack}")
+
+    def reset(self) -> None:
+        self.lag.reset()
+        self.stacks.clear()
+        self.blocks = 0
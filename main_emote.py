@@ -1,3 +1,4 @@
+from startup import phase, record, since_start, PHASES  # * First import: the other imports are part of the startup time
 import os
 import glob
 import sys
@@ -5,15 +6,19 @@ import logging
 from datetime import datetime
 from sqlite3 import OperationalError, IntegrityError
 
-from discord import Intents
+from discord import Intents, MemberCacheFlags
 from discord.ext import commands
 
 from constants import *
 from database import DBManager
-
-# Open discord bot token
-with open(os.path.join(KEY_DIRECTORY, "discord-key.txt"), "r") as f:
-    TOKEN = f.read()
+from counters import CounterEngine
+from journal import DeltaJournal
+from history import UsageHistory
+from cooccurrence import CooccurrenceCounters
+from hyperloglog import DistinctUsers
+from membership import MembershipQueue
+from tracing import Tracer
+from logpipeline import setup_logging, ROW_LOGGER
 
 # Set working directory to current file directory
 sys.path.insert(1, DIRECTORY)
@@ -25,20 +30,33 @@ default_intents.members = True
 default_intents.typing = False
 default_intents.presences = False
 
-# Log to a file
-
-root_logger= logging.getLogger()
-root_logger.setLevel(logging.INFO)
-handler = logging.FileHandler(os.path.join(LOGS_DIRECTORY, f"{datetime.now().strftime('%y%m%d%H%M%S')}.log"), 'w', 'utf-8')
-handler.setFormatter(logging.Formatter("%(levelname)s - %(asctime)s : %(message)s", datefmt=r'%Y/%m/%d %H:%M:%S'))
-root_logger.addHandler(handler)
-
-class Bot(commands.Bot):
-    def __init__(self, token, prefix):
+class Bot(commands.AutoShardedBot):
+    def __init__(self, token, prefix, **options):
+        # * options: shard_ids and shard_count of the process (see shards.py), all the shards by default
         self.token = token
         self.prefix = prefix
-        super().__init__(command_prefix = self.prefix, intents = default_intents, reconnect = True)
+        options.setdefault("shard_count", SHARD_COUNT)
+        if LOW_MEMORY:
+            # * Only the bot itself is cached, the members are never requested (the intent is kept for the join and leave events)
+            options.setdefault("member_cache_flags", MemberCacheFlags.none())
+            options.setdefault("chunk_guilds_at_startup", False)
+        super().__init__(command_prefix = self.prefix, intents = default_intents, reconnect = True, **options)
+        if LOW_MEMORY:
+            self._parse_member_remove = self._connection.parsers["GUILD_MEMBER_REMOVE"]
+            self._connection.parsers["GUILD_MEMBER_REMOVE"] = self.parse_member_remove
+
+    def parse_member_remove(self, data):
+        # * discord.py drops the leave of a member which is not in the cache: raw_member_remove is dispatched instead
+        guild = self.get_guild(int(data["guild_id"]))
+        if guild is not None and guild.get_member(int(data["user"]["id"])) is None:
+            self.dispatch("raw_member_remove", guild, self._connection.store_user(data["user"]))
+        self._parse_member_remove(data)
         
+    def add_cog(self, cog):
+        # * Every cog (load_commands, load_events and the dev commands) has its listeners and commands traced
+        Tracer().instrument_cog(cog)
+        super().add_cog(cog)
+
     def load_commands(self):
         # * Import and load all commands (cogs)
         cogs_file = glob.iglob(f"{COGS_DIRECTORY}**.py")
@@ -65,23 +83,65 @@ class Bot(commands.Bot):
             except commands.ExtensionFailed:
                 logging.exception("The event or its setup function had an execution error.")
     
-    def start_bot(self):
-
+    def prepare(self):
+        # * Everything done before the connection to the gateway, phase by phase
+        record("imports", since_start())
         logging.info("Deleting help command...")
         self.remove_command('help')
         logging.info("Done!")
         logging.info("Checking database...")
-        DBManager()
+        with phase("database"):
+            writer = DBManager().writer
+        if writer is not None:
+            self.loop.create_task(writer.run())  # * Batches of writes sent to the writer process
         logging.info("Done!")
         logging.info("Loading cogs...")
-        self.load_commands()
+        with phase("cogs"):
+            self.load_commands()
         logging.info("Done!")
         logging.info("Loading events...")
-        self.load_events()
+        with phase("events"):
+            self.load_events()
         logging.info("Done!")
+
+    def start_bot(self):
+        self.prepare()
         logging.info("Bot launching...")
         self.run(self.token)
 
+    async def on_connect(self):
+        if "gateway" not in PHASES:  # * Only the first connection, not the reconnections
+            record("gateway", since_start() - sum(PHASES.values()))
+
+
+    async def close(self):
+        logging.info("Writing the emoji usage history in the database...")
+        try:
+            UsageHistory().flush()
+            DistinctUsers().flush()
+        except OperationalError:
+            logging.exception("Task failed, the emoji usage history has not been written in the database.")
+        try:
+            CooccurrenceCounters().flush()
+        except OperationalError:
+            logging.exception("Task failed, the emoji co-occurrence matrix has not been written in the database.")
+        try:
+            MembershipQueue().flush()
+        except (OperationalError, IntegrityError):
+            logging.exception("Task failed, the member joins and leaves have not been written in the database.")
+        if HOT_STORE:
+            logging.info("Writing the in-memory emoji counters in the database...")
+            try:
+                CounterEngine().snapshot()
+            except OperationalError:
+                logging.exception("Task failed, the in-memory emoji counters have not been written in the database.")
+            else:
+                logging.info("Done!")
+            DeltaJournal().close()
+        if DBManager().writer is not None:
+            logging.info("Sending the last writes to the writer process...")
+            await DBManager().writer.close()
+        await super().close()
 
     def _populate_guild(self, guild):
         try:
@@ -89,44 +149,44 @@ class Bot(commands.Bot):
         except (OperationalError, IntegrityError):
             logging.exception(f"Task failed, the database information of the guild {guild.name}:{guild.id} has not been checked.")
         else:
-            logging.debug(f"The database information of the guild {guild.name}:{guild.id} has been checked.")
+            ROW_LOGGER.debug("The database information of the guild %s:%s has been checked.", guild.name, guild.id)
 
-    def _populate_member(self, guild, member):
+    def _populate_members(self, guild, members):
+        # * All the members of the guild in a single transaction
         try:
-            DBManager().add_new_member(guild.id, member.id)
+            DBManager().add_new_members(guild.id, [member.id for member in members])
         except (OperationalError, IntegrityError):
-            logging.exception(f"Task failed, the database information of the member {member.display_name}:{member.id} has not been checked.")
+            DBManager().connexion.rollback()
+            logging.exception(f"Task failed, the database information of the members of the guild {guild.name}:{guild.id} has not been checked.")
         else:
-            logging.debug(f"The database information of the member {member.display_name}:{member.id} has been checked.")
+            ROW_LOGGER.debug("The database information of %s members of the guild %s:%s has been checked.", len(members), guild.name, guild.id)
 
-    def _populate_emoji(self, guild, emoji):
+    def _populate_emojis(self, guild, emojis):
         try:
-            DBManager().add_new_emoji(guild.id, emoji.id)
+            DBManager().add_new_emojis(guild.id, [emoji.id for emoji in emojis])
         except (OperationalError, IntegrityError):
-            logging.exception(f"Task failed, the database information of the emoji {emoji.name}:{emoji.id} has not been checked.")
+            DBManager().connexion.rollback()
+            logging.exception(f"Task failed, the database information of the emojis of the guild {guild.name}:{guild.id} has not been checked.")
         else:
-            logging.debug(f"The database information of the emoji {emoji.name}:{emoji.id} has been checked.")
+            ROW_LOGGER.debug("The database information of %s emojis of the guild %s:%s has been checked.", len(emojis), guild.name, guild.id)
         
     async def on_ready(self):
         logging.info("Checking the integrity of the database...")
-
-        for guild in self.guilds:
-            logging.info(f"Checking guild {guild.name}:{guild.id} ...")
-            self._populate_guild(guild)
-
-            guild_obj = await self.fetch_guild(guild.id)
-            for emoji in guild_obj.emojis:
-                logging.debug(f"Checking emoji {emoji.name}:{emoji.id} ...")
-                self._populate_emoji(guild, emoji)
-
-            for member in guild.members:
-
-                if member.bot:
-                    continue
-
-                logging.debug(f"Checking member {member.display_name}:{member.id} ...")
-                self._populate_member(guild, member)
-
+        first_ready = "ready" not in PHASES
+        if first_ready:
+            record("ready", since_start() - sum(PHASES.values()))  # * Guild payloads and member chunks
+
+        with phase("integrity"):
+            for guild in self.guilds:
+                logging.info(f"Checking guild {guild.name}:{guild.id} ...")
+                self._populate_guild(guild)
+                # * The emojis of the guild are in the cache since its GUILD_CREATE payload, no request needed
+                self._populate_emojis(guild, guild.emojis)
+                if not LOW_MEMORY:  # * Else the members are created on their first counted emoji
+                    self._populate_members(guild, [member for member in guild.members if not member.bot])
+
+        if first_ready:
+            record("time to ready", since_start())
         logging.info("Bot is ready!")
 
         print("{:-^30}".format(""))  
@@ -137,8 +197,23 @@ class Bot(commands.Bot):
 
 if __name__ == "__main__":
 
-    client = Bot(TOKEN, PREFIX)
-    client.start_bot()
+    # Log to a file, from a background thread
+    log_listener = setup_logging(os.path.join(LOGS_DIRECTORY, f"{datetime.now().strftime('%y%m%d%H%M%S')}.log"))
+
+    # Open discord bot token
+    with open(os.path.join(KEY_DIRECTORY, "discord-key.txt"), "r") as f:
+        TOKEN = f.read()
+
+    if SHARD_PROCESSES > 1:
+        from shards import launch
+        log_listener.stop()  # * Each process has its own log file
+        launch(TOKEN)
+    else:
+        client = Bot(TOKEN, PREFIX)
+        try:
+            client.start_bot()
+        finally:
+            log_listener.stop()  # * Write the records still in the queue
 
 
 # TODO uvloop
\ No newline at end of file
@@ -0,0 +1,56 @@
+import time
+import logging
+
+from metrics import MEMBER_CHANGE_DELAY
+from database import DBManager, DBSingletonMeta
+from flushbuffer import FlushBuffer
+from counters import CounterEngine
+from logpipeline import ROW_LOGGER
+from constants import MEMBER_QUEUE_SIZE
+
+JOIN = 1
+LEAVE = -1
+
+
+class MembershipQueue(FlushBuffer, metaclass=DBSingletonMeta):
+    # * Member joins and leaves waiting for a write in the database (raids and mass prunes send thousands of them).
+    # * A member who leaves then joins keeps its counters: the join cancels the pending leave.
+    # * A leave replaces a pending join, the counters may already have created the member (see DBManager._add_missing_member).
+    # * The queue is written in a single transaction.
+
+    NAME = "MEMBERS"
+    SIZE = MEMBER_QUEUE_SIZE  # * Buffer: (guild_id, member_id) -> (JOIN or LEAVE, time of the event)
+
+    def _queue(self, guild_id: int, member_id: int, change: int) -> None:
+        key = (guild_id, member_id)
+        pending = self._buffer.get(key)
+        if pending is None or pending[0] == JOIN and change == LEAVE:
+            self._buffer[key] = (change, time.monotonic())
+        elif pending[0] == LEAVE and change == JOIN:
+            del self._buffer[key]
+            ROW_LOGGER.debug("The leave and the join of the member %s of the guild %s cancel out.", member_id, guild_id)
+
+        self._flush_if_full()
+
+    def join(self, guild_id: int, member_id: int) -> None:
+        self._queue(guild_id, member_id, JOIN)
+
+    def leave(self, guild_id: int, member_id: int) -> None:
+        self._queue(guild_id, member_id, LEAVE)
+
+    def _write(self, rows: dict) -> None:
+        leaves = [key for key, (change, _) in rows.items() if change == LEAVE]
+        for guild_id in {guild_id for guild_id, _ in leaves}:
+            CounterEngine().invalidate(guild_id)
+        DBManager().apply_member_changes((key for key, (change, _) in rows.items() if change == JOIN), leaves)
+
+    def _restore(self, rows: dict) -> None:
+        for key, pending in rows.items():  # * Unless a newer change has been queued
+            self._buffer.setdefault(key, pending)
+
+    def _written(self, rows: dict) -> None:
+        now = time.monotonic()
+        for _, queued in rows.values():
+            MEMBER_CHANGE_DELAY.observe(now - queued)
+        leaves = sum(change == LEAVE for change, _ in rows.values())
+        logging.info(f"[MEMBERS] {len(rows) - leaves} joins and {leaves} leaves written in the database.")
@@ -0,0 +1,157 @@
+from array import array
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # * Seconds
+
+# * The values are stored in preallocated arrays: an update does not create or keep any object
+
+
+class Counter:
+    __slots__ = ("_value",)
+
+    def __init__(self):
+        self._value = array("Q", (0,))
+
+    def inc(self, number: int = 1) -> None:
+        self._value[0] += number
+
+    def reset(self) -> None:
+        self._value[0] = 0
+
+    @property
+    def value(self) -> int:
+        return self._value[0]
+
+
+class Gauge:
+    __slots__ = ("_value",)
+
+    def __init__(self):
+        self._value = array("q", (0,))
+
+    def inc(self, number: int = 1) -> None:
+        self._value[0] += number
+
+    def dec(self, number: int = 1) -> None:
+        self._value[0] -= number
+
+    @property
+    def value(self) -> int:
+        return self._value[0]
+
+
+class Histogram:
+    # * Fixed buckets histogram, the last bucket counts the values above the last bound
+
+    __slots__ = ("bounds", "counts", "_stats")
+
+    def __init__(self, bounds: tuple = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = array("Q", bytes(8 * (len(bounds) + 1)))
+        self._stats = array("d", (0.0, 0.0))  # * sum, max
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self._stats[0] += value
+        if value > self._stats[1]:
+            self._stats[1] = value
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+    @property
+    def sum(self) -> float:
+        return self._stats[0]
+
+    @property
+    def max(self) -> float:
+        return self._stats[1]
+
+    def percentile(self, q: float) -> float:
+        # * Upper bound of the bucket of the q-th value (0 < q <= 1), the maximum for the last bucket
+        total = self.total
+        if not total:
+            return 0.0
+        rank, seen = q * total, 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def reset(self) -> None:
+        for index in range(len(self.counts)):
+            self.counts[index] = 0
+        self._stats[0] = self._stats[1] = 0.0
+
+
+# * Metrics exposed by the metrics endpoint (see METRICS_PORT in constants.py)
+MESSAGES = Counter()
+EMOJIS = Counter()
+SCANNED_MESSAGES = Counter()
+DB_WRITES = Histogram()
+PAGINATORS_OPEN = Gauge()
+MEMBER_CHANGE_DELAY = Histogram()
+
+_REGISTRY = {
+    "emotebot_messages_total": ("counter", "Guild messages seen by the bot.", MESSAGES),
+    "emotebot_emojis_total": ("counter", "Custom emojis of the guild counted in the messages.", EMOJIS),
+    "emotebot_scanned_messages_total": ("counter", "Messages read by the scanall command.", SCANNED_MESSAGES),
+    "emotebot_db_write_seconds": ("histogram", "Duration of the database writes, commit included.", DB_WRITES),
+    "emotebot_paginators_open": ("gauge", "Paginators waiting for the reactions of a user.", PAGINATORS_OPEN),
+    "emotebot_member_change_delay_seconds": ("histogram", "Delay between a member join or leave and its write in the database.", MEMBER_CHANGE_DELAY),
+}
+
+
+def register(name: str, kind: str, description: str, metric) -> None:
+    """
+    register(name, kind, description, metric)
+
+    Expose a metric on the metrics endpoint.
+
+    Parameters
+    ----------
+    name : str
+        The name of the metric, in the Prometheus format.
+    kind : str
+        'counter', 'gauge' or 'histogram'.
+    description : str
+        The help text of the metric.
+    metric : object
+        A Counter, a Gauge or a Histogram. For a gauge, a function without arguments is also accepted:
+        it is called when the metrics are read. A dictionary {label: metric} exposes one series per label,
+        the label name is the last part of the name after '|' (eg: 'emotebot_handler_seconds|handler').
+    """
+    _REGISTRY[name] = (kind, description, metric)
+
+
+def _samples(name: str, kind: str, metric, labels: str = "") -> list:
+    if kind == "histogram":
+        lines, seen = [], 0
+        label_prefix = f"{labels}," if labels else ""
+        for bound, count in zip((*metric.bounds, "+Inf"), metric.counts):
+            seen += count
+            lines.append(f'{name}_bucket{{{label_prefix}le="{bound}"}} {seen}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {metric.sum}")
+        lines.append(f"{name}_count{suffix} {seen}")
+        return lines
+    value = metric() if callable(metric) else metric.value
+    return [f"{name}{{{labels}}} {value}" if labels else f"{name} {value}"]
+
+
+def render() -> str:
+    # * Text exposition format of every registered metric
+    lines = []
+    for name, (kind, description, metric) in _REGISTRY.items():
+        name, _, label = name.partition("|")
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        if isinstance(metric, dict):
+            for value, child in list(metric.items()):
+                escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+                lines.extend(_samples(name, kind, child, f'{label}="{escaped}"'))
+        else:
+            lines.extend(_samples(name, kind, metric))
+    return "\n".join(lines) + "\n"
@@ -8,6 +8,7 @@ import emoji
 import discord
 from discord.errors import NotFound
 
+from metrics import PAGINATORS_OPEN
 from constants import MAX_SIZE
 
 ARROW = {"left": "◀", 
@@ -16,6 +17,40 @@ ARROW = {"left": "◀",
          "valid": "✅"}
 NUM = ("1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣", "🔟")
 
+
+class PaginatorPage:
+    # * A single page of a paginator: the raw items and the already rendered text of the page
+    __slots__ = ("items", "text")
+
+    def __init__(self, items: tuple, text: str):
+        self.items = items
+        self.text = text
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class PaginatorSession:
+    # * Snapshot of a built paginator, stored by the PaginatorManager
+    # * With a loader, only the first page is built: the loader gives the full content when the user leaves it
+    __slots__ = ("pages", "base_embed", "prefix", "decorator", "separator",
+                 "timeout", "embed_content_index", "paginator_description", "loader")
+
+    def __init__(self, builder: "PaginatorBuilder"):
+        self.loader = builder.loader
+        self.pages = builder._content[:1] if self.loader else builder._content
+        self.base_embed = builder.base_embed
+        self.prefix = builder.prefix
+        self.decorator = builder.decorator
+        self.separator = builder.separator
+        self.timeout = builder.timeout
+        self.embed_content_index = builder.embed_content_index
+        self.paginator_description = builder.paginator_description
+
+    def __len__(self) -> int:
+        return len(self.pages) + (1 if self.loader else 0)  # * At least one more page to load
+
+
 class AbstractPaginatorBuilder(ABC):
     
     @abstractproperty
@@ -67,6 +102,7 @@ class PaginatorBuilder(AbstractPaginatorBuilder):
 
         self.embed_content_index = 0
         self.paginator_description = ""
+        self.loader = None  # * Coroutine function returning the full content, see paginator_store
 
     @property
     def content(self) -> list:
@@ -168,6 +204,12 @@ class PaginatorBuilder(AbstractPaginatorBuilder):
         Store your paginator into your paginator controller.
 
         This step is required before creating your paginator.
+
+        Notes
+        ----------
+        If a loader is set, the content is only the beginning of the full content and only its first page is kept.
+        The loader (a coroutine function without arguments returning the full content) is awaited
+        when the user goes to the second page, the pages are then rebuilt with the same setup.
         
         Returns
         ----------
@@ -180,7 +222,7 @@ class PaginatorBuilder(AbstractPaginatorBuilder):
         """
         assert isinstance(self.base_embed, discord.Embed), "Error, the base embed is not created."
         assert self._content, "Error, there is no content in the paginator."
-        self.manager._add(self.__dict__)  # ? Add in the paginator the final result as a dictionnary
+        self.manager._add(PaginatorSession(self))  # ? Add in the paginator the final result as a session
 
     def base_embed_create(self, name: str, description: str, colour: discord.Colour, **kwargs) -> None:
         """
@@ -357,26 +399,26 @@ class PaginatorBuilder(AbstractPaginatorBuilder):
         return {token: value for token, value in custom_format}
 
     @property
-    def _format_content_builder(self) -> list:
+    def _format_content_builder(self) -> tuple:
         prefix = self.prefix or ""
         content = self._content_arrangement  # ? Return a list of list with as column the page and as row the content of the paginator
-        copy_content = content[:]  # * Create a copy of content to edit
+        pages = []
 
-        for page_index, page in enumerate(content):
-            for index_content in range(len(page)):
+        for page in content:
+            last = len(page) - 1
+            lines = []
+            for index_content, item in enumerate(page):
+                separator = self.separator if last != index_content else ''  # * if the element is the last of its page, doesn't add separator
                 if prefix == "/number/":
-                    copy_content[page_index][
-                        index_content] = f"**{index_content + 1}**{self.decorator}{page[index_content]}{self.separator if len(page) - 1 != index_content else ''}"  # * if the element is the last of its page, doesn't add separator
+                    lines.append(f"**{index_content + 1}**{self.decorator}{item}{separator}")
                 elif prefix == "/emote/":
-                    copy_content[page_index][
-                        index_content] = f"**{NUM[index_content]}**{self.decorator}{page[index_content]}{self.separator if len(page) - 1 != index_content else ''}"  # * NUM is list of number emote
+                    lines.append(f"**{NUM[index_content]}**{self.decorator}{item}{separator}")  # * NUM is list of number emote
                 elif isinstance(prefix, str):  # * If the prefix is not an iterable
-                    copy_content[page_index][
-                        index_content] = f"{prefix}{self.decorator}{page[index_content]}{self.separator if len(page) - 1 != index_content else ''}"
+                    lines.append(f"{prefix}{self.decorator}{item}{separator}")
                 else:  # * If the prefix is an iterable, iterate through the prefix
-                    copy_content[page_index][
-                        index_content] = f"{prefix[index_content]}{self.decorator}{page[index_content]}{self.separator if len(page) - 1 != index_content else ''}"
-        return tuple(tuple(i) for i in copy_content)  # * Return an immutable
+                    lines.append(f"{prefix[index_content]}{self.decorator}{item}{separator}")
+            pages.append(PaginatorPage(tuple(page), "".join(lines)))  # * Keep the raw items next to the rendered page
+        return tuple(pages)  # * Return an immutable
 
     @property
     def _content_arrangement(self) -> list:
@@ -406,11 +448,11 @@ class PaginatorManager:
     def __init__(self):
         self.reset_paginator
 
-    def _add(self, paginator: dict) -> None:
+    def _add(self, paginator: PaginatorSession) -> None:
         self.paginators.append(paginator)
 
     @property
-    def next_paginator(self) -> dict:
+    def next_paginator(self) -> PaginatorSession:
         """
         next_paginator(self)
 
@@ -420,8 +462,8 @@ class PaginatorManager:
         
         Returns
         ----------
-        dict
-            Dict format of the next paginator.
+        PaginatorSession
+            The next paginator.
 
         Raises
         ----------
@@ -438,7 +480,7 @@ class PaginatorManager:
         raise ValueError("There is no more paginator.")
 
     @property
-    def previous_paginator(self) -> dict:
+    def previous_paginator(self) -> PaginatorSession:
         """
         previous_paginator(self)
 
@@ -448,8 +490,8 @@ class PaginatorManager:
         
         Returns
         ----------
-        dict
-            Dict format of the previous paginator.
+        PaginatorSession
+            The previous paginator.
 
         Raises
         ----------
@@ -467,7 +509,7 @@ class PaginatorManager:
         raise ValueError("This is already the first paginator.")
 
     @property
-    def current_paginator(self) -> dict:
+    def current_paginator(self) -> PaginatorSession:
         """
         current_paginator(self)
 
@@ -477,8 +519,8 @@ class PaginatorManager:
         
         Returns
         ----------
-        dict
-            Dict format of the current paginator.
+        PaginatorSession
+            The current paginator.
 
         Examples
         ----------
@@ -616,8 +658,8 @@ class PaginatorController:
 
         Returns
         ----------
-        str
-            The value of the content (after the decorator and before the separator).
+        object
+            The raw content selected by the user.
 
         Raises
         ----------
@@ -632,8 +674,8 @@ class PaginatorController:
         """
         self._reset()
         self.paginator_detection_desc = "Détection **d'emotes de navigation** et **d'emotes de réaction**."
-        paginator = self._manager.current_paginator # ? Retrieve the dict object of the current Paginator builder
-        prefix = paginator["_prefix"]
+        paginator = self._manager.current_paginator # ? Retrieve the session of the current Paginator builder
+        prefix = paginator.prefix
         if prefix in ["/number/", "/emote/"]:
             prefix = NUM # * The list of number emote
         elif isinstance(prefix, str):
@@ -659,8 +701,8 @@ class PaginatorController:
 
         Returns
         ----------
-        str
-            The value of the content (after the decorator and before the separator).
+        object
+            The raw content selected by the user.
 
         Raises
         ----------
@@ -673,7 +715,7 @@ class PaginatorController:
         """
         self._reset()
         self.paginator_detection_desc = "Détection **d'emotes de navigation** et des **messages** envoyés. Le message doit être **un chiffre** donnant **la position** de votre choix **dans la page**."
-        paginator = self._manager.current_paginator # ? Retrieve the dict object of the current Paginator builder
+        paginator = self._manager.current_paginator # ? Retrieve the session of the current Paginator builder
         task = [asyncio.ensure_future(self._loop_paginator(paginator, type="message"))]
         done, _ = await asyncio.wait(task,
                                      return_when=asyncio.FIRST_COMPLETED) # ? Wait until the paginator close or until the user write the position of a content 
@@ -692,8 +734,8 @@ class PaginatorController:
 
         Returns
         ----------
-        str
-            The value of the content (after the decorator and before the separator).
+        object
+            The raw content selected by the user.
 
         Raises
         ----------
@@ -706,7 +748,7 @@ class PaginatorController:
         """
         self._reset()
         self.paginator_detection_desc = "Détection **d'emotes de navigation** uniquement."
-        paginator = self._manager.current_paginator # ? Retrieve the dict object of the current Paginator builder
+        paginator = self._manager.current_paginator # ? Retrieve the session of the current Paginator builder
         task = [asyncio.ensure_future(self._loop_paginator(paginator))]
         done, _ = await asyncio.wait(task,
                                      return_when=asyncio.FIRST_COMPLETED) # ? Wait until the paginator close or until the user write the position of a content 
@@ -727,8 +769,8 @@ class PaginatorController:
 
         Returns
         ----------
-        str
-            The value of the content (after the decorator and before the separator).
+        object
+            The raw content selected by the user.
 
         Raises
         ----------
@@ -760,9 +802,16 @@ class PaginatorController:
 
         return _corrected_list
 
-    async def _loop_paginator(self, paginator: dict, **kwargs) -> str:
+    async def _loop_paginator(self, paginator: PaginatorSession, **kwargs) -> str:
+        PAGINATORS_OPEN.inc()
+        try:
+            return await self._run_paginator(paginator, **kwargs)
+        finally:
+            PAGINATORS_OPEN.dec()
+
+    async def _run_paginator(self, paginator: PaginatorSession, **kwargs) -> str:
 
-        previous_page = len(paginator["_content"]) # * Use to avoid a flood of reaction | check if a reaction is already set | here, it will set all the reactions
+        previous_page = len(paginator) # * Use to avoid a flood of reaction | check if a reaction is already set | here, it will set all the reactions
         while True:
             logging.debug("Setting content")
             self._set_paginator_content(paginator) # ? Edit the embed and set the content in the paginator
@@ -789,7 +838,10 @@ class PaginatorController:
                     return False
                 elif task_result[0].emoji == ARROW["right"]:
                     logging.debug("Right reaction used")
-                    self.page += 1
+                    if paginator.loader:
+                        await self._load_pages(paginator)
+                    if self.page + 1 < len(paginator):  # * The full content may fit in a single page
+                        self.page += 1
                 elif task_result[0].emoji == ARROW["left"]:
                     logging.debug("Left reaction used")
                     self.page -= 1
@@ -827,18 +879,18 @@ class PaginatorController:
 
         def check_message(message: discord.Message) -> bool:  # * check if message is in the range of the number of content in one page
             return message.channel.id == self.channel.id and self.user.id == message.author.id and message.content.isdigit() \
-                   and (message.content in [str(i) for i in range(1, len(paginator["_content"][self.page]) + 1)])
+                   and (message.content in [str(i) for i in range(1, len(paginator.pages[self.page]) + 1)])
 
         if kwargs.get("type") == "message":
 
-            pending_tasks = [self.client.wait_for('message', timeout=paginator["timeout"], check=check_message),
-                             self.client.wait_for('reaction_add', timeout=paginator["timeout"], check=check_reaction)]
+            pending_tasks = [self.client.wait_for('message', timeout=paginator.timeout, check=check_message),
+                             self.client.wait_for('reaction_add', timeout=paginator.timeout, check=check_reaction)]
 
             done_task, pending_task = await asyncio.wait(pending_tasks,
                                                          return_when=asyncio.FIRST_COMPLETED)  # * Check both if the user react with a reaction or with a message
             return done_task, pending_task
         else:
-            pending_tasks = [self.client.wait_for('reaction_add', timeout=paginator["timeout"], check=check_reaction)]
+            pending_tasks = [self.client.wait_for('reaction_add', timeout=paginator.timeout, check=check_reaction)]
             done_task, pending_task = await asyncio.wait(pending_tasks, return_when=asyncio.FIRST_COMPLETED) # * Check if the user react with a message
             return done_task, pending_task
 
@@ -864,32 +916,32 @@ class PaginatorController:
         
         return task_result 
 
-    async def _set_prefix_reactions(self, paginator: dict, prefix: tuple, previous_page: int) -> None:
-        total_content_in_page = lambda p: len(paginator["_content"][p]) # ? Get the len of a paginator page
+    async def _set_prefix_reactions(self, paginator: PaginatorSession, prefix: tuple, previous_page: int) -> None:
+        total_content_in_page = lambda p: len(paginator.pages[p]) # ? Get the len of a paginator page
         for i, r in enumerate(prefix):        
             if i > total_content_in_page(self.page) - 1: # * If the prefix is not in the page
-                if previous_page != len(paginator["_content"]):
+                if previous_page != len(paginator):
                     try:
                         await self.message.clear_reaction(r) # * Clear the prefix's reaction
                     except discord.errors.Forbidden:
                         pass
                 continue
             elif (
-                    previous_page == len(paginator["_content"]) or  # * Check the paginator has just been created
-                    (self.page + 1 < len(paginator["_content"]) and  # * Check if there is a next page available
+                    previous_page == len(paginator) or  # * Check the paginator has just been created
+                    (self.page + 1 < len(paginator) and  # * Check if there is a next page available
                     i >= total_content_in_page(self.page + 1) and  # * Check the next page dont have same amount of content
                     previous_page > self.page)  # * Check if there is not already a reaction
             ):
                 await self.message.add_reaction(r)
 
-    async def _set_nav_reactions(self, paginator: dict, *args, **kwargs) -> list:
+    async def _set_nav_reactions(self, paginator: PaginatorSession, *args, **kwargs) -> list:
 
         arrow = []
 
         if kwargs.get("type") == "emote":
             await self._set_prefix_reactions(paginator, prefix=kwargs.get("other"), previous_page=args[0]) # ? Add the prefix emote
 
-        if len(paginator["_content"]) == 1: # * If the paginator has only one page
+        if len(paginator) == 1: # * If the paginator has only one page
             pass
 
         elif self.page == 0:  # * If the paginator is in the first page and has more than 1 page
@@ -903,7 +955,7 @@ class PaginatorController:
                 arrow.append(ARROW["right"])
                 await self.message.add_reaction(ARROW["right"])
 
-        elif self.page == len(paginator["_content"]) - 1:  # * If the paginator is in the last page
+        elif self.page == len(paginator) - 1:  # * If the paginator is in the last page
             logging.debug("Last page")
             try:
                 await self.message.clear_reaction(ARROW["right"])  # ? Remove unused reaction
@@ -932,27 +984,34 @@ class PaginatorController:
         logging.debug("Return")
         return arrow
 
-    def _set_paginator_content(self, paginator: dict) -> None:        
+    async def _load_pages(self, paginator: PaginatorSession) -> None:
+        # * Replace the first page by the pages of the full content
+        loader, paginator.loader = paginator.loader, None
+        self._builder.content = await loader()
+        self._builder.content_builder(decorator=paginator.decorator, separator=paginator.separator)
+        paginator.pages = self._builder._content
+
+    def _set_paginator_content(self, paginator: PaginatorSession) -> None:        
         
-        paginator_description = f"{paginator['paginator_description']}\n{self.paginator_detection_desc}" if paginator["paginator_description"] else self.paginator_detection_desc
+        paginator_description = f"{paginator.paginator_description}\n{self.paginator_detection_desc}" if paginator.paginator_description else self.paginator_detection_desc
 
-        paginator["base_embed"].set_field_at(paginator["embed_content_index"], name=paginator_description,
-                                             value=f''.join(paginator["_content"][self.page]))
+        paginator.base_embed.set_field_at(paginator.embed_content_index, name=paginator_description,
+                                          value=paginator.pages[self.page].text)
 
-    def _set_paginator_footer(self, paginator: dict) -> None:
-        paginator["base_embed"].set_footer(
-            text=f"• Requête de {self.user} • Page {int(self.page) + 1} / {len(paginator['_content'])}")
+    def _set_paginator_footer(self, paginator: PaginatorSession) -> None:
+        paginator.base_embed.set_footer(
+            text=f"• Requête de {self.user} • Page {int(self.page) + 1} / {len(paginator) if not paginator.loader else '…'}")
 
-    async def _set_message(self, paginator: dict) -> None:
+    async def _set_message(self, paginator: PaginatorSession) -> None:
         if not self.message:
-            self.message = await self.channel.send(embed=paginator["base_embed"])
+            self.message = await self.channel.send(embed=paginator.base_embed)
         else:
 
-            await self.message.edit(embed=paginator["base_embed"])
+            await self.message.edit(embed=paginator.base_embed)
 
-    async def _get_final_data(self, result, paginator: dict, **kwargs) -> str:
+    async def _get_final_data(self, result, paginator: PaginatorSession, **kwargs) -> object:
 
-        if paginator["_prefix"] in ["/number/", "/emote/"] and kwargs.get("type") == "emote":
+        if paginator.prefix in ["/number/", "/emote/"] and kwargs.get("type") == "emote":
             index = NUM.index(result) # * Get the index of the result in the list of number emote
         elif kwargs.get("type") == "emote": # * If the paginator detects emote
             index = kwargs.get("other").index(str(result))
@@ -964,4 +1023,4 @@ class PaginatorController:
         except (NotFound, discord.errors.Forbidden):
             pass
         self.index = index + self.page
-        return paginator["_content"][self.page][index].split(paginator["decorator"])[1].split(paginator["separator"])[0]
+        return paginator.pages[self.page].items[index]  # * The raw item is stored next to its rendered line
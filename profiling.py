@@ -0,0 +1,117 @@
+import io
+import pstats
+import asyncio
+import cProfile
+import logging
+import linecache
+import tracemalloc
+from datetime import datetime
+
+from constants import LOGS_DIRECTORY, PROFILE_TOP, TRACEMALLOC_FRAMES
+
+# * Allocations of the profiler itself, hidden from the memory reports
+MEMORY_FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__),
+                  tracemalloc.Filter(False, linecache.__file__),
+                  tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                  tracemalloc.Filter(False, "<unknown>"))
+
+_running = asyncio.Lock()
+
+
+def busy() -> bool:
+    # * One capture at a time: two profilers of the same kind can not run together
+    return _running.locked()
+
+
+def _path(kind: str, extension: str) -> str:
+    return f"{LOGS_DIRECTORY}{kind}-{datetime.now().strftime('%y%m%d%H%M%S')}.{extension}"
+
+
+async def profile_cpu(seconds: float) -> tuple:
+    """
+    profile_cpu(seconds)
+
+    Profile the event loop thread with cProfile for some seconds, while the bot keeps running.
+
+    Parameters
+    ----------
+    seconds : float
+        The duration of the capture.
+
+    Returns
+    ----------
+    tuple
+        The report (str), the path of the report and the path of the raw profile (pstats format).
+    """
+    async with _running:
+        profiler = cProfile.Profile()
+        logging.info(f"[PROFILE] CPU profiling started for {seconds}s.")
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+        logging.info("[PROFILE] CPU profiling stopped.")
+
+    raw_path, report_path = _path("cpu", "prof"), _path("cpu", "txt")
+    profiler.dump_stats(raw_path)
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream).strip_dirs()
+    stream.write(f"CPU profile of the event loop thread during {seconds}s\n")
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_TOP)
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(PROFILE_TOP)
+    report = stream.getvalue()
+    with open(report_path, "w", encoding="utf-8") as file:
+        file.write(report)
+    return report, report_path, raw_path
+
+
+async def profile_memory(seconds: float) -> tuple:
+    """
+    profile_memory(seconds)
+
+    Trace the allocations of the whole process with tracemalloc for some seconds.
+
+    Parameters
+    ----------
+    seconds : float
+        The duration of the capture.
+
+    Returns
+    ----------
+    tuple
+        The report (str), the path of the report and the path of the raw snapshot (tracemalloc.Snapshot.load).
+
+    Notes
+    ----------
+    Only the allocations made during the capture and still alive at its end are reported.
+    """
+    async with _running:
+        if tracemalloc.is_tracing():  # * Started by PYTHONTRACEMALLOC or someone else, do not stop it
+            raise RuntimeError("tracemalloc is already tracing")
+        logging.info(f"[PROFILE] Memory tracing started for {seconds}s.")
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        try:
+            await asyncio.sleep(seconds)
+            snapshot = tracemalloc.take_snapshot().filter_traces(MEMORY_FILTERS)
+            traced, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        logging.info("[PROFILE] Memory tracing stopped.")
+
+    raw_path, report_path = _path("memory", "tracemalloc"), _path("memory", "txt")
+    snapshot.dump(raw_path)
+    statistics = snapshot.statistics("lineno")
+    lines = [f"Allocations alive after {seconds}s: {sum(stat.size for stat in statistics) / 1024:.1f} KiB "
+             f"in {sum(stat.count for stat in statistics)} blocks (traced {traced / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB)",
+             ""]
+    for index, stat in enumerate(statistics[:PROFILE_TOP], 1):
+        frame = stat.traceback[0]
+        lines.append(f"#{index} {frame.filename}:{frame.lineno}: {stat.size / 1024:.1f} KiB in {stat.count} blocks")
+        line = linecache.getline(frame.filename, frame.lineno).strip()
+        if line:
+            lines.append(f"    {line}")
+    report = "\n".join(lines) + "\n"
+    with open(report_path, "w", encoding="utf-8") as file:
+        file.write(report)
+    return report, report_path, raw_path
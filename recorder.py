@@ -0,0 +1,76 @@
+import os
+import re
+import gzip
+import json
+import time
+import hashlib
+import logging
+from datetime import datetime
+
+from database import DBSingletonMeta
+from constants import LOGS_DIRECTORY, LOW_MEMORY
+
+EMOJI = re.compile(r"(?:<?:\w+:)([^:][\d]*(?:::[^:][\d]*)*)>")  # * Same pattern as on_message
+
+# * One JSON object per line, gzip-compressed. Every id is anonymized, the content of the messages is not kept.
+# *     {"t": 0.0, "e": "guild", "g": guild, "m": human members, "x": [emojis]}  (state of a guild at the start)
+# *     {"t": 1.25, "e": "message", "g": guild, "c": channel, "a": author, "x": [emojis of the guild], "o": other emojis}
+# *     {"t": 2.5, "e": "member_join", "g": guild, "a": member}
+# *     {"t": 3.0, "e": "member_remove", "g": guild, "a": member}
+# *     {"t": 4.0, "e": "emojis_update", "g": guild, "b": [emojis before], "f": [emojis after]}
+# * t is the time since the start of the recording in seconds.
+
+
+class GatewayRecorder(metaclass=DBSingletonMeta):
+    # * Opt-in recorder of the gateway events handled by the bot (see GATEWAY_RECORD in constants.py),
+    # * used by benchmarks/replay.py. The events are buffered and written by flush().
+
+    def __init__(self):
+        self.path = None
+        self.records = []
+        self._start = None
+        self._key = os.urandom(16)  # * Never written: the anonymized ids can not be reversed
+
+    def _id(self, value: int) -> int:
+        # * Same id for the same object during the recording, 48 bits to stay exact in JSON
+        return int.from_bytes(hashlib.blake2b(value.to_bytes(8, "little"), digest_size=6, key=self._key).digest(), "little")
+
+    def _record(self, event: str, guild_id: int, **fields) -> None:
+        if self._start is None:
+            return
+        self.records.append({"t": round(time.monotonic() - self._start, 3), "e": event, "g": self._id(guild_id), **fields})
+
+    def start(self, guilds) -> None:
+        if self._start is not None:
+            return
+        self.path = f"{LOGS_DIRECTORY}gateway-{datetime.now().strftime('%y%m%d%H%M%S')}.jsonl.gz"
+        self._start = time.monotonic()
+        for guild in guilds:
+            # * LOW_MEMORY: no member cache, the bots are counted with the humans
+            self._record("guild", guild.id, m=guild.member_count if LOW_MEMORY else sum(not member.bot for member in guild.members),
+                         x=[self._id(emoji.id) for emoji in guild.emojis])
+        logging.info(f"[RECORDER] Recording the gateway events in {self.path} .")
+
+    def message(self, message) -> None:
+        guild_emojis = {emoji.id for emoji in message.guild.emojis}
+        ids = [int(found) for found in EMOJI.findall(message.content)]
+        self._record("message", message.guild.id, c=self._id(message.channel.id), a=self._id(message.author.id),
+                     x=[self._id(emoji_id) for emoji_id in ids if emoji_id in guild_emojis],
+                     o=sum(emoji_id not in guild_emojis for emoji_id in ids))
+
+    def member(self, event: str, member, guild=None) -> None:
+        # * guild: for a user outside of the member cache (raw_member_remove)
+        self._record(event, (guild or member.guild).id, a=self._id(member.id))
+
+    def emojis_update(self, guild, before, after) -> None:
+        self._record("emojis_update", guild.id, b=[self._id(emoji.id) for emoji in before],
+                     f=[self._id(emoji.id) for emoji in after])
+
+    def flush(self) -> None:
+        if not self.records:
+            return
+        with gzip.open(self.path, "at", encoding="utf-8") as file:  # * One gzip member per flush
+            file.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in self.records))
+        # * Cleared after the write only: after an OSError, the events are written by the next flush
+        logging.debug(f"[RECORDER] {len(self.records)} gateway events written.")
+        self.records = []
@@ -0,0 +1,91 @@
+import os
+import signal
+import asyncio
+import logging
+import multiprocessing
+from datetime import datetime
+
+from database import DBManager
+from writer import WriterServer, WriterClient
+from logpipeline import setup_logging
+from constants import HOT_STORE, LOGS_DIRECTORY, PREFIX, SHARD_COUNT, SHARD_PROCESSES
+
+# * Multi-process sharding (SHARD_PROCESSES > 1 in constants.py):
+# *     - a writer process owns the database and applies the writes (see writer.py),
+# *     - SHARD_PROCESSES shard processes handle the gateway, the scans and the commands of their shards,
+# *       read the database through read-only connections and send their writes to the writer process.
+# * The shards are spread over the processes: the process i runs the shards i, i + SHARD_PROCESSES, ...
+
+
+def _log_path(name: str) -> str:
+    return os.path.join(LOGS_DIRECTORY, f"{datetime.now().strftime('%y%m%d%H%M%S')}-{name}.log")
+
+
+def run_writer(ready) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # * Stopped by the launcher, after the last writes of the shards
+    log_listener = setup_logging(_log_path("writer"))
+    try:
+        DBManager()  # * Creates or migrates the schema before the shards open the database
+        asyncio.run(WriterServer().serve(ready))
+    finally:
+        log_listener.stop()
+
+
+def run_shards(token: str, shard_ids: list) -> None:
+    from main_emote import Bot  # * main_emote imports this module
+
+    log_listener = setup_logging(_log_path(f"shards-{'-'.join(map(str, shard_ids))}"))
+    try:
+        logging.info(f"Starting the shards {shard_ids} of {SHARD_COUNT} .")
+        DBManager(read_only=True, writer=WriterClient())
+        client = Bot(token, PREFIX, shard_ids=shard_ids, shard_count=SHARD_COUNT)
+        client.start_bot()
+    finally:
+        log_listener.stop()
+
+
+def launch(token: str) -> None:
+    """
+    launch(token)
+
+    Start the writer process, then the shard processes, and wait for the shard processes.
+
+    Parameters
+    ----------
+    token : str
+        The token of the bot.
+
+    Notes
+    ----------
+    The writes of a shard process are visible to the other processes after WRITER_FLUSH_INTERVAL seconds at most.
+    HOT_STORE is not supported: its delta journal belongs to a single process.
+    """
+    if HOT_STORE:
+        raise RuntimeError("HOT_STORE can not be used with several shard processes")
+    if SHARD_COUNT is None or SHARD_COUNT < SHARD_PROCESSES:
+        raise RuntimeError("SHARD_COUNT must be set, with at least one shard per process")
+
+    context = multiprocessing.get_context("spawn")  # * No state (connections, event loop) inherited from the launcher
+    ready = context.Event()
+    writer = context.Process(target=run_writer, args=(ready,), name="writer")
+    writer.start()
+    if not ready.wait(60):
+        writer.terminate()
+        raise RuntimeError("The writer process did not start")
+
+    shards = [context.Process(target=run_shards, name=f"shards-{index}",
+                              args=(token, [shard_id for shard_id in range(SHARD_COUNT) if shard_id % SHARD_PROCESSES == index]))
+              for index in range(SHARD_PROCESSES)]
+    for process in shards:
+        process.start()
+    try:
+        for process in shards:
+            process.join()
+    finally:
+        for process in shards:
+            process.join(60)  # * After a Ctrl+C, the shards send their last writes before they stop
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        writer.terminate()  # * SIGTERM: the writer stops after the batch being applied
+        writer.join()
@@ -0,0 +1,32 @@
+import time
+import logging
+from contextlib import contextmanager
+
+from metrics import register
+
+STARTED = time.perf_counter()  # * Imported first by main_emote.py: the imports of the bot are measured from here
+
+PHASES = {}  # * phase -> seconds, in the order of the startup
+_GAUGES = {}  # * phase -> gauge function, exposed on the metrics endpoint
+
+
+def record(name: str, seconds: float) -> None:
+    PHASES[name] = seconds
+    _GAUGES[name] = lambda: PHASES[name]
+    logging.info(f"[STARTUP] {name}: {seconds * 1000:.1f}ms")
+
+
+@contextmanager
+def phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def since_start() -> float:
+    return time.perf_counter() - STARTED
+
+
+register("emotebot_startup_seconds|phase", "gauge", "Duration of each phase of the startup of the bot.", _GAUGES)
@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import DBManager, DBSingletonMeta
+from membership import MembershipQueue
+
+
+class MembershipQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        database.DATABASE_PATH = os.path.join(self.directory.name, "database.db")
+        DBSingletonMeta._instance.clear()  # * New database and new queue for each test
+        DBManager().add_new_guild(1)
+        DBManager().add_new_emoji(1, 100)
+
+    def tearDown(self):
+        DBManager().connexion.close()
+        DBSingletonMeta._instance.clear()
+        self.directory.cleanup()
+
+    def _rows(self, table: str) -> list:
+        return DBManager().cursor.execute(f"SELECT * FROM {table} WHERE guild_id = 1").fetchall()
+
+    def test_leave_after_counted_pending_join(self):
+        # * The counters create the member while its join is pending, the leave must still delete it
+        MembershipQueue().join(1, 42)
+        DBManager().add_message_emojis(1, 5, 42, [100])
+        MembershipQueue().leave(1, 42)
+        MembershipQueue().flush()
+
+        self.assertEqual(len(MembershipQueue()), 0)
+        self.assertEqual(DBManager().cursor.execute("SELECT * FROM members WHERE member_id = 42").fetchall(), [])
+        self.assertEqual(self._rows("emote_members"), [])
+
+    def test_join_after_pending_leave(self):
+        # * A member who leaves then joins keeps its counters
+        DBManager().add_new_member(1, 42)
+        DBManager().add_message_emojis(1, 5, 42, [100])
+        MembershipQueue().leave(1, 42)
+        MembershipQueue().join(1, 42)
+        MembershipQueue().flush()
+
+        self.assertEqual(self._rows("emote_members"), [(1, 100, 42, 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
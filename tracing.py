@@ -0,0 +1,79 @@
+import time
+import logging
+from functools import wraps
+
+from database import DBSingletonMeta
+from metrics import Counter, Histogram
+from constants import PREFIX, TRACING
+
+
+class HandlerStats:
+    __slots__ = ("errors", "latency")
+
+    def __init__(self):
+        self.errors = Counter()
+        self.latency = Histogram()
+
+    @property
+    def calls(self) -> int:
+        return self.latency.total
+
+
+class Tracer(metaclass=DBSingletonMeta):
+    # * Call counts, error counts and latency histograms of the cog listeners and commands.
+    # * The cogs are instrumented by Bot.add_cog, so every cog loaded by load_commands, load_events
+    # * or the dev commands is traced. When disabled, a traced handler only checks self.enabled.
+
+    def __init__(self):
+        self.enabled = TRACING
+        self.handlers = {}  # * handler name -> HandlerStats
+        self.latencies = {}  # * handler name -> Histogram, exposed on the metrics endpoint
+        self.errors = {}  # * handler name -> Counter
+
+    def trace(self, name: str, func):
+        stats = self.handlers.get(name)
+        if stats is None:
+            stats = self.handlers[name] = HandlerStats()
+            self.latencies[name] = stats.latency
+            self.errors[name] = stats.errors
+
+        @wraps(func)
+        async def traced(*args, **kwargs):
+            if not self.enabled:
+                return await func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                stats.errors.inc()
+                raise
+            finally:
+                stats.latency.observe(time.perf_counter() - start)
+        return traced
+
+    def instrument_cog(self, cog) -> None:
+        # * Must be called before the cog is added to the bot, the bot registers the traced listeners
+        for _, method_name in cog.__cog_listeners__:
+            setattr(cog, method_name, self.trace(f"{type(cog).__name__}.{method_name}", getattr(cog, method_name)))
+        for command in cog.__cog_commands__:
+            command.callback = self.trace(f"{PREFIX}{command.qualified_name}", command.callback)
+
+    def snapshot(self) -> list:
+        # * (name, calls, errors, p50, p95, p99) of the handlers called at least once, slowest p99 first
+        rows = [(name, stats.calls, stats.errors.value, stats.latency.percentile(0.5),
+                 stats.latency.percentile(0.95), stats.latency.percentile(0.99))
+                for name, stats in self.handlers.items() if stats.calls]
+        rows.sort(key=lambda row: row[5], reverse=True)
+        return rows
+
+    def log_snapshot(self) -> None:
+        rows = self.snapshot()
+        if rows:
+            logging.info("[TRACE] " + " | ".join(f"{name} {calls} calls {errors} errors p50 {p50 * 1000:.1f}ms "
+                                                 f"p95 {p95 * 1000:.1f}ms p99 {p99 * 1000:.1f}ms"
+                                                 for name, calls, errors, p50, p95, p99 in rows))
+
+    def reset(self) -> None:
+        for stats in self.handlers.values():
+            stats.errors.reset()
+            stats.latency.reset()
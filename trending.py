@@ -0,0 +1,108 @@
+import time
+
+from lazyimport import lazy_import
+from database import DBSingletonMeta
+from constants import TRENDING_SLOTS, TRENDING_LIMIT
+
+np = lazy_import("numpy")
+
+HOUR_SLOTS = 60
+
+
+class GuildTrend:
+    # * Ring buffer of the per-minute uses of each emoji of a guild (emojis x TRENDING_SLOTS)
+    # * The rolling sums of the last hour and of the whole buffer are kept up to date on each minute change
+
+    __slots__ = ("emojis", "emoji_ids", "slots", "hour", "day", "minute")
+
+    def __init__(self, minute: int):
+        self.emojis = {}  # * emoji_id -> row
+        self.emoji_ids = []
+        self.slots = np.zeros((8, TRENDING_SLOTS), dtype=np.int32)
+        self.hour = np.zeros(8, dtype=np.int64)
+        self.day = np.zeros(8, dtype=np.int64)
+        self.minute = minute
+
+    def _row(self, emoji_id: int) -> int:
+        row = self.emojis.get(emoji_id)
+        if row is None:
+            row = len(self.emoji_ids)
+            if row >= self.slots.shape[0]:
+                self.slots = np.vstack((self.slots, np.zeros_like(self.slots)))
+                self.hour = np.concatenate((self.hour, np.zeros_like(self.hour)))
+                self.day = np.concatenate((self.day, np.zeros_like(self.day)))
+            self.emojis[emoji_id] = row
+            self.emoji_ids.append(emoji_id)
+        return row
+
+    def advance(self, minute: int) -> None:
+        # * Move the ring buffer to the current minute, the expired slots leave the rolling sums
+        elapsed = minute - self.minute
+        if elapsed <= 0:
+            return
+        if elapsed >= TRENDING_SLOTS:
+            self.slots[:] = 0
+            self.hour[:] = 0
+            self.day[:] = 0
+        else:
+            for m in range(self.minute + 1, minute + 1):
+                self.hour -= self.slots[:, (m - HOUR_SLOTS) % TRENDING_SLOTS]
+                column = m % TRENDING_SLOTS  # * The slot of the minute m - TRENDING_SLOTS is reused
+                self.day -= self.slots[:, column]
+                self.slots[:, column] = 0
+        self.minute = minute
+
+    def add(self, emoji_id: int, minute: int, number: int = 1) -> None:
+        row = self._row(emoji_id)
+        self.advance(minute)
+        self.slots[row, minute % TRENDING_SLOTS] += number
+        self.hour[row] += number
+        self.day[row] += number
+
+    def ranking(self, minute: int) -> list:
+        """
+        ranking(self, minute)
+
+        Rank the emojis spiking during the last hour.
+
+        The score is the use of the last hour divided by the average hourly use of the rest of the buffer.
+
+        Returns
+        ----------
+        list
+            (emoji_id, last hour, whole buffer, score) tuples sorted by decreasing score.
+        """
+        self.advance(minute)
+        n = len(self.emoji_ids)
+        hour, day = self.hour[:n], self.day[:n]
+        baseline = (day - hour) / (TRENDING_SLOTS / HOUR_SLOTS - 1)
+        score = hour / (baseline + 1)
+        order = np.argsort(-score, kind="stable")
+        return [(self.emoji_ids[i], int(hour[i]), int(day[i]), float(score[i])) for i in order if hour[i]]
+
+
+class TrendingCounters(metaclass=DBSingletonMeta):
+    # * Real-time counters of the emojis used in each guild, nothing is stored in the database
+
+    def __init__(self):
+        self._guilds = {}
+
+    @staticmethod
+    def _minute(timestamp: float = None) -> int:
+        return int(timestamp or time.time()) // 60
+
+    def add(self, guild_id: int, emoji_id: int, number: int = 1) -> None:
+        minute = self._minute()
+        trend = self._guilds.get(guild_id)
+        if trend is None:
+            trend = self._guilds[guild_id] = GuildTrend(minute)
+        trend.add(emoji_id, minute, number)
+
+    def ranking(self, guild_id: int) -> list:
+        trend = self._guilds.get(guild_id)
+        if trend is None:
+            return []
+        return trend.ranking(self._minute())[:TRENDING_LIMIT]
+
+    def discard(self, guild_id: int) -> None:
+        self._guilds.pop(guild_id, None)
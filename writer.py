@@ -0,0 +1,155 @@
+import os
+import pickle
+import signal
+import struct
+import asyncio
+import logging
+
+from database import DBManager, DBSingletonMeta
+from constants import WRITER_SOCKET, WRITER_FLUSH_INTERVAL, WRITER_BATCH_SIZE
+
+# * A batch is a pickled list of (method of DBManager, positional arguments, keyword arguments),
+# * sent on the Unix socket after its length (4 bytes, big endian). The writer answers with the number of failed calls.
+HEADER = struct.Struct(">I")
+
+
+async def _read_frame(reader) -> bytes:
+    size, = HEADER.unpack(await reader.readexactly(HEADER.size))
+    return await reader.readexactly(size)
+
+
+def _write_frame(writer, payload: bytes) -> None:
+    writer.write(HEADER.pack(len(payload)) + payload)
+
+
+class WriterServer:
+    # * Runs in the writer process, the only process with a writable connection to the database.
+    # * The batches of the shard processes are applied one after the other, each in a single transaction.
+
+    def __init__(self, path: str = WRITER_SOCKET):
+        self.path = path
+        self.batches = 0
+        self.calls = 0
+
+    def apply(self, calls: list) -> int:
+        manager = DBManager()
+        failed = 0
+        manager.batching = True  # * auto_commit does not commit, the batch is committed once
+        try:
+            if not manager.connexion.in_transaction:
+                manager.cursor.execute("BEGIN")  # * Else the release of the first savepoint would commit
+            for name, args, kwargs in calls:
+                method = getattr(manager, name, None)
+                if not getattr(method, "shared_write", False):  # * Only the write methods can be called
+                    logging.error(f"[WRITER] Unknown write method {name} .")
+                    failed += 1
+                    continue
+                # * A failed call is rolled back alone, the others of the batch are kept
+                manager.cursor.execute("SAVEPOINT call")
+                try:
+                    method(*args, **kwargs)
+                except Exception:  # * A bad call of a shard must not stop the writer
+                    manager.cursor.execute("ROLLBACK TO call")
+                    logging.exception(f"[WRITER] Task failed, the call {name} has not been applied.")
+                    failed += 1
+                manager.cursor.execute("RELEASE call")
+            manager.connexion.commit()
+        finally:
+            manager.batching = False
+        self.batches += 1
+        self.calls += len(calls)
+        return failed
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            while True:
+                try:
+                    payload = await _read_frame(reader)
+                except asyncio.IncompleteReadError:
+                    break  # * The shard process closed the connection
+                failed = self.apply(pickle.loads(payload))
+                _write_frame(writer, pickle.dumps(failed))
+                await writer.drain()
+        except ConnectionError:
+            logging.warning("[WRITER] A shard process has been disconnected.")
+        finally:
+            writer.close()
+
+    async def serve(self, ready=None) -> None:
+        manager = DBManager()  # * In WAL mode, the read-only connections of the shards are not blocked by the writes
+        if os.path.exists(self.path):
+            os.remove(self.path)  # * Left by a previous writer
+        server = await asyncio.start_unix_server(self._handle, path=self.path)
+        os.chmod(self.path, 0o600)
+        stop = asyncio.Event()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+        logging.info(f"[WRITER] Listening on {self.path} .")
+        if ready is not None:
+            ready.set()
+        async with server:
+            await stop.wait()
+        os.remove(self.path)
+        manager.connexion.close()
+        logging.info(f"[WRITER] Stopped after {self.calls} calls in {self.batches} batches.")
+
+
+class WriterClient(metaclass=DBSingletonMeta):
+    # * Runs in a shard process: the write methods of DBManager are buffered here
+    # * and sent to the writer process every WRITER_FLUSH_INTERVAL seconds (or WRITER_BATCH_SIZE calls).
+    # * The reads of the shard see the writes after the flush of their batch.
+
+    def __init__(self, path: str = WRITER_SOCKET):
+        self.path = path
+        self.buffer = []
+        self._reader = None
+        self._writer = None
+        self._full = None
+        self._lock = asyncio.Lock()
+
+    def submit(self, name: str, args: tuple, kwargs: dict) -> None:
+        # * The generators are consumed now, they can not be pickled
+        args = tuple(list(arg) if hasattr(arg, "__next__") else arg for arg in args)
+        self.buffer.append((name, args, kwargs))
+        if len(self.buffer) >= WRITER_BATCH_SIZE and self._full is not None:
+            self._full.set()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self.buffer:
+                return
+            calls, self.buffer = self.buffer, []
+            if self._writer is None:
+                try:
+                    self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+                except OSError:
+                    # * The writer process is not reachable: the calls are kept for the next flush
+                    logging.exception(f"[WRITER] Task failed, {len(calls)} writes are waiting for the writer process.")
+                    self.buffer[:0] = calls
+                    return
+            try:
+                _write_frame(self._writer, pickle.dumps(calls))
+                await self._writer.drain()
+                failed = pickle.loads(await _read_frame(self._reader))
+            except (OSError, asyncio.IncompleteReadError):
+                # * The batch may have been applied, it is not sent again (the counters would be increased twice)
+                logging.exception(f"[WRITER] Task failed, {len(calls)} writes may have been lost by the writer process.")
+                self._reader = self._writer = None
+                return
+            if failed:
+                logging.error(f"[WRITER] {failed} of {len(calls)} writes have failed in the writer process.")
+
+    async def run(self) -> None:
+        self._full = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), WRITER_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            await self.flush()
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None